@@ -4,7 +4,8 @@ import { useEffect, useMemo, useRef, useState } from 'react';
 import ReactFlow, { Background, Controls, MiniMap, type Edge, type Node } from 'reactflow';
 import 'reactflow/dist/style.css';
 
-import { getGraph, type GraphResponse } from '@/lib/apiClient';
+import { type GraphResponse } from '@/lib/apiClient';
+import { loadGraphNeighbourhood, loadGraphOverview } from '@/lib/graphView';
 import NodeDrawer, { type NodeDetails } from '@/components/NodeDrawer';
 
 type LayoutNode = { id: string };
@@ -20,6 +21,9 @@ export default function ArchitectureMap({ repoId }: { repoId: string }) {
   const [edges, setEdges] = useState<Edge[]>([]);
   const [selected, setSelected] = useState<NodeDetails | null>(null);
   const [dimensions, setDimensions] = useState({ width: 1200, height: 700 });
+  const [draftPrefix, setDraftPrefix] = useState('');
+  const [prefix, setPrefix] = useState('');
+  const [focus, setFocus] = useState<NodeDetails | null>(null);
 
   useEffect(() => {
     workerRef.current = new Worker(new URL('../workers/graphLayout.ts', import.meta.url));
@@ -42,7 +46,11 @@ export default function ArchitectureMap({ repoId }: { repoId: string }) {
 
   useEffect(() => {
     let active = true;
-    getGraph(Number(repoId))
+    const id = Number(repoId);
+    const load = focus
+      ? loadGraphNeighbourhood(id, Number(focus.id))
+      : loadGraphOverview(id, prefix);
+    load
       .then((response) => {
         if (active) {
           setGraph(response);
@@ -56,7 +64,7 @@ export default function ArchitectureMap({ repoId }: { repoId: string }) {
     return () => {
       active = false;
     };
-  }, [repoId]);
+  }, [repoId, prefix, focus]);
 
   useEffect(() => {
     if (!graph) {
@@ -65,7 +73,7 @@ export default function ArchitectureMap({ repoId }: { repoId: string }) {
     const mappedNodes: Node[] = graph.nodes.map((node) => ({
       id: String(node.id),
       data: node,
-      position: { x: 0, y: 0 },
+      position: { x: node.x ?? 0, y: node.y ?? 0 },
       type: 'default',
     }));
     const mappedEdges: Edge[] = graph.edges.map((edge) => ({
@@ -83,6 +91,9 @@ export default function ArchitectureMap({ repoId }: { repoId: string }) {
     if (!workerRef.current || nodes.length === 0) {
       return;
     }
+    if (graph?.nodes.every((node) => node.x != null && node.y != null)) {
+      return;
+    }
     const layoutKey = `${nodes.length}:${edges.length}:${dimensions.width}:${dimensions.height}`;
     if (layoutKeyRef.current === layoutKey) {
       return;
@@ -119,7 +130,7 @@ export default function ArchitectureMap({ repoId }: { repoId: string }) {
         })),
       );
     };
-  }, [nodes, edges, dimensions]);
+  }, [graph, nodes, edges, dimensions]);
 
   const minimapStyle = useMemo(
     () => ({
@@ -131,11 +142,41 @@ export default function ArchitectureMap({ repoId }: { repoId: string }) {
 
   return (
     <div className="relative h-[70vh] w-full overflow-hidden rounded-3xl border border-border bg-panel shadow-soft">
+      <div className="absolute left-6 top-6 z-10 flex items-center gap-3 text-xs">
+        {focus ? (
+          <button
+            onClick={() => setFocus(null)}
+            className="rounded-2xl border border-border bg-white px-4 py-2 font-semibold text-text"
+          >
+            Back to overview
+          </button>
+        ) : (
+          <form
+            onSubmit={(event) => {
+              event.preventDefault();
+              setPrefix(draftPrefix.trim());
+            }}
+          >
+            <input
+              value={draftPrefix}
+              onChange={(event) => setDraftPrefix(event.target.value)}
+              placeholder="Filter by directory"
+              className="w-56 rounded-2xl border border-border bg-white px-4 py-2 text-text"
+            />
+          </form>
+        )}
+        {graph?.truncated ? (
+          <span className="rounded-2xl bg-white px-3 py-2 text-muted">
+            Showing {graph.nodes.length} nodes; narrow the view to see more.
+          </span>
+        ) : null}
+      </div>
       <div ref={containerRef} className="h-full w-full">
         <ReactFlow
           nodes={nodes}
           edges={edges}
           onNodeClick={(_, node) => setSelected(node.data as NodeDetails)}
+          onNodeDoubleClick={(_, node) => setFocus(node.data as NodeDetails)}
           fitView
         >
           <Background gap={18} color="rgba(15, 23, 42, 0.08)" />
@@ -143,7 +184,11 @@ export default function ArchitectureMap({ repoId }: { repoId: string }) {
           <Controls />
         </ReactFlow>
       </div>
-      <NodeDrawer node={selected} onClose={() => setSelected(null)} />
+      <NodeDrawer
+        node={selected}
+        onClose={() => setSelected(null)}
+        onExplore={(node) => setFocus(node)}
+      />
     </div>
   );
 }
@@ -13,9 +13,11 @@ export type NodeDetails = {
 export default function NodeDrawer({
   node,
   onClose,
+  onExplore,
 }: {
   node: NodeDetails | null;
   onClose: () => void;
+  onExplore?: (node: NodeDetails) => void;
 }) {
   if (!node) {
     return null;
@@ -55,7 +57,15 @@ export default function NodeDrawer({
           <span className="font-semibold text-text">{node.out_degree}</span>
         </div>
       </div>
-      <button className="mt-6 w-full rounded-2xl bg-accent px-4 py-3 text-xs font-semibold text-white">
+      {onExplore ? (
+        <button
+          onClick={() => onExplore(node)}
+          className="mt-6 w-full rounded-2xl border border-border px-4 py-3 text-xs font-semibold text-text"
+        >
+          Show neighbourhood
+        </button>
+      ) : null}
+      <button className="mt-3 w-full rounded-2xl bg-accent px-4 py-3 text-xs font-semibold text-white">
         Explain this module
       </button>
     </div>
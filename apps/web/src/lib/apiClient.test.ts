@@ -1,6 +1,6 @@
 import { describe, expect, it, vi } from 'vitest';
 
-import { registerRepo } from './apiClient';
+import { getGraphNeighbourhood, registerRepo } from './apiClient';
 
 describe('apiClient', () => {
   it('posts to the register endpoint', async () => {
@@ -17,4 +17,19 @@ describe('apiClient', () => {
       expect.objectContaining({ method: 'POST' }),
     );
   });
+
+  it('requests a node neighbourhood with query parameters', async () => {
+    const fetchMock = vi.fn().mockResolvedValue({
+      ok: true,
+      json: async () => ({ nodes: [], edges: [], truncated: false }),
+    });
+    globalThis.fetch = fetchMock as unknown as typeof fetch;
+
+    await getGraphNeighbourhood(3, 42, { hops: 2, direction: 'in' });
+
+    expect(fetchMock).toHaveBeenCalledWith(
+      expect.stringContaining('/v1/graph/3/neighbourhood?node_id=42&hops=2&direction=in'),
+      expect.anything(),
+    );
+  });
 });
@@ -5,6 +5,15 @@ type RequestOptions = RequestInit & {
   json?: unknown;
 };
 
+export class ApiError extends Error {
+  constructor(
+    message: string,
+    readonly status: number,
+  ) {
+    super(message);
+  }
+}
+
 async function request<T>(path: string, options: RequestOptions = {}): Promise<T> {
   const response = await fetch(`${API_V1}${path}`, {
     ...options,
@@ -17,7 +26,7 @@ async function request<T>(path: string, options: RequestOptions = {}): Promise<T
 
   if (!response.ok) {
     const message = await response.text();
-    throw new Error(message || `Request failed: ${response.status}`);
+    throw new ApiError(message || `Request failed: ${response.status}`, response.status);
   }
 
   return (await response.json()) as T;
@@ -37,6 +46,8 @@ export type GraphNode = {
   loc: number;
   in_degree: number;
   out_degree: number;
+  x?: number | null;
+  y?: number | null;
 };
 
 export type GraphEdge = {
@@ -50,8 +61,45 @@ export type GraphEdge = {
 export type GraphResponse = {
   nodes: GraphNode[];
   edges: GraphEdge[];
+  truncated?: boolean;
+};
+
+export type GraphNodePage = {
+  nodes: GraphNode[];
+  version: number;
+  total: number;
+  next_cursor: string | null;
 };
 
+export type GraphEdgePage = {
+  edges: GraphEdge[];
+  version: number;
+  total: number;
+  next_cursor: string | null;
+};
+
+export type GraphExportRecord =
+  | { type: 'graph'; repo_id: number; version: number; nodes: number; edges: number }
+  | ({ type: 'node' } & GraphNode)
+  | ({ type: 'edge' } & GraphEdge);
+
+export type NeighbourhoodOptions = {
+  hops?: number;
+  direction?: 'in' | 'out' | 'both';
+  limit?: number;
+};
+
+function query(params: Record<string, string | number | undefined | null>) {
+  const search = new URLSearchParams();
+  for (const [key, value] of Object.entries(params)) {
+    if (value !== undefined && value !== null) {
+      search.set(key, String(value));
+    }
+  }
+  const encoded = search.toString();
+  return encoded ? `?${encoded}` : '';
+}
+
 export async function registerRepo(payload: { name: string; path: string }) {
   return request<RepoResponse>('/repos/register', {
     method: 'POST',
@@ -66,3 +114,57 @@ export async function getRepoStatus(repoId: number) {
 export async function getGraph(repoId: number) {
   return request<GraphResponse>(`/graph/${repoId}`);
 }
+
+export async function getGraphNeighbourhood(
+  repoId: number,
+  nodeId: number,
+  options: NeighbourhoodOptions = {},
+) {
+  return request<GraphResponse>(
+    `/graph/${repoId}/neighbourhood${query({ node_id: nodeId, ...options })}`,
+  );
+}
+
+export async function getGraphSubgraph(repoId: number, prefix: string, limit?: number) {
+  return request<GraphResponse>(`/graph/${repoId}/subgraph${query({ prefix, limit })}`);
+}
+
+export async function listGraphNodes(repoId: number, cursor?: string | null, limit?: number) {
+  return request<GraphNodePage>(`/graph/${repoId}/nodes${query({ cursor, limit })}`);
+}
+
+export async function listGraphEdges(repoId: number, cursor?: string | null, limit?: number) {
+  return request<GraphEdgePage>(`/graph/${repoId}/edges${query({ cursor, limit })}`);
+}
+
+export async function streamGraph(
+  repoId: number,
+  onRecord: (record: GraphExportRecord) => void,
+): Promise<void> {
+  const response = await fetch(`${API_V1}/graph/${repoId}/export`);
+  if (!response.ok || !response.body) {
+    const message = await response.text();
+    throw new ApiError(message || `Request failed: ${response.status}`, response.status);
+  }
+
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffered = '';
+  for (;;) {
+    const { done, value } = await reader.read();
+    buffered += decoder.decode(value, { stream: !done });
+    const lines = buffered.split('\n');
+    buffered = lines.pop() ?? '';
+    for (const line of lines) {
+      if (line) {
+        onRecord(JSON.parse(line) as GraphExportRecord);
+      }
+    }
+    if (done) {
+      break;
+    }
+  }
+  if (buffered) {
+    onRecord(JSON.parse(buffered) as GraphExportRecord);
+  }
+}
@@ -0,0 +1,73 @@
+import { describe, expect, it, vi } from 'vitest';
+
+import { loadGraphOverview } from './graphView';
+
+function respond(body: unknown, status = 200) {
+  return {
+    ok: status < 400,
+    status,
+    json: async () => body,
+    text: async () => JSON.stringify(body),
+  };
+}
+
+const node = (id: number) => ({ id, name: `n${id}`, path: `src/n${id}.ts`, kind: 'file' });
+const edge = (id: number) => ({ id, from_node_id: 1, to_node_id: id, kind: 'import' });
+
+describe('loadGraphOverview', () => {
+  it('pages nodes and edges by cursor', async () => {
+    const fetchMock = vi
+      .fn()
+      .mockResolvedValueOnce(
+        respond({ nodes: [node(1)], version: 4, total: 2, next_cursor: '4:1' }),
+      )
+      .mockResolvedValueOnce(respond({ nodes: [node(2)], version: 4, total: 2, next_cursor: null }))
+      .mockResolvedValueOnce(respond({ edges: [edge(2)], version: 4, total: 1, next_cursor: null }));
+    globalThis.fetch = fetchMock as unknown as typeof fetch;
+
+    const graph = await loadGraphOverview(7, '', 10);
+
+    expect(graph.nodes.map((item) => item.id)).toEqual([1, 2]);
+    expect(graph.edges.map((item) => item.id)).toEqual([2]);
+    expect(fetchMock).toHaveBeenNthCalledWith(
+      2,
+      expect.stringContaining('/v1/graph/7/nodes?cursor=4%3A1'),
+      expect.anything(),
+    );
+  });
+
+  it('restarts paging when the graph version changes', async () => {
+    const fetchMock = vi
+      .fn()
+      .mockResolvedValueOnce(
+        respond({ nodes: [node(1)], version: 4, total: 2, next_cursor: '4:1' }),
+      )
+      .mockResolvedValueOnce(respond({ detail: 'graph changed, restart paging' }, 409))
+      .mockResolvedValueOnce(respond({ nodes: [node(1)], version: 5, total: 1, next_cursor: null }))
+      .mockResolvedValueOnce(respond({ edges: [], version: 5, total: 0, next_cursor: null }));
+    globalThis.fetch = fetchMock as unknown as typeof fetch;
+
+    const graph = await loadGraphOverview(7, '', 10);
+
+    expect(graph.nodes.map((item) => item.id)).toEqual([1]);
+    expect(fetchMock).toHaveBeenCalledTimes(4);
+  });
+
+  it('falls back to a bounded subgraph for large graphs', async () => {
+    const fetchMock = vi
+      .fn()
+      .mockResolvedValueOnce(
+        respond({ nodes: [node(1)], version: 4, total: 50, next_cursor: '4:1' }),
+      )
+      .mockResolvedValueOnce(respond({ nodes: [node(1)], edges: [], truncated: true }));
+    globalThis.fetch = fetchMock as unknown as typeof fetch;
+
+    const graph = await loadGraphOverview(7, '', 10);
+
+    expect(graph.truncated).toBe(true);
+    expect(fetchMock).toHaveBeenLastCalledWith(
+      expect.stringContaining('/v1/graph/7/subgraph?prefix=&limit=10'),
+      expect.anything(),
+    );
+  });
+});
@@ -0,0 +1,75 @@
+import {
+  ApiError,
+  getGraphNeighbourhood,
+  getGraphSubgraph,
+  listGraphEdges,
+  listGraphNodes,
+  type GraphEdge,
+  type GraphNode,
+  type GraphResponse,
+} from '@/lib/apiClient';
+
+export const MAP_NODE_BUDGET = 1500;
+
+const NODE_PAGE_SIZE = 500;
+const EDGE_PAGE_SIZE = 2000;
+const MAX_RESTARTS = 3;
+
+class GraphChanged extends Error {}
+
+async function loadAllPages(repoId: number, budget: number): Promise<GraphResponse | null> {
+  const first = await listGraphNodes(repoId, null, NODE_PAGE_SIZE);
+  if (first.total > budget) {
+    return null;
+  }
+  const nodes: GraphNode[] = [...first.nodes];
+  let cursor = first.next_cursor;
+  while (cursor) {
+    const page = await listGraphNodes(repoId, cursor, NODE_PAGE_SIZE);
+    nodes.push(...page.nodes);
+    cursor = page.next_cursor;
+  }
+
+  const edges: GraphEdge[] = [];
+  let edgeCursor: string | null = null;
+  do {
+    const page = await listGraphEdges(repoId, edgeCursor, EDGE_PAGE_SIZE);
+    if (page.version !== first.version) {
+      throw new GraphChanged();
+    }
+    edges.push(...page.edges);
+    edgeCursor = page.next_cursor;
+  } while (edgeCursor);
+
+  return { nodes, edges, truncated: false };
+}
+
+export async function loadGraphOverview(
+  repoId: number,
+  prefix = '',
+  budget = MAP_NODE_BUDGET,
+): Promise<GraphResponse> {
+  if (prefix) {
+    return getGraphSubgraph(repoId, prefix, budget);
+  }
+  for (let attempt = 0; ; attempt += 1) {
+    try {
+      const paged = await loadAllPages(repoId, budget);
+      return paged ?? (await getGraphSubgraph(repoId, '', budget));
+    } catch (error) {
+      const changed =
+        error instanceof GraphChanged || (error instanceof ApiError && error.status === 409);
+      if (!changed || attempt >= MAX_RESTARTS) {
+        throw error;
+      }
+    }
+  }
+}
+
+export async function loadGraphNeighbourhood(
+  repoId: number,
+  nodeId: number,
+  budget = MAP_NODE_BUDGET,
+): Promise<GraphResponse> {
+  return getGraphNeighbourhood(repoId, nodeId, { hops: 2, direction: 'both', limit: budget });
+}
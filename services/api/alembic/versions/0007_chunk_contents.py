@@ -0,0 +1,118 @@
+"""content-addressed chunk store
+
+Revision ID: 0007_chunk_contents
+Revises: 0006_security
+Create Date: 2025-01-01 00:00:00.000000
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0007_chunk_contents"
+down_revision = "0006_security"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "chunk_contents",
+        sa.Column("sha", sa.String(), primary_key=True),
+        sa.Column("content", sa.Text(), nullable=False),
+        sa.Column("token_count", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+    )
+
+    op.add_column("chunks", sa.Column("content_sha", sa.String(), nullable=True))
+    op.execute("UPDATE chunks SET content_sha = encode(sha256(convert_to(content, 'UTF8')), 'hex')")
+    op.execute(
+        """
+        INSERT INTO chunk_contents (sha, content, token_count, created_at)
+        SELECT DISTINCT ON (content_sha) content_sha, content, token_count, created_at
+        FROM chunks
+        ORDER BY content_sha, id
+        """
+    )
+    op.drop_column("chunks", "content")
+    op.alter_column("chunks", "content_sha", existing_type=sa.String(), nullable=False)
+    op.create_foreign_key(
+        "fk_chunks_content_sha", "chunks", "chunk_contents", ["content_sha"], ["sha"]
+    )
+    op.create_index("ix_chunks_content_sha", "chunks", ["content_sha"])
+
+    op.add_column("embeddings", sa.Column("content_sha", sa.String(), nullable=True))
+    op.execute(
+        """
+        UPDATE embeddings SET content_sha = chunks.content_sha
+        FROM chunks
+        WHERE chunks.id = embeddings.chunk_id
+        """
+    )
+    op.execute(
+        """
+        DELETE FROM embeddings
+        WHERE id NOT IN (
+            SELECT MIN(id) FROM embeddings GROUP BY content_sha, provider, model
+        )
+        """
+    )
+    op.drop_index("ix_embeddings_chunk_id", table_name="embeddings")
+    op.drop_index("ix_embeddings_repo_id", table_name="embeddings")
+    op.drop_column("embeddings", "chunk_id")
+    op.drop_column("embeddings", "repo_id")
+    op.alter_column("embeddings", "content_sha", existing_type=sa.String(), nullable=False)
+    op.create_foreign_key(
+        "fk_embeddings_content_sha",
+        "embeddings",
+        "chunk_contents",
+        ["content_sha"],
+        ["sha"],
+        ondelete="CASCADE",
+    )
+    op.create_index("ix_embeddings_content_sha", "embeddings", ["content_sha"])
+    op.create_unique_constraint(
+        "uq_embeddings_content_provider_model",
+        "embeddings",
+        ["content_sha", "provider", "model"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint("uq_embeddings_content_provider_model", "embeddings", type_="unique")
+    op.drop_index("ix_embeddings_content_sha", table_name="embeddings")
+    op.drop_constraint("fk_embeddings_content_sha", "embeddings", type_="foreignkey")
+    op.add_column("embeddings", sa.Column("repo_id", sa.Integer(), nullable=True))
+    op.add_column("embeddings", sa.Column("chunk_id", sa.Integer(), nullable=True))
+    op.execute(
+        """
+        UPDATE embeddings SET chunk_id = first_chunk.id, repo_id = first_chunk.repo_id
+        FROM (
+            SELECT DISTINCT ON (content_sha) id, repo_id, content_sha
+            FROM chunks
+            ORDER BY content_sha, id
+        ) AS first_chunk
+        WHERE first_chunk.content_sha = embeddings.content_sha
+        """
+    )
+    op.execute("DELETE FROM embeddings WHERE chunk_id IS NULL")
+    op.alter_column("embeddings", "repo_id", existing_type=sa.Integer(), nullable=False)
+    op.alter_column("embeddings", "chunk_id", existing_type=sa.Integer(), nullable=False)
+    op.create_foreign_key(None, "embeddings", "repos", ["repo_id"], ["id"], ondelete="CASCADE")
+    op.create_foreign_key(None, "embeddings", "chunks", ["chunk_id"], ["id"], ondelete="CASCADE")
+    op.create_index("ix_embeddings_repo_id", "embeddings", ["repo_id"])
+    op.create_index("ix_embeddings_chunk_id", "embeddings", ["chunk_id"])
+    op.drop_column("embeddings", "content_sha")
+
+    op.add_column("chunks", sa.Column("content", sa.Text(), nullable=True))
+    op.execute(
+        """
+        UPDATE chunks SET content = chunk_contents.content
+        FROM chunk_contents
+        WHERE chunk_contents.sha = chunks.content_sha
+        """
+    )
+    op.alter_column("chunks", "content", existing_type=sa.Text(), nullable=False)
+    op.drop_index("ix_chunks_content_sha", table_name="chunks")
+    op.drop_constraint("fk_chunks_content_sha", "chunks", type_="foreignkey")
+    op.drop_column("chunks", "content_sha")
+    op.drop_table("chunk_contents")
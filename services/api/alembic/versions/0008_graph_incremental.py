@@ -0,0 +1,24 @@
+"""incremental graph builds
+
+Revision ID: 0008_graph_incremental
+Revises: 0007_chunk_contents
+Create Date: 2025-01-01 00:00:00.000000
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0008_graph_incremental"
+down_revision = "0007_chunk_contents"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("graph_nodes", sa.Column("file_sha", sa.String(), nullable=True))
+    op.add_column("graph_nodes", sa.Column("import_specs", sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("graph_nodes", "import_specs")
+    op.drop_column("graph_nodes", "file_sha")
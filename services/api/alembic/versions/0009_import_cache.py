@@ -0,0 +1,29 @@
+"""import extraction cache
+
+Revision ID: 0009_import_cache
+Revises: 0008_graph_incremental
+Create Date: 2025-01-01 00:00:00.000000
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0009_import_cache"
+down_revision = "0008_graph_incremental"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "import_cache",
+        sa.Column("language", sa.String(), primary_key=True),
+        sa.Column("content_sha", sa.String(), primary_key=True),
+        sa.Column("parser_version", sa.Integer(), primary_key=True),
+        sa.Column("specs", sa.JSON(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("import_cache")
@@ -0,0 +1,44 @@
+"""aggregate graph edges by endpoints
+
+Revision ID: 0010_graph_edge_weights
+Revises: 0009_import_cache
+Create Date: 2025-01-01 00:00:00.000000
+"""
+
+from alembic import op
+
+revision = "0010_graph_edge_weights"
+down_revision = "0009_import_cache"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute(
+        """
+        UPDATE graph_edges SET weight = grouped.total
+        FROM (
+            SELECT MIN(id) AS keep_id, SUM(weight) AS total
+            FROM graph_edges
+            GROUP BY from_node_id, to_node_id, kind
+        ) AS grouped
+        WHERE graph_edges.id = grouped.keep_id
+        """
+    )
+    op.execute(
+        """
+        DELETE FROM graph_edges
+        WHERE id NOT IN (
+            SELECT MIN(id) FROM graph_edges GROUP BY from_node_id, to_node_id, kind
+        )
+        """
+    )
+    op.create_unique_constraint(
+        "uq_graph_edges_from_to_kind",
+        "graph_edges",
+        ["from_node_id", "to_node_id", "kind"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint("uq_graph_edges_from_to_kind", "graph_edges", type_="unique")
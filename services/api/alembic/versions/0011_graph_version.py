@@ -0,0 +1,25 @@
+"""graph build version
+
+Revision ID: 0011_graph_version
+Revises: 0010_graph_edge_weights
+Create Date: 2025-01-01 00:00:00.000000
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0011_graph_version"
+down_revision = "0010_graph_edge_weights"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "repos",
+        sa.Column("graph_version", sa.Integer(), nullable=False, server_default="0"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("repos", "graph_version")
@@ -0,0 +1,34 @@
+"""graph reachability index
+
+Revision ID: 0012_graph_reachability
+Revises: 0011_graph_version
+Create Date: 2025-01-01 00:00:00.000000
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0012_graph_reachability"
+down_revision = "0011_graph_version"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("graph_nodes", sa.Column("component", sa.Integer(), nullable=True))
+    op.create_table(
+        "graph_components",
+        sa.Column(
+            "repo_id",
+            sa.Integer(),
+            sa.ForeignKey("repos.id", ondelete="CASCADE"),
+            primary_key=True,
+        ),
+        sa.Column("component", sa.Integer(), primary_key=True),
+        sa.Column("dependents", sa.LargeBinary(), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("graph_components")
+    op.drop_column("graph_nodes", "component")
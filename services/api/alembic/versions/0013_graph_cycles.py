@@ -0,0 +1,47 @@
+"""graph component sizes
+
+Revision ID: 0013_graph_cycles
+Revises: 0012_graph_reachability
+Create Date: 2025-01-01 00:00:00.000000
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0013_graph_cycles"
+down_revision = "0012_graph_reachability"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "graph_components",
+        sa.Column("size", sa.Integer(), nullable=False, server_default="1"),
+    )
+    op.alter_column("graph_components", "dependents", existing_type=sa.LargeBinary(), nullable=True)
+    op.execute(
+        """
+        UPDATE graph_components SET size = counts.total
+        FROM (
+            SELECT repo_id, component, COUNT(*) AS total
+            FROM graph_nodes
+            WHERE component IS NOT NULL
+            GROUP BY repo_id, component
+        ) AS counts
+        WHERE graph_components.repo_id = counts.repo_id
+          AND graph_components.component = counts.component
+        """
+    )
+    op.create_index("ix_graph_components_repo_id_size", "graph_components", ["repo_id", "size"])
+    op.create_index("ix_graph_nodes_repo_id_component", "graph_nodes", ["repo_id", "component"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_graph_nodes_repo_id_component", table_name="graph_nodes")
+    op.drop_index("ix_graph_components_repo_id_size", table_name="graph_components")
+    op.execute("DELETE FROM graph_components WHERE dependents IS NULL")
+    op.alter_column(
+        "graph_components", "dependents", existing_type=sa.LargeBinary(), nullable=False
+    )
+    op.drop_column("graph_components", "size")
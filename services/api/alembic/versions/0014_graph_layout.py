@@ -0,0 +1,24 @@
+"""precomputed graph layout
+
+Revision ID: 0014_graph_layout
+Revises: 0013_graph_cycles
+Create Date: 2025-01-01 00:00:00.000000
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0014_graph_layout"
+down_revision = "0013_graph_cycles"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("graph_nodes", sa.Column("layout_x", sa.Float(), nullable=True))
+    op.add_column("graph_nodes", sa.Column("layout_y", sa.Float(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("graph_nodes", "layout_y")
+    op.drop_column("graph_nodes", "layout_x")
@@ -0,0 +1,35 @@
+"""persistent co-change index
+
+Revision ID: 0015_cochange_index
+Revises: 0014_graph_layout
+Create Date: 2025-01-01 00:00:00.000000
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0015_cochange_index"
+down_revision = "0014_graph_layout"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("repos", sa.Column("cochange_commit", sa.String(), nullable=True))
+    op.create_table(
+        "cochange_pairs",
+        sa.Column(
+            "repo_id",
+            sa.Integer(),
+            sa.ForeignKey("repos.id", ondelete="CASCADE"),
+            primary_key=True,
+        ),
+        sa.Column("path", sa.String(), primary_key=True),
+        sa.Column("other_path", sa.String(), primary_key=True),
+        sa.Column("commits", sa.Integer(), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("cochange_pairs")
+    op.drop_column("repos", "cochange_commit")
@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+import argparse
+import ast
+import json
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from collections.abc import Callable
+from functools import partial
+from pathlib import Path
+from typing import Any
+
+from synthetic import SyntheticRepoSpec, generate_repo
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark per-file import extraction.")
+    parser.add_argument("--files", type=int, default=500)
+    parser.add_argument("--loc", type=int, default=120)
+    parser.add_argument("--fanout", type=int, default=4)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--output", type=Path, default=None)
+    parser.add_argument(
+        "--legacy",
+        action="store_true",
+        help="also time the old ast plus tree-sitter double parse for Python files",
+    )
+    return parser.parse_args()
+
+
+def legacy_python_imports(text: str, parser: Any) -> set[str]:
+    # The extractor before the single-parse change: a full ast.walk, then a second
+    # tree-sitter parse and walk whose results were unioned in.
+    imports: set[str] = set()
+    try:
+        tree = ast.parse(text)
+    except SyntaxError:
+        return imports
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            for alias in node.names:
+                imports.add(alias.name)
+        elif isinstance(node, ast.ImportFrom):
+            module = node.module or ""
+            prefix = "." * node.level
+            if module:
+                imports.add(f"{prefix}{module}")
+            elif prefix:
+                imports.add(prefix)
+    source = text.encode("utf-8")
+    imports.update(legacy_tree_imports(parser.parse(source).root_node, source))
+    return imports
+
+
+def legacy_tree_imports(node: Any, source: bytes) -> set[str]:
+    imports: set[str] = set()
+    if node.type == "import_statement":
+        source_node = node.child_by_field_name("source")
+        if source_node is not None:
+            imports.add(
+                source[source_node.start_byte : source_node.end_byte].decode().strip("'\"`")
+            )
+    if node.type == "call_expression":
+        function_node = node.child_by_field_name("function")
+        arguments = node.child_by_field_name("arguments")
+        if function_node is not None and arguments is not None:
+            name = source[function_node.start_byte : function_node.end_byte].decode()
+            if name in {"require", "import"}:
+                for child in arguments.children:
+                    if child.type == "string":
+                        imports.add(
+                            source[child.start_byte : child.end_byte].decode().strip("'\"`")
+                        )
+                        break
+    for child in node.children:
+        imports |= legacy_tree_imports(child, source)
+    return imports
+
+
+def time_per_file(extract: Callable[[str], set[str]], texts: list[str], rounds: int) -> list[float]:
+    samples = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        for text in texts:
+            extract(text)
+        samples.append((time.perf_counter() - started) / len(texts))
+    return samples
+
+
+def main() -> int:
+    args = parse_args()
+    sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+    from regulus_api.graph.parsers import extract_imports, get_parser
+    from regulus_api.indexing.indexer import infer_language
+
+    workdir = Path(tempfile.mkdtemp(prefix="regulus-bench-"))
+    try:
+        spec = SyntheticRepoSpec(files=args.files, loc=args.loc, fanout=args.fanout, git=False)
+        repo_path = generate_repo(workdir / "repo", spec)
+        sources: dict[str, list[str]] = {}
+        for path in sorted(repo_path.rglob("*.*")):
+            sources.setdefault(infer_language(path), []).append(path.read_text())
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    results: dict[str, Any] = {"spec": {"loc": args.loc, "fanout": args.fanout}, "languages": {}}
+    for language, texts in sorted(sources.items()):
+        samples = time_per_file(partial(extract_imports, language), texts, args.rounds)
+        metrics: dict[str, Any] = {
+            "files": len(texts),
+            "us_per_file": round(statistics.median(samples) * 1_000_000, 1),
+            "us_per_file_min": round(min(samples) * 1_000_000, 1),
+        }
+        if args.legacy and language == "python":
+            parser = get_parser("python")
+            legacy = time_per_file(
+                partial(legacy_python_imports, parser=parser), texts, args.rounds
+            )
+            metrics["legacy_us_per_file"] = round(statistics.median(legacy) * 1_000_000, 1)
+            metrics["speedup"] = round(statistics.median(legacy) / statistics.median(samples), 2)
+            metrics["legacy_mismatches"] = sum(
+                legacy_python_imports(text, parser) != extract_imports(language, text)
+                for text in texts
+            )
+        results["languages"][language] = metrics
+        print(f"{language:<11} {json.dumps(metrics)}")
+
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2) + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
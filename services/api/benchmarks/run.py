@@ -0,0 +1,248 @@
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import multiprocessing
+import os
+import resource
+import shutil
+import sys
+import tempfile
+import time
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict
+from pathlib import Path
+from typing import Any
+
+from synthetic import SyntheticRepoSpec, generate_repo
+
+STAGES = ("scan", "index", "graph", "embeddings")
+EMBEDDING_DIM = 1536
+RSS_SLACK_MB = 8.0
+
+
+class HashEmbeddingProvider:
+    # Deterministic vectors so the embeddings stage measures pipeline cost, not a model.
+    name = "bench"
+    model = "sha256"
+    dim = EMBEDDING_DIM
+
+    def embed(self, texts: list[str]) -> list[list[float]]:
+        vectors = []
+        for text in texts:
+            digest = hashlib.sha256(text.encode("utf-8")).digest()
+            values = [byte / 255.0 for byte in digest]
+            vectors.append((values * (EMBEDDING_DIM // len(values) + 1))[:EMBEDDING_DIM])
+        return vectors
+
+
+def peak_rss_mb() -> float:
+    scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return round(max(own, children) / scale, 1)
+
+
+def stage_entry_point(stage: str) -> Callable[..., Any]:
+    # Only the stage's own modules are imported, so `scan` never loads the model stack.
+    if stage == "scan":
+        from regulus_api.indexing.indexer import index_repository
+
+        return index_repository
+    if stage == "graph":
+        from regulus_api.graph.builder import build_dependency_graph
+
+        return build_dependency_graph
+    from regulus_api.jobs import tasks
+
+    if stage == "index":
+        return tasks.index_repo
+    tasks.get_embedding_provider = HashEmbeddingProvider  # type: ignore[assignment]
+    return tasks.build_embeddings
+
+
+def run_stage(stage: str, repo_path: str, repo_id: int, workers: int) -> dict[str, Any]:
+    entry_point = stage_entry_point(stage)
+    # Spawned children default to spawn; nested pools should fork like the RQ worker does.
+    if "fork" in multiprocessing.get_all_start_methods():
+        multiprocessing.set_start_method("fork", force=True)
+    # Taken after the imports, so growth is what the stage itself allocates.
+    baseline_rss = peak_rss_mb()
+    started = time.perf_counter()
+    files = chunks = rows = 0
+    if stage == "scan":
+        records = entry_point(Path(repo_path), workers=workers)
+        files = len(records)
+        chunks = sum(len(record.chunks) for record in records)
+    elif stage == "index":
+        result = entry_point(repo_id)
+        files, chunks, rows = result["files"], result["chunks"], result["rows_written"]
+    elif stage == "graph":
+        result = entry_point(repo_id)
+        files = result["nodes"]
+        rows = result["nodes"] + result["edges"]
+    elif stage == "embeddings":
+        result = entry_point(repo_id)
+        chunks = rows = result["embeddings"]
+    seconds = time.perf_counter() - started
+    peak_rss = peak_rss_mb()
+
+    return {
+        "seconds": round(seconds, 3),
+        "files": files,
+        "chunks": chunks,
+        "rows_written": rows,
+        "files_per_sec": round(files / seconds, 1) if seconds else 0.0,
+        "chunks_per_sec": round(chunks / seconds, 1) if seconds else 0.0,
+        "rows_per_sec": round(rows / seconds, 1) if seconds else 0.0,
+        "import_rss_mb": baseline_rss,
+        "peak_rss_mb": peak_rss,
+        "rss_growth_mb": round(max(peak_rss - baseline_rss, 0.0), 1),
+    }
+
+
+def run_isolated(stage: str, repo_path: Path, repo_id: int, workers: int) -> dict[str, Any]:
+    # Each stage runs in a fresh process so peak RSS is attributable to that stage alone.
+    # Executor workers are not daemonic, so stages can start their own process pools.
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+        future = executor.submit(run_stage, stage, str(repo_path), repo_id, workers)
+        result: dict[str, Any] = future.result()
+    return result
+
+
+def register_repo(repo_path: Path) -> int:
+    from sqlmodel import Session, SQLModel
+
+    from regulus_api.db.models import Repo
+    from regulus_api.db.session import engine
+
+    if engine.dialect.name == "sqlite":
+        SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        repo = Repo(name=f"bench-{repo_path.name}", path=str(repo_path))
+        session.add(repo)
+        session.commit()
+        session.refresh(repo)
+        if repo.id is None:
+            raise RuntimeError("failed to register benchmark repo")
+        return repo.id
+
+
+def drop_repo(repo_id: int) -> None:
+    from sqlmodel import Session, col, delete, select
+
+    from regulus_api.db.models import Chunk, File, GraphEdge, GraphNode, Repo
+    from regulus_api.db.session import engine
+    from regulus_api.indexing.writer import prune_chunk_contents
+
+    with Session(engine) as session:
+        shas = set(
+            session.exec(select(Chunk.content_sha).where(Chunk.repo_id == repo_id).distinct())
+        )
+        for model in (GraphEdge, GraphNode, Chunk, File):
+            session.exec(delete(model).where(col(model.repo_id) == repo_id))
+        session.exec(delete(Repo).where(col(Repo.id) == repo_id))
+        prune_chunk_contents(session, shas)
+        session.commit()
+
+
+def compare(current: dict[str, Any], baseline: dict[str, Any], tolerance: float) -> list[str]:
+    regressions = []
+    for stage, metrics in current["stages"].items():
+        previous = baseline.get("stages", {}).get(stage)
+        if not previous or not previous.get("seconds"):
+            continue
+        flagged = []
+        ratio = metrics["seconds"] / previous["seconds"]
+        if ratio > 1 + tolerance:
+            flagged.append("seconds")
+        # Small stages wobble by a few MB, so RSS gets an absolute allowance on top.
+        growth = previous.get("rss_growth_mb")
+        if (
+            growth is not None
+            and metrics["rss_growth_mb"] > growth * (1 + tolerance) + RSS_SLACK_MB
+        ):
+            flagged.append("rss")
+        rows_per_sec = previous.get("rows_per_sec")
+        if rows_per_sec and metrics["rows_per_sec"] < rows_per_sec * (1 - tolerance):
+            flagged.append("rows/sec")
+        print(
+            f"{stage:<11} {previous['seconds']:>9.3f}s -> {metrics['seconds']:>9.3f}s "
+            f"({ratio:5.2f}x) rss +{growth or 0.0:>7.1f} -> "
+            f"+{metrics['rss_growth_mb']:>7.1f} MB  rows/s {rows_per_sec or 0:>9.1f} -> "
+            f"{metrics['rows_per_sec']:>9.1f}  "
+            f"{'REGRESSION (' + ', '.join(flagged) + ')' if flagged else 'ok'}"
+        )
+        if flagged:
+            regressions.append(stage)
+    return regressions
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark Regulus indexing and graph stages.")
+    parser.add_argument("--files", type=int, default=1000)
+    parser.add_argument("--loc", type=int, default=120)
+    parser.add_argument("--fanout", type=int, default=4)
+    parser.add_argument("--typescript-ratio", type=float, default=0.5)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--stages", default=",".join(STAGES))
+    parser.add_argument(
+        "--database-url",
+        default=None,
+        help="run DB stages against this database (default: a throwaway SQLite file)",
+    )
+    parser.add_argument("--output", type=Path, default=None)
+    parser.add_argument("--baseline", type=Path, default=None)
+    parser.add_argument("--tolerance", type=float, default=0.15)
+    parser.add_argument("--keep", action="store_true", help="keep generated repo and DB rows")
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+    workdir = Path(tempfile.mkdtemp(prefix="regulus-bench-"))
+    os.environ["DATABASE_URL"] = args.database_url or f"sqlite:///{workdir / 'bench.db'}"
+    os.environ.setdefault("REDIS_URL", "redis://localhost:6379/0")
+    os.environ["REGULUS_INDEX_WORKERS"] = str(args.workers)
+    os.environ["REGULUS_GRAPH_WORKERS"] = str(args.workers)
+
+    spec = SyntheticRepoSpec(
+        files=args.files,
+        loc=args.loc,
+        fanout=args.fanout,
+        typescript_ratio=args.typescript_ratio,
+        seed=args.seed,
+    )
+    repo_path = generate_repo(workdir / "repo", spec)
+    stages = [stage for stage in args.stages.split(",") if stage in STAGES]
+    repo_id = register_repo(repo_path) if set(stages) - {"scan"} else 0
+
+    results: dict[str, Any] = {"spec": asdict(spec), "workers": args.workers, "stages": {}}
+    try:
+        for stage in stages:
+            metrics = run_isolated(stage, repo_path, repo_id, args.workers)
+            results["stages"][stage] = metrics
+            print(f"{stage:<11} {json.dumps(metrics)}")
+    finally:
+        if not args.keep:
+            if repo_id:
+                drop_repo(repo_id)
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2) + "\n")
+    if args.baseline and args.baseline.exists():
+        regressions = compare(results, json.loads(args.baseline.read_text()), args.tolerance)
+        if regressions:
+            print(f"regressed stages: {', '.join(regressions)}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import random
+import subprocess
+from dataclasses import dataclass
+from pathlib import Path
+
+
+@dataclass
+class SyntheticRepoSpec:
+    files: int = 1000
+    loc: int = 120
+    fanout: int = 4
+    typescript_ratio: float = 0.5
+    packages: int = 20
+    seed: int = 7
+    git: bool = True
+
+
+def module_location(index: int, spec: SyntheticRepoSpec) -> tuple[str, Path]:
+    language = "typescript" if index < int(spec.files * spec.typescript_ratio) else "python"
+    package = index % max(spec.packages, 1)
+    if language == "typescript":
+        return language, Path("web") / f"dir{package}" / f"mod{index}.ts"
+    return language, Path("app") / f"pkg{package}" / f"mod{index}.py"
+
+
+def python_module(index: int, targets: list[Path], spec: SyntheticRepoSpec) -> str:
+    lines = [
+        f"from {target.with_suffix('').as_posix().replace('/', '.')} import value{target.stem[3:]}"
+        for target in targets
+    ]
+    lines.append("")
+    body = max(spec.loc - len(lines), 1)
+    lines.append(f"def value{index}(count: int = {index}) -> int:")
+    for line in range(body - 2):
+        lines.append(f"    count = (count * {line + 3} + {index}) % 1000003")
+    lines.append("    return count")
+    return "\n".join(lines) + "\n"
+
+
+def typescript_module(
+    index: int, source: Path, targets: list[Path], spec: SyntheticRepoSpec
+) -> str:
+    lines = []
+    for target in targets:
+        spec_path = f"../{target.parent.name}/{target.stem}"
+        if target.parent == source.parent:
+            spec_path = f"./{target.stem}"
+        lines.append(f"import {{ value{target.stem[3:]} }} from '{spec_path}'")
+    lines.append("")
+    body = max(spec.loc - len(lines), 1)
+    lines.append(f"export function value{index}(count: number = {index}): number {{")
+    for line in range(body - 2):
+        lines.append(f"  count = (count * {line + 3} + {index}) % 1000003")
+    lines.append("  return count")
+    lines.append("}")
+    return "\n".join(lines) + "\n"
+
+
+def generate_repo(root: Path, spec: SyntheticRepoSpec) -> Path:
+    rng = random.Random(spec.seed)
+    locations = [module_location(index, spec) for index in range(spec.files)]
+    by_language: dict[str, list[int]] = {}
+    for index, (language, _) in enumerate(locations):
+        by_language.setdefault(language, []).append(index)
+
+    for index, (language, relative) in enumerate(locations):
+        peers = [peer for peer in by_language[language] if peer != index]
+        chosen = rng.sample(peers, min(spec.fanout, len(peers)))
+        targets = [locations[peer][1] for peer in chosen]
+        path = root / relative
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if language == "typescript":
+            path.write_text(typescript_module(index, relative, targets, spec))
+        else:
+            path.write_text(python_module(index, targets, spec))
+
+    for package in range(max(spec.packages, 1)):
+        init = root / "app" / f"pkg{package}" / "__init__.py"
+        if init.parent.exists():
+            init.write_text("")
+    if (root / "app").exists():
+        (root / "app" / "__init__.py").write_text("")
+
+    if spec.git:
+        git = ["git", "-C", str(root)]
+        subprocess.run([*git, "init", "-q"], check=True)
+        subprocess.run([*git, "add", "."], check=True)
+        subprocess.run(
+            [
+                *git,
+                "-c",
+                "user.name=bench",
+                "-c",
+                "user.email=bench@localhost",
+                "commit",
+                "-qm",
+                "synthetic",
+            ],
+            check=True,
+        )
+    return root
@@ -1,9 +1,12 @@
 from __future__ import annotations
 
-from fastapi import APIRouter
+from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
+from redis.exceptions import RedisError
 
+from regulus_api.blast.cache import blast_cache_stats
 from regulus_api.blast.engine import predict_blast_radius
+from regulus_api.jobs.queue import get_redis_connection
 
 router = APIRouter()
 
@@ -25,6 +28,13 @@ class BlastResponse(BaseModel):
     tests: list[str]
 
 
+class BlastCacheStats(BaseModel):
+    hits: int
+    misses: int
+    hit_rate: float
+    entries: int
+
+
 @router.post("/blast", response_model=BlastResponse)
 def blast(payload: BlastRequest) -> BlastResponse:
     result = predict_blast_radius(payload.repo_id, payload.changed_files)
@@ -32,3 +42,12 @@ def blast(payload: BlastRequest) -> BlastResponse:
         impacts=[BlastImpact(**impact) for impact in result["impacts"]],
         tests=result["tests"],
     )
+
+
+@router.get("/blast/cache/{repo_id}", response_model=BlastCacheStats)
+def blast_cache(repo_id: int) -> BlastCacheStats:
+    try:
+        stats = blast_cache_stats(get_redis_connection(), repo_id)
+    except RedisError as exc:
+        raise HTTPException(status_code=503, detail="blast cache unavailable") from exc
+    return BlastCacheStats(**stats)
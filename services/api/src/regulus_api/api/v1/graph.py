@@ -2,12 +2,15 @@ from __future__ import annotations
 
 from collections import defaultdict
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, ConfigDict
-from sqlmodel import Session, select
+from sqlmodel import Session, col, select
 
-from regulus_api.db.models import GraphEdge, GraphNode, Repo
+from regulus_api.db.models import GraphComponent, GraphNode, Repo
 from regulus_api.db.session import get_session
+from regulus_api.graph.cache import RepoGraph, get_repo_graph
+from regulus_api.graph.export import iter_graph_ndjson
 from regulus_api.jobs.queue import get_queue
 from regulus_api.jobs.tasks import build_graph
 
@@ -29,6 +32,8 @@ class GraphNodeOut(BaseModel):
     loc: int
     in_degree: int
     out_degree: int
+    x: float | None = None
+    y: float | None = None
 
 
 class GraphEdgeOut(BaseModel):
@@ -44,6 +49,32 @@ class GraphEdgeOut(BaseModel):
 class GraphResponse(BaseModel):
     nodes: list[GraphNodeOut]
     edges: list[GraphEdgeOut]
+    truncated: bool = False
+
+
+class GraphNodePage(BaseModel):
+    nodes: list[GraphNodeOut]
+    version: int
+    total: int
+    next_cursor: str | None = None
+
+
+class GraphEdgePage(BaseModel):
+    edges: list[GraphEdgeOut]
+    version: int
+    total: int
+    next_cursor: str | None = None
+
+
+class GraphCycleOut(BaseModel):
+    component: int
+    size: int
+    node_ids: list[int]
+    names: list[str]
+
+
+class GraphCyclesResponse(BaseModel):
+    cycles: list[GraphCycleOut]
 
 
 @router.post(
@@ -52,55 +83,205 @@ class GraphResponse(BaseModel):
     status_code=status.HTTP_202_ACCEPTED,
 )
 def enqueue_graph_build(
-    repo_id: int, session: Session = Depends(get_session)
+    repo_id: int,
+    incremental: bool = Query(default=False),
+    session: Session = Depends(get_session),
 ) -> JobEnqueueResponse:
     repo = session.get(Repo, repo_id)
     if not repo:
         raise HTTPException(status_code=404, detail="repo not found")
     queue = get_queue()
-    job = queue.enqueue(build_graph, repo_id)
+    job = queue.enqueue(build_graph, repo_id, incremental=incremental)
     return JobEnqueueResponse(job_id=job.id, status="queued")
 
 
+def node_out(graph: RepoGraph, index: int) -> GraphNodeOut:
+    x, y = graph.position(index)
+    return GraphNodeOut(
+        id=graph.node_ids[index],
+        name=graph.names[index],
+        path=graph.paths[index],
+        kind=graph.kinds[index],
+        loc=graph.locs[index],
+        in_degree=graph.in_degree(index),
+        out_degree=graph.out_degree(index),
+        x=x,
+        y=y,
+    )
+
+
+def edge_out(graph: RepoGraph, source: int, position: int) -> GraphEdgeOut:
+    return GraphEdgeOut(
+        id=graph.forward_edge_ids[position],
+        from_node_id=graph.node_ids[source],
+        to_node_id=graph.node_ids[graph.forward_targets[position]],
+        kind=graph.edge_kinds[position],
+        weight=graph.forward_weights[position],
+    )
+
+
+def subgraph_response(graph: RepoGraph, indexes: list[int], truncated: bool) -> GraphResponse:
+    return GraphResponse(
+        nodes=[node_out(graph, index) for index in indexes],
+        edges=[
+            edge_out(graph, source, position) for source, position in graph.edges_within(indexes)
+        ],
+        truncated=truncated,
+    )
+
+
+def require_graph(session: Session, repo_id: int) -> RepoGraph:
+    graph = get_repo_graph(session, repo_id)
+    if graph is None:
+        raise HTTPException(status_code=404, detail="repo not found")
+    return graph
+
+
+def cursor_offset(graph: RepoGraph, cursor: str | None) -> int:
+    # Cursors pin the graph version, so a client walking nodes and edges never mixes builds.
+    if cursor is None:
+        return 0
+    version, _, offset = cursor.partition(":")
+    if not version.isdigit() or not offset.isdigit():
+        raise HTTPException(status_code=400, detail="invalid cursor")
+    if int(version) != graph.version:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT, detail="graph changed, restart paging"
+        )
+    return int(offset)
+
+
+def next_page_cursor(graph: RepoGraph, stop: int, total: int) -> str | None:
+    return f"{graph.version}:{stop}" if stop < total else None
+
+
 @router.get("/graph/{repo_id}", response_model=GraphResponse)
 def get_graph(repo_id: int, session: Session = Depends(get_session)) -> GraphResponse:
-    nodes = session.exec(select(GraphNode).where(GraphNode.repo_id == repo_id)).all()
-    edges = session.exec(select(GraphEdge).where(GraphEdge.repo_id == repo_id)).all()
-
-    in_degree: dict[int, int] = defaultdict(int)
-    out_degree: dict[int, int] = defaultdict(int)
-    for edge in edges:
-        out_degree[edge.from_node_id] += 1
-        in_degree[edge.to_node_id] += 1
-
-    node_out: list[GraphNodeOut] = []
-    for node in nodes:
-        if node.id is None:
-            continue
-        node_out.append(
-            GraphNodeOut(
-                id=node.id,
-                name=node.name,
-                path=node.path,
-                kind=node.kind,
-                loc=node.loc,
-                in_degree=in_degree.get(node.id, 0),
-                out_degree=out_degree.get(node.id, 0),
-            )
-        )
+    graph = get_repo_graph(session, repo_id)
+    if graph is None:
+        return GraphResponse(nodes=[], edges=[])
+
+    return subgraph_response(graph, list(range(graph.node_count)), truncated=False)
+
+
+@router.get("/graph/{repo_id}/export")
+def export_graph(repo_id: int, session: Session = Depends(get_session)) -> StreamingResponse:
+    graph = require_graph(session, repo_id)
+    return StreamingResponse(
+        iter_graph_ndjson(graph),
+        media_type="application/x-ndjson",
+        headers={"X-Graph-Version": str(graph.version)},
+    )
+
 
-    edge_out: list[GraphEdgeOut] = []
-    for edge in edges:
-        if edge.id is None:
-            continue
-        edge_out.append(
-            GraphEdgeOut(
-                id=edge.id,
-                from_node_id=edge.from_node_id,
-                to_node_id=edge.to_node_id,
-                kind=edge.kind,
-                weight=edge.weight,
+@router.get("/graph/{repo_id}/neighbourhood", response_model=GraphResponse)
+def get_graph_neighbourhood(
+    repo_id: int,
+    node_id: int,
+    hops: int = Query(default=1, ge=1, le=5),
+    direction: str = Query(default="both", pattern="^(in|out|both)$"),
+    limit: int = Query(default=500, ge=1, le=5000),
+    session: Session = Depends(get_session),
+) -> GraphResponse:
+    graph = require_graph(session, repo_id)
+    start = graph.index_by_node.get(node_id)
+    if start is None:
+        raise HTTPException(status_code=404, detail="node not found")
+    indexes, truncated = graph.neighbourhood(start, hops, direction, limit)
+    return subgraph_response(graph, indexes, truncated)
+
+
+@router.get("/graph/{repo_id}/subgraph", response_model=GraphResponse)
+def get_graph_subgraph(
+    repo_id: int,
+    prefix: str = Query(default=""),
+    limit: int = Query(default=2000, ge=1, le=20000),
+    session: Session = Depends(get_session),
+) -> GraphResponse:
+    graph = require_graph(session, repo_id)
+    prefix = prefix.strip("/")
+    matches = [
+        index
+        for index, name in enumerate(graph.names)
+        if not prefix or name == prefix or name.startswith(f"{prefix}/")
+    ]
+    return subgraph_response(graph, matches[:limit], truncated=len(matches) > limit)
+
+
+@router.get("/graph/{repo_id}/nodes", response_model=GraphNodePage)
+def list_graph_nodes(
+    repo_id: int,
+    cursor: str | None = Query(default=None),
+    limit: int = Query(default=500, ge=1, le=5000),
+    session: Session = Depends(get_session),
+) -> GraphNodePage:
+    graph = require_graph(session, repo_id)
+    start = cursor_offset(graph, cursor)
+    stop = min(start + limit, graph.node_count)
+    return GraphNodePage(
+        nodes=[node_out(graph, index) for index in range(start, stop)],
+        version=graph.version,
+        total=graph.node_count,
+        next_cursor=next_page_cursor(graph, stop, graph.node_count),
+    )
+
+
+@router.get("/graph/{repo_id}/edges", response_model=GraphEdgePage)
+def list_graph_edges(
+    repo_id: int,
+    cursor: str | None = Query(default=None),
+    limit: int = Query(default=2000, ge=1, le=20000),
+    session: Session = Depends(get_session),
+) -> GraphEdgePage:
+    # Served from the same cached arrays as the node pages, ordered by source node.
+    graph = require_graph(session, repo_id)
+    start = cursor_offset(graph, cursor)
+    stop = min(start + limit, graph.edge_count)
+    return GraphEdgePage(
+        edges=[
+            edge_out(graph, source, position) for source, position in graph.edge_slice(start, stop)
+        ],
+        version=graph.version,
+        total=graph.edge_count,
+        next_cursor=next_page_cursor(graph, stop, graph.edge_count),
+    )
+
+
+@router.get("/graph/{repo_id}/cycles", response_model=GraphCyclesResponse)
+def get_graph_cycles(
+    repo_id: int,
+    min_size: int = Query(default=2, ge=2),
+    limit: int = Query(default=50, ge=1, le=500),
+    session: Session = Depends(get_session),
+) -> GraphCyclesResponse:
+    components = session.exec(
+        select(GraphComponent.component, GraphComponent.size)
+        .where(GraphComponent.repo_id == repo_id, GraphComponent.size >= min_size)
+        .order_by(col(GraphComponent.size).desc(), col(GraphComponent.component))
+        .limit(limit)
+    ).all()
+    members: dict[int, list[tuple[int, str]]] = defaultdict(list)
+    if components:
+        rows = session.exec(
+            select(GraphNode.component, GraphNode.id, GraphNode.name)
+            .where(
+                GraphNode.repo_id == repo_id,
+                col(GraphNode.component).in_([component for component, _ in components]),
             )
-        )
+            .order_by(col(GraphNode.name))
+        ).all()
+        for component, node_id, name in rows:
+            if component is not None and node_id is not None:
+                members[component].append((node_id, name))
 
-    return GraphResponse(nodes=node_out, edges=edge_out)
+    return GraphCyclesResponse(
+        cycles=[
+            GraphCycleOut(
+                component=component,
+                size=size,
+                node_ids=[node_id for node_id, _ in members[component]],
+                names=[name for _, name in members[component]],
+            )
+            for component, size in components
+        ]
+    )
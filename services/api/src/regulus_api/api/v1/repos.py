@@ -3,7 +3,7 @@ from __future__ import annotations
 from datetime import datetime
 from pathlib import Path
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from pydantic import BaseModel, ConfigDict
 from sqlmodel import Session, select
 
@@ -85,10 +85,14 @@ def repo_status(repo_id: int, session: Session = Depends(get_session)) -> Repo:
 @router.post(
     "/{repo_id}/index", response_model=JobEnqueueResponse, status_code=status.HTTP_202_ACCEPTED
 )
-def enqueue_index(repo_id: int, session: Session = Depends(get_session)) -> JobEnqueueResponse:
+def enqueue_index(
+    repo_id: int,
+    incremental: bool = Query(default=False),
+    session: Session = Depends(get_session),
+) -> JobEnqueueResponse:
     repo = session.get(Repo, repo_id)
     if not repo:
         raise HTTPException(status_code=404, detail="repo not found")
     queue = get_queue()
-    job = queue.enqueue(index_repo, repo_id)
+    job = queue.enqueue(index_repo, repo_id, incremental=incremental)
     return JobEnqueueResponse(job_id=job.id, status="queued")
@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import hashlib
+import json
+from typing import Any
+
+from redis import Redis
+from redis.exceptions import RedisError
+
+from regulus_api.jobs.queue import get_redis_connection
+
+BLAST_CACHE_PREFIX = "regulus:blast"
+
+
+def blast_cache_key(
+    repo_id: int, graph_version: int, commit: str | None, changed_files: list[str]
+) -> str:
+    digest = hashlib.sha256("\n".join(sorted(set(changed_files))).encode()).hexdigest()
+    return f"{BLAST_CACHE_PREFIX}:{repo_id}:{graph_version}:{commit or 'none'}:{digest}"
+
+
+def entries_key(repo_id: int) -> str:
+    return f"{BLAST_CACHE_PREFIX}:{repo_id}:entries"
+
+
+def stats_key(repo_id: int) -> str:
+    return f"{BLAST_CACHE_PREFIX}:{repo_id}:stats"
+
+
+# Redis is an accelerator here: any failure degrades to an uncached computation.
+def load_blast_result(redis: Redis, repo_id: int, key: str) -> dict[str, Any] | None:
+    try:
+        payload = redis.get(key)
+        redis.hincrby(stats_key(repo_id), "hits" if payload is not None else "misses", 1)
+    except RedisError:
+        return None
+    if payload is None:
+        return None
+    result: dict[str, Any] = json.loads(payload)
+    return result
+
+
+def store_blast_result(
+    redis: Redis, repo_id: int, key: str, result: dict[str, Any], ttl_seconds: int
+) -> None:
+    try:
+        pipeline = redis.pipeline()
+        pipeline.set(key, json.dumps(result), ex=ttl_seconds)
+        pipeline.sadd(entries_key(repo_id), key)
+        pipeline.expire(entries_key(repo_id), ttl_seconds)
+        pipeline.execute()
+    except RedisError:
+        return
+
+
+def invalidate_blast_results(repo_id: int, redis: Redis | None = None) -> int:
+    try:
+        redis = redis or get_redis_connection()
+        keys = list(redis.smembers(entries_key(repo_id)))
+        redis.delete(entries_key(repo_id), *keys)
+    except RedisError:
+        return 0
+    return len(keys)
+
+
+def blast_cache_stats(redis: Redis, repo_id: int) -> dict[str, Any]:
+    stats = {
+        key.decode() if isinstance(key, bytes) else key: int(value)
+        for key, value in redis.hgetall(stats_key(repo_id)).items()
+    }
+    hits = stats.get("hits", 0)
+    misses = stats.get("misses", 0)
+    lookups = hits + misses
+    return {
+        "hits": hits,
+        "misses": misses,
+        "hit_rate": round(hits / lookups, 3) if lookups else 0.0,
+        "entries": int(redis.scard(entries_key(repo_id))),
+    }
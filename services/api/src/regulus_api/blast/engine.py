@@ -1,16 +1,18 @@
 from __future__ import annotations
 
-from collections import defaultdict, deque
 from pathlib import Path
 from typing import Any, cast
 
-from sqlmodel import Session, select
+from sqlmodel import Session
 
-from regulus_api.blast.history import collect_cochanges
+from regulus_api.blast.cache import blast_cache_key, load_blast_result, store_blast_result
+from regulus_api.blast.history import collect_cochanges, load_cochanges
 from regulus_api.blast.tests import suggest_tests
+from regulus_api.core.config import get_settings
 from regulus_api.db.models import File, GraphEdge, GraphNode, Repo
 from regulus_api.db.session import engine
-from regulus_api.metrics.calculations import compute_centrality
+from regulus_api.graph.cache import RepoGraph, get_repo_graph, graph_from_models
+from regulus_api.jobs.queue import get_redis_connection
 
 
 def predict_blast_radius(repo_id: int, changed_files: list[str]) -> dict:
@@ -18,12 +20,36 @@ def predict_blast_radius(repo_id: int, changed_files: list[str]) -> dict:
         repo = session.get(Repo, repo_id)
         if repo is None:
             raise ValueError(f"repo {repo_id} not found")
-        files = list(session.exec(select(File).where(File.repo_id == repo_id)).all())
-        nodes = list(session.exec(select(GraphNode).where(GraphNode.repo_id == repo_id)).all())
-        edges = list(session.exec(select(GraphEdge).where(GraphEdge.repo_id == repo_id)).all())
+        repo_root = Path(repo.path).resolve()
+        graph_version = repo.graph_version
+        cochange_commit = repo.cochange_commit
 
-    repo_root = Path(repo.path).resolve()
-    return compute_blast_radius(repo_root, changed_files, files, nodes, edges)
+    changed_rel = normalize_paths(changed_files, repo_root)
+    # The graph version and the commit the co-change index reached pin every input, so
+    # identical requests reuse the result without loading the graph at all.
+    ttl_seconds = get_settings().blast_cache_ttl_seconds
+    redis = get_redis_connection() if ttl_seconds > 0 else None
+    key = blast_cache_key(repo_id, graph_version, cochange_commit, changed_rel)
+    if redis is not None:
+        cached = load_blast_result(redis, repo_id, key)
+        if cached is not None:
+            return cached
+
+    with Session(engine) as session:
+        graph = get_repo_graph(session, repo_id)
+    if graph is None:
+        raise ValueError(f"repo {repo_id} not found")
+    if graph.version != graph_version:
+        # A rebuild landed in between; store under the version actually computed from.
+        key = blast_cache_key(repo_id, graph.version, cochange_commit, changed_rel)
+
+    # The pair index is advanced by the index job; the request only reads it.
+    with Session(engine) as session:
+        cochange_counts = load_cochanges(session, repo_id, set(changed_rel))
+    result = blast_radius_from_graph(changed_rel, graph, cochange_counts)
+    if redis is not None:
+        store_blast_result(redis, repo_id, key, result, ttl_seconds)
+    return result
 
 
 def compute_blast_radius(
@@ -33,81 +59,64 @@ def compute_blast_radius(
     nodes: list[GraphNode],
     edges: list[GraphEdge],
 ) -> dict:
-    file_by_rel: dict[str, File] = {}
-    rel_by_file_id: dict[int, str] = {}
-    for file in files:
-        if file.id is None:
-            continue
-        try:
-            relative = Path(file.path).resolve().relative_to(repo_root).as_posix()
-        except ValueError:
-            relative = Path(file.path).name
-        file_by_rel[relative] = file
-        rel_by_file_id[file.id] = relative
-
+    graph = graph_from_models(repo_root, files, nodes, edges)
     changed_rel = normalize_paths(changed_files, repo_root)
-    changed_file_ids: set[int] = set()
-    for path in changed_rel:
-        file_record = file_by_rel.get(path)
-        if file_record is None or file_record.id is None:
-            continue
-        changed_file_ids.add(file_record.id)
+    cochange_counts = collect_cochanges(repo_root, set(changed_rel))
+    return blast_radius_from_graph(changed_rel, graph, cochange_counts)
 
-    node_by_file: dict[int, int] = {}
-    for node in nodes:
-        if node.file_id is None or node.id is None:
-            continue
-        node_by_file[node.file_id] = node.id
 
-    reverse_edges: dict[int, set[int]] = defaultdict(set)
-    for edge in edges:
-        if edge.from_node_id is None or edge.to_node_id is None:
-            continue
-        reverse_edges[edge.to_node_id].add(edge.from_node_id)
-
-    impacted_node_ids: set[int] = set()
-    queue: deque[int] = deque()
-    for file_id in changed_file_ids:
-        node_id = node_by_file.get(file_id)
-        if node_id is not None:
-            queue.append(node_id)
-            impacted_node_ids.add(node_id)
-
-    while queue:
-        node_id = queue.popleft()
-        for dependent in reverse_edges.get(node_id, set()):
-            if dependent not in impacted_node_ids:
-                impacted_node_ids.add(dependent)
-                queue.append(dependent)
+def blast_radius_from_graph(
+    changed_rel: list[str], graph: RepoGraph, cochange_counts: dict[str, int]
+) -> dict:
+    file_by_rel = {relative: file_id for file_id, relative in graph.file_paths.items()}
 
+    changed_indexes = {
+        graph.index_by_file[file_by_rel[path]]
+        for path in changed_rel
+        if path in file_by_rel and file_by_rel[path] in graph.index_by_file
+    }
+    # Modules sharing an import cycle with a change are impacted as one unit.
+    changed_cycles = {
+        graph.components[index]
+        for index in changed_indexes
+        if graph.components and graph.component_size(graph.components[index]) > 1
+    }
     impacted_paths = {
-        rel_by_file_id[file_id]
-        for file_id, node_id in node_by_file.items()
-        if node_id in impacted_node_ids and file_id in rel_by_file_id
+        graph.file_paths[graph.file_ids[index]]
+        for index in graph.transitive_dependents(changed_indexes)
+        if graph.file_ids[index] in graph.file_paths
     }
 
-    cochange_counts = collect_cochanges(repo_root, set(changed_rel))
     max_cochange = max(cochange_counts.values(), default=1)
-    centrality_by_file = compute_centrality(nodes, edges)
+    centrality_by_file = graph.centrality_by_file()
 
     candidate_paths = impacted_paths.union(cochange_counts.keys())
     impacts = []
     for path in sorted(candidate_paths):
         if path in changed_rel:
             continue
-        file_record = file_by_rel.get(path)
-        if file_record is None or file_record.id is None:
+        file_id = file_by_rel.get(path)
+        if file_id is None:
             continue
         reasons = []
         reachability = path in impacted_paths
         if reachability:
             reasons.append("Dependency reachability from changed modules")
 
+        index = graph.index_by_file.get(file_id)
+        in_cycle = (
+            index is not None
+            and bool(changed_cycles)
+            and (graph.components[index] in changed_cycles)
+        )
+        if in_cycle:
+            reasons.append("Shares an import cycle with changed modules")
+
         cochange_count = cochange_counts.get(path, 0)
         if cochange_count:
             reasons.append(f"Co-changed {cochange_count}x with touched files")
 
-        centrality = centrality_by_file.get(file_record.id, 0.0)
+        centrality = centrality_by_file.get(file_id, 0.0)
         if centrality >= 0.25:
             reasons.append(f"High centrality ({centrality:.2f})")
 
@@ -127,6 +136,7 @@ def compute_blast_radius(
                 "reasons": reasons or ["Low-signal impact"],
                 "signals": {
                     "reachability": reachability,
+                    "cycle": in_cycle,
                     "cochange": cochange_count,
                     "centrality": round(centrality, 3),
                 },
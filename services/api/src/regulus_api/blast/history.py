@@ -1,39 +1,213 @@
 from __future__ import annotations
 
 import subprocess
+import tempfile
+from collections import Counter
+from collections.abc import Iterable, Iterator
+from itertools import permutations
 from pathlib import Path
+from typing import Any
+
+from sqlalchemy import Connection, delete, func, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlmodel import Session, col
+
+from regulus_api.db.models import CochangePair, Repo
+from regulus_api.db.session import engine
+
+COMMIT_MARKER = "@@@"
+COCHANGE_BATCH = 5_000
+# Pair counts are flushed every this many commits, so long histories stream in bounded memory.
+COCHANGE_COMMIT_BATCH = 500
+# Bulk renames and vendoring drops say nothing about coupling and add quadratic pairs.
+MAX_COCHANGE_COMMIT_FILES = 100
+
+
+def stream_git_log(repo_path: Path, *args: str) -> Iterator[str]:
+    command = [
+        "git",
+        "-C",
+        str(repo_path),
+        "log",
+        "--name-only",
+        f"--pretty=format:{COMMIT_MARKER}",
+        *args,
+    ]
+    # stderr goes to a file so a chatty git cannot block on a full pipe mid-stream.
+    with tempfile.TemporaryFile(mode="w+") as errors:
+        with subprocess.Popen(command, stdout=subprocess.PIPE, stderr=errors, text=True) as process:
+            yield from process.stdout or []
+        if process.returncode != 0:
+            errors.seek(0)
+            raise RuntimeError(errors.read().strip() or "git log failed")
+
+
+def iter_commit_files(lines: Iterable[str]) -> Iterator[list[str]]:
+    current_files: list[str] = []
+    for line in lines:
+        if line.startswith(COMMIT_MARKER):
+            if current_files:
+                yield current_files
+            current_files = []
+            continue
+        if line.strip():
+            current_files.append(line.strip())
+    if current_files:
+        yield current_files
+
+
+def cochange_commit_files(repo_path: Path, *args: str) -> Iterator[list[str]]:
+    # The file cap applies here so the live scan and the stored index count the same commits.
+    for current_files in iter_commit_files(stream_git_log(repo_path, *args)):
+        unique = sorted(set(current_files))
+        if len(unique) <= MAX_COCHANGE_COMMIT_FILES:
+            yield unique
 
 
 def collect_cochanges(repo_path: Path, target_files: set[str]) -> dict[str, int]:
+    # Same scoring as load_cochanges: commits shared with each changed file, summed.
+    cochange_counts: dict[str, int] = {}
+    for current_files in cochange_commit_files(repo_path):
+        touched = len(target_files.intersection(current_files))
+        if not touched:
+            continue
+        for path in current_files:
+            if path in target_files:
+                continue
+            cochange_counts[path] = cochange_counts.get(path, 0) + touched
+    return cochange_counts
+
+
+def git_head(repo_path: Path) -> str | None:
     result = subprocess.run(
-        ["git", "-C", str(repo_path), "log", "--name-only", "--pretty=format:@@@"],
+        ["git", "-C", str(repo_path), "rev-parse", "--verify", "-q", "HEAD"],
         check=False,
         capture_output=True,
         text=True,
     )
     if result.returncode != 0:
-        raise RuntimeError(result.stderr.strip() or "git log failed")
+        return None
+    return result.stdout.strip() or None
 
-    cochange_counts: dict[str, int] = {}
-    current_files: list[str] = []
 
-    def flush_commit() -> None:
-        if not current_files:
-            return
-        if not target_files.intersection(current_files):
-            return
-        for path in current_files:
-            if path in target_files:
-                continue
-            cochange_counts[path] = cochange_counts.get(path, 0) + 1
+def merge_base(repo_path: Path, commit: str, head: str) -> str | None:
+    result = subprocess.run(
+        ["git", "-C", str(repo_path), "merge-base", commit, head],
+        check=False,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        return None
+    return result.stdout.strip() or None
 
-    for line in result.stdout.splitlines():
-        if line.startswith("@@@"):
-            flush_commit()
-            current_files = []
-            continue
-        if line.strip():
-            current_files.append(line.strip())
 
-    flush_commit()
-    return cochange_counts
+def iter_cochange_pair_batches(
+    commits: Iterable[list[str]],
+) -> Iterator[Counter[tuple[str, str]]]:
+    pairs: Counter[tuple[str, str]] = Counter()
+    pending = 0
+    for current_files in commits:
+        pairs.update(permutations(current_files, 2))
+        pending += 1
+        if pending == COCHANGE_COMMIT_BATCH:
+            yield pairs
+            pairs = Counter()
+            pending = 0
+    if pairs:
+        yield pairs
+
+
+def add_cochange_counts(connection: Connection, rows: list[dict[str, Any]]) -> None:
+    if connection.dialect.name == "postgresql":
+        statement: Any = postgresql.insert(CochangePair)
+    elif connection.dialect.name == "sqlite":
+        statement = sqlite.insert(CochangePair)
+    else:
+        raise RuntimeError(f"unsupported dialect {connection.dialect.name}")
+    statement = statement.on_conflict_do_update(
+        index_elements=["repo_id", "path", "other_path"],
+        set_={"commits": col(CochangePair.commits) + statement.excluded.commits},
+    )
+    connection.execute(statement, rows)
+
+
+def apply_cochange_log(
+    connection: Connection, repo_id: int, repo_path: Path, revisions: str, sign: int
+) -> int:
+    applied = 0
+    for pairs in iter_cochange_pair_batches(cochange_commit_files(repo_path, revisions)):
+        rows = [
+            {
+                "repo_id": repo_id,
+                "path": path,
+                "other_path": other_path,
+                "commits": sign * commits,
+            }
+            for (path, other_path), commits in sorted(pairs.items())
+        ]
+        for offset in range(0, len(rows), COCHANGE_BATCH):
+            add_cochange_counts(connection, rows[offset : offset + COCHANGE_BATCH])
+        applied += len(rows)
+    return applied
+
+
+def update_cochange_index(repo_id: int) -> dict[str, Any]:
+    with Session(engine) as session:
+        repo = session.get(Repo, repo_id)
+        if repo is None:
+            raise ValueError(f"repo {repo_id} not found")
+        repo_path = Path(repo.path)
+        indexed = repo.cochange_commit
+
+    head = git_head(repo_path)
+    if head is None or head == indexed:
+        return {"commit": indexed, "pairs": 0, "rebuilt": False}
+
+    # Commits the index no longer reaches are subtracted and new ones added, so switching
+    # between diverged branches only replays the commits past their merge base.
+    base = merge_base(repo_path, indexed, head) if indexed is not None else None
+    rebuilt = base is None
+
+    with Session(engine) as session:
+        connection = session.connection()
+        # Claim the advance first so a concurrent updater cannot count the same commits.
+        current = (
+            col(Repo.cochange_commit).is_(None)
+            if indexed is None
+            else col(Repo.cochange_commit) == indexed
+        )
+        claimed = connection.execute(
+            update(Repo).where(col(Repo.id) == repo_id, current).values(cochange_commit=head)
+        )
+        if claimed.rowcount != 1:
+            session.rollback()
+            return {"commit": indexed, "pairs": 0, "rebuilt": False}
+        if rebuilt:
+            connection.execute(delete(CochangePair).where(col(CochangePair.repo_id) == repo_id))
+            pairs = apply_cochange_log(connection, repo_id, repo_path, head, 1)
+        else:
+            pairs = apply_cochange_log(connection, repo_id, repo_path, f"{base}..{indexed}", -1)
+            pairs += apply_cochange_log(connection, repo_id, repo_path, f"{base}..{head}", 1)
+            connection.execute(
+                delete(CochangePair).where(
+                    col(CochangePair.repo_id) == repo_id, col(CochangePair.commits) <= 0
+                )
+            )
+        session.commit()
+    return {"commit": head, "pairs": pairs, "rebuilt": rebuilt}
+
+
+def load_cochanges(session: Session, repo_id: int, target_files: set[str]) -> dict[str, int]:
+    if not target_files:
+        return {}
+    statement = (
+        select(col(CochangePair.other_path), func.sum(col(CochangePair.commits)))
+        .where(
+            col(CochangePair.repo_id) == repo_id,
+            col(CochangePair.path).in_(sorted(target_files)),
+            col(CochangePair.other_path).not_in(sorted(target_files)),
+        )
+        .group_by(col(CochangePair.other_path))
+    )
+    return {path: int(commits) for path, commits in session.connection().execute(statement)}
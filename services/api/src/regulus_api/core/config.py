@@ -19,6 +19,15 @@ class Settings(BaseSettings):
     cors_origins: list[str] = Field(
         default_factory=lambda: ["http://localhost:3000"], alias="CORS_ORIGINS"
     )
+    index_workers: int = Field(default=1, alias="REGULUS_INDEX_WORKERS")
+    index_batch_bytes: int = Field(default=32_000_000, alias="REGULUS_INDEX_BATCH_BYTES")
+    index_use_git: bool = Field(default=True, alias="REGULUS_INDEX_USE_GIT")
+    graph_workers: int = Field(default=1, alias="REGULUS_GRAPH_WORKERS")
+    graph_reachability_max_bytes: int = Field(
+        default=64_000_000, alias="REGULUS_GRAPH_REACHABILITY_MAX_BYTES"
+    )
+    blast_cache_ttl_seconds: int = Field(default=86_400, alias="REGULUS_BLAST_CACHE_TTL_SECONDS")
+    watch_debounce_seconds: float = Field(default=2.0, alias="REGULUS_WATCH_DEBOUNCE_SECONDS")
     log_level: str = Field(default="info", alias="LOG_LEVEL")
 
     model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf-8", extra="ignore")
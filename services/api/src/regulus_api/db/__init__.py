@@ -1,10 +1,14 @@
 from regulus_api.db.models import (
     Chunk,
+    ChunkContent,
+    CochangePair,
     Embedding,
     File,
     Finding,
+    GraphComponent,
     GraphEdge,
     GraphNode,
+    ImportCacheEntry,
     JobStatus,
     MetricSnapshot,
     Repo,
@@ -14,11 +18,15 @@ from regulus_api.db.session import get_session
 
 __all__ = [
     "Chunk",
+    "ChunkContent",
+    "CochangePair",
     "Embedding",
     "File",
     "Finding",
+    "GraphComponent",
     "GraphEdge",
     "GraphNode",
+    "ImportCacheEntry",
     "JobStatus",
     "MetricSnapshot",
     "Repo",
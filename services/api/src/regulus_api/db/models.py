@@ -4,7 +4,7 @@ from datetime import UTC, datetime
 from enum import Enum
 
 from pgvector.sqlalchemy import Vector
-from sqlalchemy import JSON, Column
+from sqlalchemy import JSON, Column, UniqueConstraint
 from sqlmodel import Field, SQLModel
 
 
@@ -33,6 +33,8 @@ class Repo(SQLModel, table=True):
     embedding_status: JobStatus = Field(default=JobStatus.pending)
     security_status: JobStatus = Field(default=JobStatus.pending)
     metrics_status: JobStatus = Field(default=JobStatus.pending)
+    graph_version: int = 0
+    cochange_commit: str | None = None
     last_error: str | None = None
 
 
@@ -49,13 +51,22 @@ class File(SQLModel, table=True):
     updated_at: datetime = Field(default_factory=utc_now)
 
 
+class ChunkContent(SQLModel, table=True):
+    __tablename__ = "chunk_contents"
+
+    sha: str = Field(primary_key=True)
+    content: str
+    token_count: int
+    created_at: datetime = Field(default_factory=utc_now)
+
+
 class Chunk(SQLModel, table=True):
     __tablename__ = "chunks"
 
     id: int | None = Field(default=None, primary_key=True)
     repo_id: int = Field(foreign_key="repos.id", index=True)
     file_id: int = Field(foreign_key="files.id", index=True)
-    content: str
+    content_sha: str = Field(foreign_key="chunk_contents.sha", index=True)
     start_line: int
     end_line: int
     token_count: int
@@ -72,10 +83,35 @@ class GraphNode(SQLModel, table=True):
     path: str
     kind: str
     loc: int
+    file_sha: str | None = None
+    import_specs: list[str] | None = Field(default=None, sa_column=Column(JSON))
+    component: int | None = None
+    layout_x: float | None = None
+    layout_y: float | None = None
+
+
+class GraphComponent(SQLModel, table=True):
+    __tablename__ = "graph_components"
+
+    repo_id: int = Field(foreign_key="repos.id", primary_key=True)
+    component: int = Field(primary_key=True)
+    size: int = 1
+    dependents: bytes | None = None
+
+
+class ImportCacheEntry(SQLModel, table=True):
+    __tablename__ = "import_cache"
+
+    language: str = Field(primary_key=True)
+    content_sha: str = Field(primary_key=True)
+    parser_version: int = Field(primary_key=True)
+    specs: list[str] = Field(sa_column=Column(JSON, nullable=False))
+    created_at: datetime = Field(default_factory=utc_now)
 
 
 class GraphEdge(SQLModel, table=True):
     __tablename__ = "graph_edges"
+    __table_args__ = (UniqueConstraint("from_node_id", "to_node_id", "kind"),)
 
     id: int | None = Field(default=None, primary_key=True)
     repo_id: int = Field(foreign_key="repos.id", index=True)
@@ -85,12 +121,21 @@ class GraphEdge(SQLModel, table=True):
     weight: int = 1
 
 
+class CochangePair(SQLModel, table=True):
+    __tablename__ = "cochange_pairs"
+
+    repo_id: int = Field(foreign_key="repos.id", primary_key=True)
+    path: str = Field(primary_key=True)
+    other_path: str = Field(primary_key=True)
+    commits: int = 0
+
+
 class Embedding(SQLModel, table=True):
     __tablename__ = "embeddings"
+    __table_args__ = (UniqueConstraint("content_sha", "provider", "model"),)
 
     id: int | None = Field(default=None, primary_key=True)
-    repo_id: int = Field(foreign_key="repos.id", index=True)
-    chunk_id: int = Field(foreign_key="chunks.id", index=True)
+    content_sha: str = Field(foreign_key="chunk_contents.sha", index=True)
     provider: str
     model: str
     dim: int
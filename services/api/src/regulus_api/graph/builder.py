@@ -1,19 +1,79 @@
 from __future__ import annotations
 
+from collections import Counter, deque
+from collections.abc import Iterator
+from concurrent.futures import Future, ProcessPoolExecutor
 from pathlib import Path
+from typing import Any
 
-from sqlmodel import Session, delete, select
+from sqlalchemy import bindparam, update
+from sqlmodel import Session, col, delete, select
 
+from regulus_api.blast.cache import invalidate_blast_results
+from regulus_api.core.config import get_settings
 from regulus_api.db.models import File, GraphEdge, GraphNode, JobStatus, Repo, utc_now
 from regulus_api.db.session import engine
-from regulus_api.graph.parsers import extract_imports
-from regulus_api.graph.resolver import build_module_map, resolve_import
+from regulus_api.graph.cache import invalidate_repo_graph, load_repo_graph
+from regulus_api.graph.import_cache import CacheKey, load_cached_imports, store_cached_imports
+from regulus_api.graph.layout import layered_layout, store_layout
+from regulus_api.graph.parsers import SUPPORTED_LANGUAGES, extract_imports
+from regulus_api.graph.reachability import store_reachability
+from regulus_api.graph.resolver import ImportResolver
+from regulus_api.indexing.git_files import git_blob_sha
+from regulus_api.indexing.indexer import MAX_SCAN_BATCH, MAX_SCAN_BATCHES_IN_FLIGHT
 
+DELETE_BATCH = 10_000
+IMPORT_EDGE_KIND = "import"
 
-def build_dependency_graph(repo_id: int) -> dict[str, int]:
-    edges_created = 0
+ImportTask = tuple[int, str, str]
+FileImports = tuple[int, str, set[str]]
+
+
+def read_file_imports(tasks: list[ImportTask]) -> list[FileImports]:
+    # The blob sha of the bytes actually parsed keys the cache; the file may have changed
+    # since it was indexed.
+    results: list[FileImports] = []
+    for file_id, path, language in tasks:
+        try:
+            data = Path(path).read_bytes()
+        except OSError:
+            continue
+        text = data.decode("utf-8", errors="ignore")
+        results.append((file_id, git_blob_sha(data), extract_imports(language, text)))
+    return results
+
+
+def iter_file_imports(tasks: list[ImportTask], workers: int = 1) -> Iterator[FileImports]:
+    # Read+parse is CPU bound; workers keep their own cached parsers and queries.
+    if workers <= 1 or len(tasks) < 2:
+        for task in tasks:
+            yield from read_file_imports([task])
+        return
+
+    batch_size = max(1, min(MAX_SCAN_BATCH, len(tasks) // (workers * 4)))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending: deque[Future[list[FileImports]]] = deque()
+        for offset in range(0, len(tasks), batch_size):
+            pending.append(executor.submit(read_file_imports, tasks[offset : offset + batch_size]))
+            if len(pending) < workers * MAX_SCAN_BATCHES_IN_FLIGHT:
+                continue
+            yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+
+def node_name(file_path: Path, repo_root: Path) -> str:
     try:
-        with Session(engine) as session:
+        return file_path.resolve().relative_to(repo_root).as_posix()
+    except ValueError:
+        return file_path.name
+
+
+def build_dependency_graph(repo_id: int, incremental: bool = False) -> dict[str, Any]:
+    settings = get_settings()
+    try:
+        # Files and nodes are read after intermediate commits; don't reload each one.
+        with Session(engine, expire_on_commit=False) as session:
             repo = session.get(Repo, repo_id)
             if repo is None:
                 raise ValueError(f"repo {repo_id} not found")
@@ -24,79 +84,190 @@ def build_dependency_graph(repo_id: int) -> dict[str, int]:
             session.add(repo)
             session.commit()
 
-            session.exec(delete(GraphEdge).where(GraphEdge.repo_id == repo_id))  # type: ignore[arg-type]
-            session.exec(delete(GraphNode).where(GraphNode.repo_id == repo_id))  # type: ignore[arg-type]
-            session.commit()
-
             files = list(session.exec(select(File).where(File.repo_id == repo_id)).all())
+            files_by_id = {file.id: file for file in files if file.id is not None}
             repo_root = Path(repo.path).resolve()
-            module_map = build_module_map(files, repo_root)
+            resolver = ImportResolver.for_files(files, repo.path)
 
+            # Nodes are kept per file so their ids survive rebuilds; only orphans go.
             node_map: dict[int, GraphNode] = {}
-            for file in files:
-                if file.id is None:
+            stale_node_ids: list[int] = []
+            for node in session.exec(select(GraphNode).where(GraphNode.repo_id == repo_id)):
+                if node.id is None:
+                    continue
+                if node.file_id in files_by_id and node.file_id not in node_map:
+                    node_map[node.file_id] = node
+                else:
+                    stale_node_ids.append(node.id)
+            for offset in range(0, len(stale_node_ids), DELETE_BATCH):
+                batch = stale_node_ids[offset : offset + DELETE_BATCH]
+                session.exec(delete(GraphEdge).where(col(GraphEdge.from_node_id).in_(batch)))
+                session.exec(delete(GraphEdge).where(col(GraphEdge.to_node_id).in_(batch)))
+                session.exec(delete(GraphNode).where(col(GraphNode.id).in_(batch)))
+
+            changed = {
+                file_id
+                for file_id, node in node_map.items()
+                if node.file_sha != files_by_id[file_id].sha
+            }
+            added: list[int] = []
+            for file_id, file in files_by_id.items():
+                if file_id in node_map:
                     continue
                 file_path = Path(file.path)
-                try:
-                    relative = file_path.resolve().relative_to(repo_root).as_posix()
-                except ValueError:
-                    relative = file_path.name
                 node = GraphNode(
                     repo_id=repo_id,
-                    file_id=file.id,
-                    name=relative,
+                    file_id=file_id,
+                    name=node_name(file_path, repo_root),
                     path=str(file_path),
                     kind="module",
                     loc=file.loc,
                 )
                 session.add(node)
-                session.flush()
-                node_map[file.id] = node
-            session.commit()
+                node_map[file_id] = node
+                added.append(file_id)
+            session.flush()
 
-            for file in files:
-                if file.id is None:
-                    continue
-                source_node = node_map.get(file.id)
-                if source_node is None:
-                    continue
+            dirty = set(files_by_id) if not incremental else changed.union(added)
+            parseable = sorted(
+                file_id for file_id in dirty if files_by_id[file_id].language in SUPPORTED_LANGUAGES
+            )
+            # Specs depend only on content, so any repo or branch that parsed it already wins.
+            cached = load_cached_imports(
+                session,
+                {
+                    (files_by_id[file_id].language, files_by_id[file_id].sha)
+                    for file_id in parseable
+                },
+            )
+            specs: dict[int, list[str]] = {file_id: [] for file_id in dirty}
+            tasks: list[ImportTask] = []
+            for file_id in parseable:
+                file = files_by_id[file_id]
+                hit = cached.get((file.language, file.sha))
+                if hit is None:
+                    tasks.append((file_id, file.path, file.language))
+                else:
+                    specs[file_id] = hit
+            parsed: dict[CacheKey, list[str]] = {}
+            for file_id, sha, imports in iter_file_imports(tasks, workers=settings.graph_workers):
+                specs[file_id] = parsed[(files_by_id[file_id].language, sha)] = sorted(imports)
+            store_cached_imports(session, parsed)
+            for file_id in dirty:
+                node = node_map[file_id]
+                node.import_specs = specs[file_id]
+                node.file_sha = files_by_id[file_id].sha
+                node.loc = files_by_id[file_id].loc
+                session.add(node)
+
+            # A changed module set can redirect any spec, so every owner is re-resolved
+            # from its stored specs; otherwise only the reparsed files own new edges.
+            module_set_changed = bool(added or stale_node_ids)
+            owners = set(files_by_id) if module_set_changed else dirty
+            wanted: Counter[tuple[int, int]] = Counter()
+            owner_node_ids: set[int] = set()
+            for file_id in owners:
+                source_node = node_map[file_id]
                 if source_node.id is None:
                     continue
-                file_path = Path(file.path)
-                if not file_path.exists():
-                    continue
-                text = file_path.read_text(encoding="utf-8", errors="ignore")
-                imports = extract_imports(file.language, text)
-                for spec in imports:
-                    target_file = resolve_import(spec, file_path, repo_root, module_map)
-                    if target_file is None:
-                        continue
-                    if target_file.id is None:
+                owner_node_ids.add(source_node.id)
+                source_path = files_by_id[file_id].path
+                for spec in source_node.import_specs or []:
+                    target_file = resolver.resolve(spec, source_path)
+                    if target_file is None or target_file.id is None:
                         continue
                     target_node = node_map.get(target_file.id)
-                    if target_node is None:
-                        continue
-                    if target_node.id is None:
+                    if target_node is None or target_node.id is None:
                         continue
-                    session.add(
-                        GraphEdge(
-                            repo_id=repo_id,
-                            from_node_id=source_node.id,
-                            to_node_id=target_node.id,
-                            kind="import",
-                            weight=1,
-                        )
-                    )
-                    edges_created += 1
-                    if edges_created % 200 == 0:
-                        session.commit()
+                    wanted[(source_node.id, target_node.id)] += 1
+
+            # One edge per (from, to, kind); weight counts the specs that resolved to it.
+            edge_rows = session.exec(
+                select(
+                    GraphEdge.id, GraphEdge.from_node_id, GraphEdge.to_node_id, GraphEdge.weight
+                ).where(GraphEdge.repo_id == repo_id, GraphEdge.kind == IMPORT_EDGE_KIND)
+            ).all()
+            edges_total = len(edge_rows)
+            removed_edge_ids: list[int] = []
+            reweighted: list[dict[str, int]] = []
+            kept: set[tuple[int, int]] = set()
+            for edge_id, from_node_id, to_node_id, weight in edge_rows:
+                if edge_id is None or from_node_id not in owner_node_ids:
+                    continue
+                key = (from_node_id, to_node_id)
+                if key not in wanted or key in kept:
+                    removed_edge_ids.append(edge_id)
+                    continue
+                kept.add(key)
+                if weight != wanted[key]:
+                    reweighted.append({"edge_id": edge_id, "weight": wanted[key]})
+            for offset in range(0, len(removed_edge_ids), DELETE_BATCH):
+                batch = removed_edge_ids[offset : offset + DELETE_BATCH]
+                session.exec(delete(GraphEdge).where(col(GraphEdge.id).in_(batch)))
+            if reweighted:
+                session.connection().execute(
+                    update(GraphEdge)
+                    .where(col(GraphEdge.id) == bindparam("edge_id"))
+                    .values(weight=bindparam("weight")),
+                    reweighted,
+                )
+            new_edges = [
+                GraphEdge(
+                    repo_id=repo_id,
+                    from_node_id=from_node_id,
+                    to_node_id=to_node_id,
+                    kind=IMPORT_EDGE_KIND,
+                    weight=count,
+                )
+                for (from_node_id, to_node_id), count in sorted(wanted.items())
+                if (from_node_id, to_node_id) not in kept
+            ]
+            session.add_all(new_edges)
+            session.flush()
+
+            graph = load_repo_graph(session, repo_id, 0, repo.path, with_reachability=False)
+            components, dependents = graph.compute_reachability(
+                settings.graph_reachability_max_bytes
+            )
+            sizes = store_reachability(session, repo_id, graph.node_ids, components, dependents)
+            cycle_sizes = [size for size in sizes.values() if size > 1]
+            xs, ys = layered_layout(
+                components,
+                len(sizes),
+                graph.forward_offsets,
+                graph.forward_targets,
+                graph.reverse_offsets,
+                graph.reverse_sources,
+            )
+            layout_moved = store_layout(session, repo_id, graph.node_ids, xs, ys)
+            session.commit()
 
             repo.graph_status = JobStatus.completed
+            repo.graph_version += 1
             repo.updated_at = utc_now()
             session.add(repo)
             session.commit()
+        invalidate_repo_graph(repo_id)
+        invalidate_blast_results(repo_id)
 
-        return {"nodes": len(node_map), "edges": edges_created}
+        return {
+            "nodes": len(node_map),
+            "edges": edges_total - len(removed_edge_ids) + len(new_edges),
+            "nodes_added": len(added),
+            "nodes_removed": len(stale_node_ids),
+            "files_parsed": len(tasks),
+            "import_cache_hits": len(parseable) - len(tasks),
+            "edges_added": len(new_edges),
+            "edges_removed": len(removed_edge_ids),
+            "edges_reweighted": len(reweighted),
+            "resolver_lookups": resolver.hits + resolver.misses,
+            "resolver_hit_rate": resolver.hit_rate,
+            "components": len(sizes),
+            "cycles": len(cycle_sizes),
+            "largest_cycle": max(cycle_sizes, default=0),
+            "layout_moved": layout_moved,
+            "reachability_indexed": dependents is not None,
+        }
     except Exception as exc:  # pragma: no cover - status update
         with Session(engine) as session:
             repo = session.get(Repo, repo_id)
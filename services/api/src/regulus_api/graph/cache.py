@@ -0,0 +1,354 @@
+from __future__ import annotations
+
+import os
+import threading
+from array import array
+from bisect import bisect_right
+from collections import Counter, deque
+from collections.abc import Iterable, Sequence
+from dataclasses import dataclass, field
+from itertools import compress
+from pathlib import Path
+
+from sqlalchemy import select
+from sqlmodel import Session, col
+
+from regulus_api.core.config import get_settings
+from regulus_api.db.models import File, GraphEdge, GraphNode, Repo
+from regulus_api.graph.reachability import (
+    bitset_flags,
+    component_dependents,
+    load_component_dependents,
+    strongly_connected_components,
+)
+from regulus_api.graph.resolver import relative_to_root
+
+NodeRow = tuple[int, int, str, str, str, int]
+EdgeRow = tuple[int, int, int, str, int]
+
+
+def build_csr(count: int, sources: Sequence[int]) -> tuple[array, array]:
+    # Counting sort of edge positions by source index: offsets[i]:offsets[i + 1] is row i.
+    offsets = array("q", bytes(8 * (count + 1)))
+    for source in sources:
+        offsets[source + 1] += 1
+    for index in range(count):
+        offsets[index + 1] += offsets[index]
+    cursor = array("q", offsets[:-1])
+    order = array("q", bytes(8 * len(sources)))
+    for position, source in enumerate(sources):
+        order[cursor[source]] = position
+        cursor[source] += 1
+    return offsets, order
+
+
+@dataclass
+class RepoGraph:
+    repo_id: int
+    version: int
+    node_ids: array
+    file_ids: array
+    names: list[str]
+    paths: list[str]
+    kinds: list[str]
+    locs: array
+    forward_offsets: array
+    forward_targets: array
+    forward_edge_ids: array
+    forward_weights: array
+    edge_kinds: list[str]
+    reverse_offsets: array
+    reverse_sources: array
+    file_paths: dict[int, str]
+    index_by_node: dict[int, int] = field(default_factory=dict)
+    index_by_file: dict[int, int] = field(default_factory=dict)
+    components: array = field(default_factory=lambda: array("q"))
+    component_dependents: list[int] = field(default_factory=list)
+    component_sizes: Counter[int] = field(default_factory=Counter)
+    xs: array = field(default_factory=lambda: array("d"))
+    ys: array = field(default_factory=lambda: array("d"))
+
+    @classmethod
+    def from_rows(
+        cls,
+        repo_id: int,
+        version: int,
+        nodes: Iterable[NodeRow],
+        edges: Iterable[EdgeRow],
+        file_paths: dict[int, str],
+    ) -> RepoGraph:
+        node_rows = sorted(nodes)
+        index_by_node = {row[0]: index for index, row in enumerate(node_rows)}
+        edge_rows = [row for row in edges if row[1] in index_by_node and row[2] in index_by_node]
+        sources = [index_by_node[row[1]] for row in edge_rows]
+        targets = [index_by_node[row[2]] for row in edge_rows]
+        forward_offsets, forward_order = build_csr(len(node_rows), sources)
+        reverse_offsets, reverse_order = build_csr(len(node_rows), targets)
+        return cls(
+            repo_id=repo_id,
+            version=version,
+            node_ids=array("q", (row[0] for row in node_rows)),
+            file_ids=array("q", (row[1] for row in node_rows)),
+            names=[row[2] for row in node_rows],
+            paths=[row[3] for row in node_rows],
+            kinds=[row[4] for row in node_rows],
+            locs=array("q", (row[5] for row in node_rows)),
+            forward_offsets=forward_offsets,
+            forward_targets=array("q", (targets[position] for position in forward_order)),
+            forward_edge_ids=array("q", (edge_rows[position][0] for position in forward_order)),
+            forward_weights=array("q", (edge_rows[position][4] for position in forward_order)),
+            edge_kinds=[edge_rows[position][3] for position in forward_order],
+            reverse_offsets=reverse_offsets,
+            reverse_sources=array("q", (sources[position] for position in reverse_order)),
+            file_paths=file_paths,
+            index_by_node=index_by_node,
+            index_by_file={row[1]: index for index, row in enumerate(node_rows)},
+        )
+
+    @property
+    def node_count(self) -> int:
+        return len(self.node_ids)
+
+    @property
+    def edge_count(self) -> int:
+        return len(self.forward_targets)
+
+    def out_degree(self, index: int) -> int:
+        return int(self.forward_offsets[index + 1] - self.forward_offsets[index])
+
+    def in_degree(self, index: int) -> int:
+        return int(self.reverse_offsets[index + 1] - self.reverse_offsets[index])
+
+    def position(self, index: int) -> tuple[float | None, float | None]:
+        if len(self.xs) != self.node_count:
+            return None, None
+        return self.xs[index], self.ys[index]
+
+    def dependencies(self, index: int) -> array:
+        return self.forward_targets[self.forward_offsets[index] : self.forward_offsets[index + 1]]
+
+    def dependents(self, index: int) -> array:
+        return self.reverse_sources[self.reverse_offsets[index] : self.reverse_offsets[index + 1]]
+
+    def compute_reachability(self, max_bytes: int) -> tuple[array, list[int] | None]:
+        components, count = strongly_connected_components(
+            self.forward_offsets, self.forward_targets
+        )
+        dependents = component_dependents(
+            components, count, self.forward_offsets, self.forward_targets, max_bytes
+        )
+        return components, dependents
+
+    def attach_reachability(self, components: array, dependents: list[int]) -> None:
+        self.components = components
+        self.component_dependents = dependents
+        self.component_sizes = Counter(components)
+
+    def component_size(self, component: int) -> int:
+        return self.component_sizes.get(component, 0)
+
+    def transitive_dependents(self, indexes: Iterable[int]) -> set[int]:
+        if self.component_dependents:
+            # Union the precomputed component bitsets instead of walking reverse edges.
+            changed = {self.components[index] for index in indexes}
+            if not changed:
+                return set()
+            base = min(changed)
+            mask = 0
+            for component in changed:
+                mask |= self.component_dependents[component] << (component - base)
+            flags = bitset_flags(mask, base, len(self.component_dependents))
+            return set(compress(range(self.node_count), map(flags.__getitem__, self.components)))
+        seen = set(indexes)
+        queue = deque(seen)
+        while queue:
+            for dependent in self.dependents(queue.popleft()):
+                if dependent not in seen:
+                    seen.add(dependent)
+                    queue.append(dependent)
+        return seen
+
+    def neighbourhood(
+        self, start: int, hops: int, direction: str, limit: int
+    ) -> tuple[list[int], bool]:
+        # Breadth-first so a truncated result still holds the closest modules.
+        seen = {start}
+        frontier = [start]
+        for _ in range(hops):
+            following: list[int] = []
+            for index in frontier:
+                neighbours: list[int] = []
+                if direction in ("out", "both"):
+                    neighbours.extend(self.dependencies(index))
+                if direction in ("in", "both"):
+                    neighbours.extend(self.dependents(index))
+                for neighbour in neighbours:
+                    if neighbour in seen:
+                        continue
+                    if len(seen) >= limit:
+                        return sorted(seen), True
+                    seen.add(neighbour)
+                    following.append(neighbour)
+            frontier = following
+        return sorted(seen), False
+
+    def edges_within(self, indexes: Iterable[int]) -> list[tuple[int, int]]:
+        members = set(indexes)
+        return [
+            (index, position)
+            for index in sorted(members)
+            for position in range(self.forward_offsets[index], self.forward_offsets[index + 1])
+            if self.forward_targets[position] in members
+        ]
+
+    def edge_slice(self, start: int, stop: int) -> list[tuple[int, int]]:
+        # (source, position) for CSR positions start:stop, for paging edges in a stable order.
+        stop = min(stop, self.edge_count)
+        source = bisect_right(self.forward_offsets, start) - 1
+        edges = []
+        for position in range(start, stop):
+            while self.forward_offsets[source + 1] <= position:
+                source += 1
+            edges.append((source, position))
+        return edges
+
+    def centrality_by_file(self) -> dict[int, float]:
+        degrees = [
+            self.in_degree(index) + self.out_degree(index) for index in range(self.node_count)
+        ]
+        max_degree = max(degrees, default=0) or 1
+        return {file_id: degrees[index] / max_degree for index, file_id in enumerate(self.file_ids)}
+
+
+def relative_file_path(path: str, root: str) -> str:
+    relative = relative_to_root(path, root)
+    return relative if relative else Path(path).name
+
+
+def graph_from_models(
+    repo_root: Path, files: list[File], nodes: list[GraphNode], edges: list[GraphEdge]
+) -> RepoGraph:
+    root = os.path.abspath(repo_root)
+    graph = RepoGraph.from_rows(
+        repo_id=0,
+        version=0,
+        nodes=[
+            (node.id, node.file_id, node.name, node.path, node.kind, node.loc)
+            for node in nodes
+            if node.id is not None
+        ],
+        edges=[
+            (edge.id, edge.from_node_id, edge.to_node_id, edge.kind, edge.weight)
+            for edge in edges
+            if edge.id is not None
+        ],
+        file_paths={
+            file.id: relative_file_path(file.path, root) for file in files if file.id is not None
+        },
+    )
+    ensure_reachability(graph)
+    return graph
+
+
+def ensure_reachability(graph: RepoGraph) -> None:
+    components, dependents = graph.compute_reachability(get_settings().graph_reachability_max_bytes)
+    graph.attach_reachability(components, dependents or [])
+
+
+GRAPH_CACHE: dict[int, RepoGraph] = {}
+GRAPH_CACHE_LOCK = threading.Lock()
+
+
+def load_repo_graph(
+    session: Session, repo_id: int, version: int, repo_path: str, with_reachability: bool = True
+) -> RepoGraph:
+    root = os.path.abspath(repo_path)
+    connection = session.connection()
+    nodes = connection.execute(
+        select(
+            col(GraphNode.id),
+            col(GraphNode.file_id),
+            col(GraphNode.name),
+            col(GraphNode.path),
+            col(GraphNode.kind),
+            col(GraphNode.loc),
+            col(GraphNode.component),
+            col(GraphNode.layout_x),
+            col(GraphNode.layout_y),
+        ).where(col(GraphNode.repo_id) == repo_id)
+    ).all()
+    edges = connection.execute(
+        select(
+            col(GraphEdge.id),
+            col(GraphEdge.from_node_id),
+            col(GraphEdge.to_node_id),
+            col(GraphEdge.kind),
+            col(GraphEdge.weight),
+        ).where(col(GraphEdge.repo_id) == repo_id)
+    ).all()
+    files = connection.execute(
+        select(col(File.id), col(File.path)).where(col(File.repo_id) == repo_id)
+    ).all()
+    graph = RepoGraph.from_rows(
+        repo_id=repo_id,
+        version=version,
+        nodes=[
+            (node_id, file_id, name, path, kind, loc)
+            for node_id, file_id, name, path, kind, loc, *_ in nodes
+            if node_id is not None
+        ],
+        edges=[
+            (edge_id, from_node_id, to_node_id, kind, weight)
+            for edge_id, from_node_id, to_node_id, kind, weight in edges
+            if edge_id is not None
+        ],
+        file_paths={
+            file_id: relative_file_path(path, root)
+            for file_id, path in files
+            if file_id is not None
+        },
+    )
+    positions = {row[0]: (row[7], row[8]) for row in nodes}
+    if all(x is not None and y is not None for x, y in positions.values()):
+        graph.xs = array("d", (positions[node_id][0] for node_id in graph.node_ids))
+        graph.ys = array("d", (positions[node_id][1] for node_id in graph.node_ids))
+    if not with_reachability:
+        return graph
+
+    # The build persists the index; graphs from before it existed get one computed here.
+    component_by_node = {row[0]: row[6] for row in nodes}
+    components = array("q", (component_by_node[node_id] or 0 for node_id in graph.node_ids))
+    dependents = load_component_dependents(session, repo_id)
+    if None in component_by_node.values():
+        ensure_reachability(graph)
+    elif dependents is not None and max(components, default=0) < len(dependents):
+        graph.attach_reachability(components, dependents)
+    else:
+        # Over the bitset budget: keep cycle membership, traverse for reachability.
+        graph.attach_reachability(components, [])
+    return graph
+
+
+def get_repo_graph(session: Session, repo_id: int) -> RepoGraph | None:
+    # One indexed lookup decides whether the cached arrays still match the stored graph.
+    row = (
+        session.connection()
+        .execute(select(col(Repo.graph_version), col(Repo.path)).where(col(Repo.id) == repo_id))
+        .first()
+    )
+    if row is None:
+        return None
+    version, repo_path = row
+    with GRAPH_CACHE_LOCK:
+        cached = GRAPH_CACHE.get(repo_id)
+    if cached is not None and cached.version == version:
+        return cached
+    graph = load_repo_graph(session, repo_id, version, repo_path)
+    with GRAPH_CACHE_LOCK:
+        GRAPH_CACHE[repo_id] = graph
+    return graph
+
+
+def invalidate_repo_graph(repo_id: int) -> None:
+    with GRAPH_CACHE_LOCK:
+        GRAPH_CACHE.pop(repo_id, None)
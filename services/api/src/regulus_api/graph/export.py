@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import json
+from collections.abc import Iterator
+from typing import Any
+
+from regulus_api.graph.cache import RepoGraph
+
+EXPORT_BATCH_LINES = 1_000
+
+
+def graph_records(graph: RepoGraph) -> Iterator[dict[str, Any]]:
+    yield {
+        "type": "graph",
+        "repo_id": graph.repo_id,
+        "version": graph.version,
+        "nodes": graph.node_count,
+        "edges": graph.edge_count,
+    }
+    for index in range(graph.node_count):
+        x, y = graph.position(index)
+        yield {
+            "type": "node",
+            "id": graph.node_ids[index],
+            "name": graph.names[index],
+            "path": graph.paths[index],
+            "kind": graph.kinds[index],
+            "loc": graph.locs[index],
+            "in_degree": graph.in_degree(index),
+            "out_degree": graph.out_degree(index),
+            "x": x,
+            "y": y,
+        }
+    for index in range(graph.node_count):
+        from_node_id = graph.node_ids[index]
+        for position in range(graph.forward_offsets[index], graph.forward_offsets[index + 1]):
+            yield {
+                "type": "edge",
+                "id": graph.forward_edge_ids[position],
+                "from_node_id": from_node_id,
+                "to_node_id": graph.node_ids[graph.forward_targets[position]],
+                "kind": graph.edge_kinds[position],
+                "weight": graph.forward_weights[position],
+            }
+
+
+def iter_graph_ndjson(graph: RepoGraph, batch_lines: int = EXPORT_BATCH_LINES) -> Iterator[bytes]:
+    # Nodes precede edges, so a reader can resolve endpoints as lines arrive.
+    encoder = json.JSONEncoder(separators=(",", ":"), ensure_ascii=False)
+    lines: list[str] = []
+    for record in graph_records(graph):
+        lines.append(encoder.encode(record))
+        if len(lines) >= batch_lines:
+            yield ("\n".join(lines) + "\n").encode()
+            lines = []
+    if lines:
+        yield ("\n".join(lines) + "\n").encode()
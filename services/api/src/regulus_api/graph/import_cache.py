@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+from sqlmodel import Session, col, select
+
+from regulus_api.db.models import ImportCacheEntry, utc_now
+from regulus_api.graph.parsers import IMPORT_PARSER_VERSION
+from regulus_api.indexing.writer import insert_ignoring_conflicts
+
+CACHE_BATCH = 5_000
+
+CacheKey = tuple[str, str]
+
+
+def load_cached_imports(session: Session, keys: set[CacheKey]) -> dict[CacheKey, list[str]]:
+    shas_by_language: dict[str, list[str]] = {}
+    for language, sha in sorted(keys):
+        shas_by_language.setdefault(language, []).append(sha)
+
+    cached: dict[CacheKey, list[str]] = {}
+    for language, shas in shas_by_language.items():
+        for offset in range(0, len(shas), CACHE_BATCH):
+            statement = select(ImportCacheEntry.content_sha, ImportCacheEntry.specs).where(
+                ImportCacheEntry.language == language,
+                ImportCacheEntry.parser_version == IMPORT_PARSER_VERSION,
+                col(ImportCacheEntry.content_sha).in_(shas[offset : offset + CACHE_BATCH]),
+            )
+            for sha, specs in session.exec(statement):
+                cached[(language, sha)] = list(specs)
+    return cached
+
+
+def store_cached_imports(session: Session, entries: dict[CacheKey, list[str]]) -> None:
+    now = utc_now()
+    rows = [
+        {
+            "language": language,
+            "content_sha": sha,
+            "parser_version": IMPORT_PARSER_VERSION,
+            "specs": specs,
+            "created_at": now,
+        }
+        for (language, sha), specs in sorted(entries.items())
+    ]
+    for offset in range(0, len(rows), CACHE_BATCH):
+        insert_ignoring_conflicts(
+            session.connection(), ImportCacheEntry, rows[offset : offset + CACHE_BATCH]
+        )
@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+from array import array
+from collections.abc import Sequence
+
+from sqlalchemy import bindparam, select, update
+from sqlmodel import Session, col
+
+from regulus_api.db.models import GraphNode
+
+LAYOUT_SPACING_X = 180.0
+LAYOUT_SPACING_Y = 120.0
+LAYOUT_MAX_ROW_WIDTH = 60
+LAYOUT_SWEEPS = 2
+
+
+def component_layers(
+    components: Sequence[int],
+    component_count: int,
+    offsets: Sequence[int],
+    targets: Sequence[int],
+) -> array:
+    # Longest path down to a module that imports nothing. Imports always have lower
+    # component numbers than their importers, so one ascending pass suffices.
+    imports: list[set[int]] = [set() for _ in range(component_count)]
+    for source in range(len(offsets) - 1):
+        source_component = components[source]
+        for position in range(offsets[source], offsets[source + 1]):
+            target_component = components[targets[position]]
+            if target_component != source_component:
+                imports[source_component].add(target_component)
+    layers = array("q", [0]) * component_count
+    for component in range(component_count):
+        if imports[component]:
+            layers[component] = 1 + max(layers[target] for target in imports[component])
+    return layers
+
+
+def layered_layout(
+    components: Sequence[int],
+    component_count: int,
+    offsets: Sequence[int],
+    targets: Sequence[int],
+    reverse_offsets: Sequence[int],
+    reverse_sources: Sequence[int],
+) -> tuple[array, array]:
+    count = len(offsets) - 1
+    component_layer = component_layers(components, component_count, offsets, targets)
+    layer_of = [component_layer[components[index]] for index in range(count)]
+    layers: list[list[int]] = [[] for _ in range(max(layer_of, default=-1) + 1)]
+    for index, layer in enumerate(layer_of):
+        layers[layer].append(index)
+
+    # Barycenter sweeps: order each layer by the mean slot of its neighbours outside the
+    # layer, first upward along imports, then downward along importers.
+    slot = [0.0] * count
+    for members in layers:
+        for position, index in enumerate(members):
+            slot[index] = float(position)
+    for _ in range(LAYOUT_SWEEPS):
+        for layer in range(1, len(layers)):
+            reorder(layers[layer], slot, layer_of, layer, offsets, targets)
+        for layer in range(len(layers) - 2, -1, -1):
+            reorder(layers[layer], slot, layer_of, layer, reverse_offsets, reverse_sources)
+
+    # Entry points at the top; wide layers wrap onto extra rows.
+    xs = array("d", [0.0]) * count
+    ys = array("d", [0.0]) * count
+    row = 0
+    for members in reversed(layers):
+        for start in range(0, len(members), LAYOUT_MAX_ROW_WIDTH):
+            chunk = members[start : start + LAYOUT_MAX_ROW_WIDTH]
+            left = -(len(chunk) - 1) / 2
+            for position, index in enumerate(chunk):
+                xs[index] = (left + position) * LAYOUT_SPACING_X
+                ys[index] = row * LAYOUT_SPACING_Y
+            row += 1
+    return xs, ys
+
+
+def reorder(
+    members: list[int],
+    slot: list[float],
+    layer_of: list[int],
+    layer: int,
+    offsets: Sequence[int],
+    neighbours: Sequence[int],
+) -> None:
+    def barycenter(index: int) -> float:
+        anchors = [
+            slot[neighbours[position]]
+            for position in range(offsets[index], offsets[index + 1])
+            if layer_of[neighbours[position]] != layer
+        ]
+        return sum(anchors) / len(anchors) if anchors else slot[index]
+
+    members.sort(key=lambda index: (barycenter(index), index))
+    for position, index in enumerate(members):
+        slot[index] = float(position)
+
+
+def store_layout(
+    session: Session,
+    repo_id: int,
+    node_ids: Sequence[int],
+    xs: Sequence[float],
+    ys: Sequence[float],
+) -> int:
+    connection = session.connection()
+    current = {
+        node_id: (x, y)
+        for node_id, x, y in connection.execute(
+            select(col(GraphNode.id), col(GraphNode.layout_x), col(GraphNode.layout_y)).where(
+                col(GraphNode.repo_id) == repo_id
+            )
+        ).all()
+    }
+    moved = [
+        {"node_id": node_id, "layout_x": x, "layout_y": y}
+        for node_id, x, y in zip(node_ids, xs, ys, strict=True)
+        if current.get(node_id) != (x, y)
+    ]
+    if moved:
+        connection.execute(
+            update(GraphNode)
+            .where(col(GraphNode.id) == bindparam("node_id"))
+            .values(layout_x=bindparam("layout_x"), layout_y=bindparam("layout_y")),
+            moved,
+        )
+    return len(moved)
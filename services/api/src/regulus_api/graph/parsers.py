@@ -4,12 +4,35 @@ import ast
 from functools import lru_cache
 from typing import Any, cast
 
-from tree_sitter import Language, Node, Parser, Tree
+from tree_sitter import Language, Parser, Query, QueryCursor, Tree
 from tree_sitter_javascript import language as javascript_language
 from tree_sitter_python import language as python_language
 from tree_sitter_typescript import language_tsx, language_typescript
 
 SUPPORTED_LANGUAGES = {"python", "javascript", "typescript", "tsx"}
+# Bump whenever extraction output can change; cached specs are keyed by it.
+IMPORT_PARSER_VERSION = 1
+PYTHON_BLOCK_FIELDS = ("body", "orelse", "finalbody", "handlers", "cases")
+
+JS_IMPORT_QUERY = """
+(import_statement source: (string) @spec)
+(call_expression
+  function: [(identifier) (import)] @function
+  arguments: (arguments . (string) @spec)
+  (#any-of? @function "require" "import"))
+"""
+
+IMPORT_QUERIES = {
+    "python": """
+(import_statement name: (dotted_name) @spec)
+(import_statement name: (aliased_import name: (dotted_name) @spec))
+(import_from_statement module_name: _ @spec)
+(future_import_statement "__future__" @spec)
+""",
+    "javascript": JS_IMPORT_QUERY,
+    "typescript": JS_IMPORT_QUERY + "(import_require_clause source: (string) @spec)\n",
+    "tsx": JS_IMPORT_QUERY + "(import_require_clause source: (string) @spec)\n",
+}
 
 
 def extract_imports(language: str, text: str) -> set[str]:
@@ -21,13 +44,17 @@ def extract_imports(language: str, text: str) -> set[str]:
 
 
 def extract_python_imports(text: str) -> set[str]:
-    imports: set[str] = set()
+    # One parse per file: ast is exact and fast; tree-sitter only recovers files it rejects.
     try:
         tree = ast.parse(text)
-    except SyntaxError:
-        return imports
+    except (SyntaxError, ValueError):
+        return extract_python_imports_ts(text)
 
-    for node in ast.walk(tree):
+    imports: set[str] = set()
+    # Imports are statements, so only statement blocks are visited, never expressions.
+    stack: list[ast.AST] = list(tree.body)
+    while stack:
+        node = stack.pop()
         if isinstance(node, ast.Import):
             for alias in node.names:
                 imports.add(alias.name)
@@ -38,55 +65,30 @@ def extract_python_imports(text: str) -> set[str]:
                 imports.add(f"{prefix}{module}")
             elif prefix:
                 imports.add(prefix)
-
-    imports.update(extract_python_imports_ts(text))
+        else:
+            for field in PYTHON_BLOCK_FIELDS:
+                stack.extend(getattr(node, field, ()))
     return imports
 
 
 def extract_python_imports_ts(text: str) -> set[str]:
-    parser = get_parser("python")
-    return extract_imports_from_tree(parser.parse(text.encode("utf-8")), text)
+    tree = get_parser("python").parse(text.encode("utf-8"))
+    return {spec.replace(" ", "") for spec in query_import_specs("python", tree)}
 
 
 def extract_js_imports(language: str, text: str) -> set[str]:
-    parser = get_parser(language)
-    tree = parser.parse(text.encode("utf-8"))
-    return extract_imports_from_tree(tree, text)
+    tree = get_parser(language).parse(text.encode("utf-8"))
+    return {normalize_string(spec) for spec in query_import_specs(language, tree)} - {""}
 
 
-def extract_imports_from_tree(tree: Tree, source: str) -> set[str]:
-    imports: set[str] = set()
-    source_bytes = source.encode("utf-8")
-
-    def walk(node: Node) -> None:
-        if node.type == "import_statement":
-            source_node = node.child_by_field_name("source")
-            if source_node is not None:
-                spec = normalize_string(node_text(source_node, source_bytes))
-                if spec:
-                    imports.add(spec)
-        if node.type == "call_expression":
-            function_node = node.child_by_field_name("function")
-            if function_node is not None:
-                func_name = node_text(function_node, source_bytes)
-                if func_name in {"require", "import"}:
-                    arguments = node.child_by_field_name("arguments")
-                    if arguments is not None:
-                        for child in arguments.children:
-                            if child.type == "string":
-                                spec = normalize_string(node_text(child, source_bytes))
-                                if spec:
-                                    imports.add(spec)
-                                break
-        for child in node.children:
-            walk(child)
-
-    walk(tree.root_node)
-    return imports
-
-
-def node_text(node: Node, source: bytes) -> str:
-    return source[node.start_byte : node.end_byte].decode("utf-8", errors="ignore")
+def query_import_specs(language: str, tree: Tree) -> list[str]:
+    # Precompiled queries only surface matching nodes, so no Python-level tree walk.
+    captures = QueryCursor(get_import_query(language)).captures(tree.root_node)
+    return [
+        node.text.decode("utf-8", errors="ignore")
+        for node in captures.get("spec", [])
+        if node.text is not None
+    ]
 
 
 def normalize_string(value: str) -> str:
@@ -110,3 +112,11 @@ def get_parser(language: str) -> Parser:
     else:
         raise ValueError(f"Unsupported language: {language}")
     return parser
+
+
+@lru_cache
+def get_import_query(language: str) -> Query:
+    parser = get_parser(language)
+    if parser.language is None or language not in IMPORT_QUERIES:
+        raise ValueError(f"Unsupported language: {language}")
+    return Query(parser.language, IMPORT_QUERIES[language])
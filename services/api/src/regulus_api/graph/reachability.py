@@ -0,0 +1,189 @@
+from __future__ import annotations
+
+from array import array
+from collections import Counter
+from collections.abc import Sequence
+
+from sqlalchemy import bindparam, delete, insert, select, update
+from sqlmodel import Session, col
+
+from regulus_api.db.models import GraphComponent, GraphNode
+
+BIT_FLAGS = bytes.maketrans(b"01", b"\0\1")
+
+
+def strongly_connected_components(
+    offsets: Sequence[int], targets: Sequence[int]
+) -> tuple[array, int]:
+    # Iterative Tarjan over a CSR adjacency. Components come out in reverse topological
+    # order, so an importer's component number is never below its import's.
+    count = len(offsets) - 1
+    order = array("q", [-1]) * count
+    low = array("q", [0]) * count
+    components = array("q", [-1]) * count
+    on_stack = bytearray(count)
+    stack: list[int] = []
+    visited = 0
+    component_count = 0
+    for root in range(count):
+        if order[root] != -1:
+            continue
+        order[root] = low[root] = visited
+        visited += 1
+        stack.append(root)
+        on_stack[root] = 1
+        work = [(root, offsets[root])]
+        while work:
+            node, position = work[-1]
+            if position < offsets[node + 1]:
+                work[-1] = (node, position + 1)
+                target = targets[position]
+                if order[target] == -1:
+                    order[target] = low[target] = visited
+                    visited += 1
+                    stack.append(target)
+                    on_stack[target] = 1
+                    work.append((target, offsets[target]))
+                elif on_stack[target] and order[target] < low[node]:
+                    low[node] = order[target]
+                continue
+            work.pop()
+            if work and low[node] < low[work[-1][0]]:
+                low[work[-1][0]] = low[node]
+            if low[node] == order[node]:
+                while True:
+                    member = stack.pop()
+                    on_stack[member] = 0
+                    components[member] = component_count
+                    if member == node:
+                        break
+                component_count += 1
+    return components, component_count
+
+
+def component_dependents(
+    components: Sequence[int],
+    component_count: int,
+    offsets: Sequence[int],
+    targets: Sequence[int],
+    max_bytes: int,
+) -> list[int] | None:
+    # Bit k of entry c marks component c + k as a transitive dependent of c (bit 0 is c
+    # itself). Importers always sit above their imports, so storing relative to c keeps
+    # each bitset as short as the span of its dependents.
+    importers: list[set[int]] = [set() for _ in range(component_count)]
+    for source in range(len(offsets) - 1):
+        source_component = components[source]
+        for position in range(offsets[source], offsets[source + 1]):
+            target_component = components[targets[position]]
+            if target_component != source_component:
+                importers[target_component].add(source_component)
+
+    dependents = [0] * component_count
+    total_bytes = 0
+    for component in range(component_count - 1, -1, -1):
+        bits = 1
+        for importer in importers[component]:
+            bits |= dependents[importer] << (importer - component)
+        dependents[component] = bits
+        total_bytes += (bits.bit_length() + 7) // 8
+        if total_bytes > max_bytes:
+            return None
+    return dependents
+
+
+def bitset_flags(bits: int, offset: int, length: int) -> bytes:
+    # One 0/1 byte per position so callers can filter with itertools.compress in C.
+    flags = bin(bits)[:1:-1].encode().translate(BIT_FLAGS)
+    return (bytes(offset) + flags).ljust(length, b"\0")
+
+
+def encode_bitset(bits: int) -> bytes:
+    return bits.to_bytes((bits.bit_length() + 7) // 8, "little")
+
+
+def decode_bitset(data: bytes) -> int:
+    return int.from_bytes(data, "little")
+
+
+def load_component_dependents(session: Session, repo_id: int) -> list[int] | None:
+    rows = (
+        session.connection()
+        .execute(
+            select(col(GraphComponent.component), col(GraphComponent.dependents))
+            .where(col(GraphComponent.repo_id) == repo_id)
+            .order_by(col(GraphComponent.component))
+        )
+        .all()
+    )
+    dependents = []
+    for position, (component, data) in enumerate(rows):
+        if component != position or data is None:
+            return None
+        dependents.append(decode_bitset(data))
+    return dependents
+
+
+def store_reachability(
+    session: Session,
+    repo_id: int,
+    node_ids: Sequence[int],
+    components: Sequence[int],
+    dependents: list[int] | None,
+) -> Counter[int]:
+    connection = session.connection()
+    current = dict(
+        connection.execute(
+            select(col(GraphNode.id), col(GraphNode.component)).where(
+                col(GraphNode.repo_id) == repo_id
+            )
+        ).all()
+    )
+    moved = [
+        {"node_id": node_id, "component": component}
+        for node_id, component in zip(node_ids, components, strict=True)
+        if current.get(node_id) != component
+    ]
+    if moved:
+        connection.execute(
+            update(GraphNode)
+            .where(col(GraphNode.id) == bindparam("node_id"))
+            .values(component=bindparam("component")),
+            moved,
+        )
+
+    # Only rewrite the components that changed; most incremental builds touch a few.
+    sizes = Counter(components)
+    stored = {
+        component: (size, data)
+        for component, size, data in connection.execute(
+            select(
+                col(GraphComponent.component),
+                col(GraphComponent.size),
+                col(GraphComponent.dependents),
+            ).where(col(GraphComponent.repo_id) == repo_id)
+        ).all()
+    }
+    wanted = {
+        component: (
+            sizes[component],
+            encode_bitset(dependents[component]) if dependents is not None else None,
+        )
+        for component in range(len(sizes))
+    }
+    stale = [component for component, row in stored.items() if wanted.get(component) != row]
+    if stale:
+        connection.execute(
+            delete(GraphComponent).where(
+                col(GraphComponent.repo_id) == repo_id,
+                col(GraphComponent.component).in_(stale),
+            )
+        )
+    fresh = [
+        {"repo_id": repo_id, "component": component, "size": size, "dependents": data}
+        for component, (size, data) in wanted.items()
+        if stored.get(component) != (size, data)
+    ]
+    if fresh:
+        connection.execute(insert(GraphComponent), fresh)
+    return sizes
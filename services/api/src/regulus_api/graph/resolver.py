@@ -1,7 +1,9 @@
 from __future__ import annotations
 
+import os
+import posixpath
 from collections.abc import Sequence
-from pathlib import Path
+from dataclasses import dataclass, field
 
 from regulus_api.db.models import File
 
@@ -28,58 +30,149 @@ INDEX_FILENAMES = {
 }
 
 
-def module_keys_for_path(path: Path, repo_root: Path) -> list[str]:
-    relative = path.resolve().relative_to(repo_root)
-    no_ext = relative.with_suffix("")
-    keys = [no_ext.as_posix()]
-    if path.name in INDEX_FILENAMES:
-        keys.append(relative.parent.as_posix())
+def relative_to_root(path: str, root: str) -> str | None:
+    # Pure string arithmetic; indexed paths were already joined under the repo root.
+    normalized = os.path.abspath(path)
+    if normalized == root:
+        return ""
+    prefix = root.rstrip("/") + "/"
+    if not normalized.startswith(prefix):
+        return None
+    return normalized[len(prefix) :]
+
+
+def module_keys_for_path(relative: str) -> list[str]:
+    stem, _ = posixpath.splitext(relative)
+    keys = [stem]
+    if posixpath.basename(relative) in INDEX_FILENAMES:
+        keys.append(posixpath.dirname(relative) or ".")
     return list(dict.fromkeys(keys))
 
 
-def build_module_map(files: Sequence[File], repo_root: Path) -> dict[str, File]:
+def build_module_map(files: Sequence[File], root: str) -> dict[str, File]:
     module_map: dict[str, File] = {}
     for file in files:
-        path = Path(file.path)
-        try:
-            keys = module_keys_for_path(path, repo_root)
-        except ValueError:
+        relative = relative_to_root(file.path, root)
+        if relative is None:
             continue
-        for key in keys:
+        for key in module_keys_for_path(relative):
             module_map.setdefault(key, file)
     return module_map
 
 
+def python_source_roots(module_map: dict[str, File]) -> list[str]:
+    # The repo root, plus every non-package directory holding a top-level package (src/).
+    packages = {
+        posixpath.dirname(key) for key in module_map if posixpath.basename(key) == "__init__"
+    }
+    roots = {""}
+    roots.update(
+        parent for parent in map(posixpath.dirname, packages) if parent and parent not in packages
+    )
+    return sorted(roots)
+
+
+def encloses(base: str, directory: str) -> bool:
+    return not base or directory == base or directory.startswith(f"{base}/")
+
+
+def root_depth(base: str) -> int:
+    return base.count("/") + 1 if base else 0
+
+
+def module_key(base: str, module_path: str) -> str:
+    return posixpath.join(base, module_path).rstrip("/") or "."
+
+
 def normalize_spec(spec: str) -> str:
     spec = spec.strip().replace("\\", "/")
     if spec.startswith("@/"):
         spec = spec[2:]
     if spec.startswith("./"):
         spec = spec[2:]
-    for ext in KNOWN_EXTENSIONS:
-        if spec.endswith(ext):
-            spec = spec[: -len(ext)]
-            break
+    stem, ext = posixpath.splitext(spec)
+    if ext in KNOWN_EXTENSIONS:
+        spec = stem
     return spec.strip("/")
 
 
-def resolve_import(
-    spec: str,
-    source_path: Path,
-    repo_root: Path,
-    module_map: dict[str, File],
-) -> File | None:
-    if not spec:
-        return None
+@dataclass
+class ImportResolver:
+    root: str
+    module_map: dict[str, File]
+    source_roots: list[str] = field(default_factory=lambda: [""])
+    root_order: dict[str, list[str]] = field(default_factory=dict)
+    memo: dict[tuple[str, str, bool], File | None] = field(default_factory=dict)
+    hits: int = 0
+    misses: int = 0
+
+    @classmethod
+    def for_files(cls, files: Sequence[File], repo_path: str) -> ImportResolver:
+        root = os.path.abspath(repo_path)
+        module_map = build_module_map(files, root)
+        return cls(root=root, module_map=module_map, source_roots=python_source_roots(module_map))
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return round(self.hits / lookups, 3) if lookups else 0.0
+
+    def resolve(self, spec: str, source_path: str) -> File | None:
+        source = relative_to_root(source_path, self.root)
+        if not spec or source is None:
+            return None
+        # Every module in a directory shares its lookups, so memoize per directory.
+        source_dir = posixpath.dirname(source)
+        python = source.endswith(".py")
+        key = (source_dir, spec, python)
+        if key in self.memo:
+            self.hits += 1
+            return self.memo[key]
+        self.misses += 1
+        resolve = self.resolve_python if python else self.resolve_path
+        target = resolve(spec, source_dir)
+        self.memo[key] = target
+        return target
+
+    def lookup(self, key: str) -> File | None:
+        return self.module_map.get(key) or self.module_map.get(f"{key}/index")
 
-    if spec.startswith("."):
-        candidate = (source_path.parent / spec).resolve()
-        try:
-            relative = candidate.relative_to(repo_root)
-        except ValueError:
+    def resolve_path(self, spec: str, source_dir: str) -> File | None:
+        if not spec.startswith("."):
+            return self.lookup(normalize_spec(spec))
+        joined = posixpath.normpath(posixpath.join(source_dir, spec))
+        if joined == ".." or joined.startswith("../"):
             return None
-        key = normalize_spec(relative.as_posix())
-        return module_map.get(key) or module_map.get(f"{key}/index")
+        return self.lookup(normalize_spec(joined))
+
+    def resolve_python(self, spec: str, source_dir: str) -> File | None:
+        module = spec.lstrip(".")
+        level = len(spec) - len(module)
+        module_path = module.replace(".", "/")
+        if level:
+            base = source_dir
+            for _ in range(level - 1):
+                if not base:
+                    return None
+                base = posixpath.dirname(base)
+            return self.module_map.get(module_key(base, module_path))
+
+        # Absolute imports resolve from source roots only, never from the importer's own
+        # directory (that was Python 2's implicit relative import).
+        for base in self.roots_for(source_dir):
+            target = self.module_map.get(module_key(base, module_path))
+            if target is not None:
+                return target
+        return None
 
-    key = normalize_spec(spec)
-    return module_map.get(key) or module_map.get(f"{key}/index")
+    def roots_for(self, source_dir: str) -> list[str]:
+        # Roots enclosing the importer come first, nearest first, so a monorepo service
+        # finds its own src/ before a sibling's.
+        ordered = self.root_order.get(source_dir)
+        if ordered is None:
+            ordered = sorted(
+                self.source_roots,
+                key=lambda base: (not encloses(base, source_dir), -root_depth(base)),
+            )
+            self.root_order[source_dir] = ordered
+        return ordered
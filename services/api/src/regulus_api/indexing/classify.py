@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+import math
+from collections import Counter
+from pathlib import Path
+
+CLASSIFY_SAMPLE_BYTES = 64_000
+MAX_CONTROL_BYTE_RATIO = 0.05
+MAX_AVERAGE_LINE_LENGTH = 300
+MAX_LINE_LENGTH = 2_000
+MAX_ENTROPY_BITS = 5.8
+GENERATED_HEADER_LINES = 5
+GENERATED_MARKERS = (b"@generated", b"do not edit", b"auto-generated", b"autogenerated")
+LOCKFILE_NAMES = {"package-lock.json", "npm-shrinkwrap.json", "pnpm-lock.yaml"}
+TEXT_BYTES = bytes(range(32, 256)) + b"\t\n\f\r\x1b"
+
+
+def byte_entropy(sample: bytes) -> float:
+    total = len(sample)
+    counts = Counter(sample).values()
+    return -sum(count / total * math.log2(count / total) for count in counts)
+
+
+def classify_content(path: Path, sample: bytes) -> str | None:
+    # Returns why a file is not worth chunking, or None when it looks like hand-written text.
+    name = path.name.lower()
+    if name in LOCKFILE_NAMES:
+        return "lockfile"
+    if ".min." in name:
+        return "minified"
+    if not sample:
+        return None
+    if b"\0" in sample:
+        return "binary"
+    if len(sample.translate(None, TEXT_BYTES)) / len(sample) > MAX_CONTROL_BYTE_RATIO:
+        return "binary"
+
+    lines = sample.split(b"\n")
+    header = b"\n".join(lines[:GENERATED_HEADER_LINES]).lower()
+    if any(marker in header for marker in GENERATED_MARKERS):
+        return "generated"
+
+    # Minified bundles and inlined data have few, very long lines.
+    longest = max(len(line) for line in lines)
+    if longest > MAX_LINE_LENGTH and len(sample) / len(lines) > MAX_AVERAGE_LINE_LENGTH:
+        return "high_entropy" if byte_entropy(sample) > MAX_ENTROPY_BITS else "minified"
+    return None
@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import hashlib
+import subprocess
+from fnmatch import fnmatch
+from pathlib import Path
+
+IGNORE_FILE_NAME = ".regulusignore"
+SKIPPED_GIT_MODES = {"120000", "160000"}
+
+
+def git_blob_digest(size: int) -> hashlib._Hash:
+    return hashlib.sha1(f"blob {size}\0".encode())
+
+
+def git_blob_sha(data: bytes) -> str:
+    digest = git_blob_digest(len(data))
+    digest.update(data)
+    return digest.hexdigest()
+
+
+def list_git_blobs(
+    repo_path: Path, pathspecs: list[str] | None = None
+) -> dict[str, str | None] | None:
+    scope = ["--", *pathspecs] if pathspecs else []
+    staged = run_git_ls_files(repo_path, ["-s", *scope])
+    if staged is None or (not staged and not pathspecs):
+        return None
+
+    blobs: dict[str, str | None] = {}
+    for entry in staged:
+        meta, _, relative = entry.partition("\t")
+        parts = meta.split()
+        if len(parts) < 3 or not relative:
+            continue
+        mode, blob_sha = parts[0], parts[1]
+        if mode in SKIPPED_GIT_MODES:
+            continue
+        blobs[relative] = blob_sha
+
+    # Index blob ids are stale for files edited in the worktree; those get hashed on read.
+    for relative in run_git_ls_files(repo_path, ["-m", *scope]) or []:
+        if relative in blobs:
+            blobs[relative] = None
+    for relative in run_git_ls_files(repo_path, ["-d", *scope]) or []:
+        blobs.pop(relative, None)
+    # New files git would not ignore are indexed before anyone runs `git add`; with no blob
+    # in the index yet they are hashed on read.
+    for relative in run_git_ls_files(repo_path, ["--others", "--exclude-standard", *scope]) or []:
+        blobs.setdefault(relative, None)
+    return blobs
+
+
+def run_git_ls_files(repo_path: Path, args: list[str]) -> list[str] | None:
+    result = subprocess.run(
+        ["git", "-C", str(repo_path), "ls-files", "-z", *args],
+        check=False,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        return None
+    return [entry for entry in result.stdout.split("\0") if entry]
+
+
+def load_ignore_patterns(repo_path: Path) -> list[str]:
+    ignore_file = repo_path / IGNORE_FILE_NAME
+    if not ignore_file.is_file():
+        return []
+    patterns: list[str] = []
+    for line in ignore_file.read_text(encoding="utf-8", errors="ignore").splitlines():
+        line = line.strip()
+        if line and not line.startswith("#"):
+            patterns.append(line)
+    return patterns
+
+
+def is_ignored(relative: str, patterns: list[str]) -> bool:
+    parts = relative.split("/")
+    # As in git, the last matching pattern wins and nothing under an ignored directory
+    # can be re-included, so each ancestor is decided before the path itself.
+    for depth in range(1, len(parts) + 1):
+        ignored = False
+        for pattern in patterns:
+            negated = pattern.startswith("!")
+            if ignore_pattern_matches(
+                pattern[1:] if negated else pattern, parts[:depth], depth < len(parts)
+            ):
+                ignored = not negated
+        if ignored:
+            return True
+    return False
+
+
+def ignore_pattern_matches(pattern: str, parts: list[str], is_dir: bool) -> bool:
+    if pattern.endswith("/"):
+        if not is_dir:
+            return False
+        pattern = pattern.rstrip("/")
+    # A slash anywhere but the end anchors the pattern to the repo root.
+    if "/" in pattern:
+        return match_segments(pattern.lstrip("/").split("/"), parts)
+    return fnmatch(parts[-1], pattern)
+
+
+def match_segments(segments: list[str], parts: list[str]) -> bool:
+    if not segments:
+        return not parts
+    if segments[0] == "**":
+        return any(match_segments(segments[1:], parts[index:]) for index in range(len(parts) + 1))
+    return (
+        bool(parts) and fnmatch(parts[0], segments[0]) and match_segments(segments[1:], parts[1:])
+    )
@@ -1,12 +1,29 @@
 from __future__ import annotations
 
 import hashlib
+import mmap
 import os
-from dataclasses import dataclass
+import stat
+from collections import deque
+from collections.abc import Iterable, Iterator
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass, field
 from pathlib import Path
 
-MAX_FILE_SIZE_BYTES = 1_000_000
+from regulus_api.indexing.classify import CLASSIFY_SAMPLE_BYTES, classify_content
+from regulus_api.indexing.git_files import (
+    git_blob_digest,
+    is_ignored,
+    list_git_blobs,
+    load_ignore_patterns,
+)
+
+MAX_FILE_SIZE_BYTES = 16_000_000
+MMAP_THRESHOLD_BYTES = 1_000_000
 MAX_CHUNK_LINES = 200
+MAX_SCAN_BATCH = 64
+MAX_SCAN_BATCHES_IN_FLIGHT = 2
+MAX_FLUSH_FILES = 500
 
 IGNORED_DIRS = {
     ".git",
@@ -42,6 +59,7 @@ LANGUAGE_BY_EXT = {
 @dataclass
 class ChunkRecord:
     content: str
+    sha: str
     start_line: int
     end_line: int
     token_count: int
@@ -57,64 +75,267 @@ class FileRecord:
     chunks: list[ChunkRecord]
 
 
+@dataclass
+class SkippedFile:
+    path: str
+    reason: str
+
+
+@dataclass
+class RepoEntry:
+    path: Path
+    blob_sha: str | None = None
+
+
+@dataclass
+class IndexDelta:
+    added: list[FileRecord] = field(default_factory=list)
+    modified: list[FileRecord] = field(default_factory=list)
+    unchanged: list[str] = field(default_factory=list)
+    removed: list[str] = field(default_factory=list)
+
+
 def iter_repo_files(repo_path: Path) -> list[Path]:
     file_paths: list[Path] = []
     for root, dirs, files in os.walk(repo_path):
-        dirs[:] = [d for d in dirs if d not in IGNORED_DIRS]
-        for file_name in files:
+        dirs[:] = sorted(d for d in dirs if d not in IGNORED_DIRS)
+        for file_name in sorted(files):
             file_paths.append(Path(root) / file_name)
     return file_paths
 
 
+def iter_repo_entries(
+    repo_path: Path, use_git: bool = True, only: list[str] | None = None
+) -> list[RepoEntry]:
+    patterns = load_ignore_patterns(repo_path)
+    blobs = list_git_blobs(repo_path, pathspecs=only) if use_git else None
+    entries: list[RepoEntry] = []
+    if blobs is not None:
+        for relative in sorted(blobs):
+            if IGNORED_DIRS.intersection(relative.split("/")[:-1]):
+                continue
+            if is_ignored(relative, patterns):
+                continue
+            entries.append(RepoEntry(path=repo_path / relative, blob_sha=blobs[relative]))
+        return entries
+
+    if only is not None:
+        for relative in sorted(set(only)):
+            if IGNORED_DIRS.intersection(relative.split("/")[:-1]):
+                continue
+            if not is_ignored(relative, patterns):
+                entries.append(RepoEntry(path=repo_path / relative))
+        return entries
+
+    for path in iter_repo_files(repo_path):
+        if not is_ignored(path.relative_to(repo_path).as_posix(), patterns):
+            entries.append(RepoEntry(path=path))
+    return entries
+
+
 def infer_language(path: Path) -> str:
     return LANGUAGE_BY_EXT.get(path.suffix.lower(), "unknown")
 
 
-def chunk_text(text: str) -> list[ChunkRecord]:
-    lines = text.splitlines()
+def content_sha(content: str) -> str:
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+def scan_chunks(
+    buffer: bytes | mmap.mmap, digest: hashlib._Hash | None = None
+) -> tuple[list[ChunkRecord], int]:
+    # One pass over the raw bytes: find line breaks, cut chunks and feed the hash together.
     chunks: list[ChunkRecord] = []
+    size = len(buffer)
     start = 0
-    while start < len(lines):
-        end = min(start + MAX_CHUNK_LINES, len(lines))
-        chunk_lines = lines[start:end]
-        content = "\n".join(chunk_lines)
-        token_count = len(content.split())
+    line = 0
+    while start < size:
+        end = start
+        lines = 0
+        while lines < MAX_CHUNK_LINES and end < size:
+            newline = buffer.find(b"\n", end)
+            end = size if newline == -1 else newline + 1
+            lines += 1
+        raw = buffer[start:end]
+        if digest is not None:
+            digest.update(raw)
+        content = raw.decode("utf-8", errors="ignore").replace("\r\n", "\n")
+        if content.endswith("\n"):
+            content = content[:-1]
         chunks.append(
             ChunkRecord(
                 content=content,
-                start_line=start + 1,
-                end_line=end,
-                token_count=token_count,
+                sha=content_sha(content),
+                start_line=line + 1,
+                end_line=line + lines,
+                token_count=len(content.split()),
             )
         )
+        line += lines
         start = end
-    return chunks
+    return chunks, line
 
 
-def index_repository(repo_path: Path) -> list[FileRecord]:
-    records: list[FileRecord] = []
-    for path in iter_repo_files(repo_path):
-        if not path.is_file():
-            continue
-        if path.stat().st_size > MAX_FILE_SIZE_BYTES:
-            continue
-        language = infer_language(path)
-        if language == "unknown":
-            continue
-        text = path.read_text(encoding="utf-8", errors="ignore")
-        if not text.strip():
-            continue
-        sha = hashlib.sha1(text.encode("utf-8")).hexdigest()
-        loc = len(text.splitlines())
-        chunks = chunk_text(text)
-        records.append(
-            FileRecord(
-                path=str(path),
-                language=language,
-                size_bytes=path.stat().st_size,
-                loc=loc,
-                sha=sha,
-                chunks=chunks,
-            )
-        )
-    return records
+def index_file(entry: RepoEntry) -> FileRecord | SkippedFile | None:
+    path = entry.path
+    language = infer_language(path)
+    if language == "unknown":
+        return None
+    try:
+        file_stat = path.stat()
+    except OSError:
+        return None
+    size_bytes = file_stat.st_size
+    if not stat.S_ISREG(file_stat.st_mode) or not 0 < size_bytes <= MAX_FILE_SIZE_BYTES:
+        return None
+
+    with path.open("rb") as handle:
+        buffer: bytes | mmap.mmap
+        if size_bytes >= MMAP_THRESHOLD_BYTES:
+            buffer = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            buffer = handle.read()
+        try:
+            reason = classify_content(path, buffer[:CLASSIFY_SAMPLE_BYTES])
+            if reason is not None:
+                return SkippedFile(path=str(path), reason=reason)
+            if entry.blob_sha is None:
+                digest = git_blob_digest(len(buffer))
+                chunks, loc = scan_chunks(buffer, digest)
+                sha = digest.hexdigest()
+            else:
+                chunks, loc = scan_chunks(buffer)
+                sha = entry.blob_sha
+        finally:
+            if isinstance(buffer, mmap.mmap):
+                buffer.close()
+
+    if not any(chunk.token_count for chunk in chunks):
+        return None
+    return FileRecord(
+        path=str(path),
+        language=language,
+        size_bytes=size_bytes,
+        loc=loc,
+        sha=sha,
+        chunks=chunks,
+    )
+
+
+def index_files(entries: list[RepoEntry]) -> list[FileRecord | SkippedFile | None]:
+    return [index_file(entry) for entry in entries]
+
+
+def entry_size_bytes(entry: RepoEntry) -> int:
+    try:
+        return entry.path.stat().st_size
+    except OSError:
+        return 0
+
+
+def plan_scan_batches(
+    entries: list[RepoEntry], batch_size: int, max_bytes: int | None
+) -> Iterator[tuple[list[RepoEntry], int]]:
+    batch: list[RepoEntry] = []
+    batch_bytes = 0
+    for entry in entries:
+        size = entry_size_bytes(entry)
+        if batch and (
+            len(batch) >= batch_size or (max_bytes is not None and batch_bytes + size > max_bytes)
+        ):
+            yield batch, batch_bytes
+            batch = []
+            batch_bytes = 0
+        batch.append(entry)
+        batch_bytes += size
+    if batch:
+        yield batch, batch_bytes
+
+
+def iter_index_records(
+    entries: list[RepoEntry],
+    workers: int = 1,
+    skipped: list[SkippedFile] | None = None,
+    max_bytes: int | None = None,
+) -> Iterator[FileRecord]:
+    # Files the classifier rejects are reported through `skipped` instead of being yielded.
+    def accept(results: list[FileRecord | SkippedFile | None]) -> Iterator[FileRecord]:
+        for result in results:
+            if isinstance(result, FileRecord):
+                yield result
+            elif isinstance(result, SkippedFile) and skipped is not None:
+                skipped.append(result)
+
+    entries = [entry for entry in entries if infer_language(entry.path) != "unknown"]
+    if workers <= 1 or len(entries) < 2:
+        for entry in entries:
+            yield from accept([index_file(entry)])
+        return
+
+    max_in_flight = workers * MAX_SCAN_BATCHES_IN_FLIGHT
+    batch_size = max(1, min(MAX_SCAN_BATCH, len(entries) // (workers * 4)))
+    # Outstanding batches are capped by count and, given a budget, by the bytes on disk they
+    # will read, so a slow consumer or a run of large files keeps memory bounded. A single
+    # batch larger than the budget still runs, alone.
+    batch_budget = max(1, max_bytes // max_in_flight) if max_bytes is not None else None
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending: deque[tuple[Future[list[FileRecord | SkippedFile | None]], int]] = deque()
+        in_flight_bytes = 0
+        for batch, batch_bytes in plan_scan_batches(entries, batch_size, batch_budget):
+            while pending and (
+                len(pending) >= max_in_flight
+                or (max_bytes is not None and in_flight_bytes + batch_bytes > max_bytes)
+            ):
+                future, done_bytes = pending.popleft()
+                in_flight_bytes -= done_bytes
+                yield from accept(future.result())
+            pending.append((executor.submit(index_files, batch), batch_bytes))
+            in_flight_bytes += batch_bytes
+        while pending:
+            future, _ = pending.popleft()
+            yield from accept(future.result())
+
+
+def index_repository(repo_path: Path, workers: int = 1, use_git: bool = True) -> list[FileRecord]:
+    entries = iter_repo_entries(repo_path, use_git=use_git)
+    return list(iter_index_records(entries, workers=workers))
+
+
+def record_size_bytes(record: FileRecord) -> int:
+    # Encoded bytes read from disk, an upper bound on the chunk text kept for the write.
+    return record.size_bytes
+
+
+def batch_file_records(
+    records: Iterable[FileRecord],
+    max_bytes: int,
+    max_files: int = MAX_FLUSH_FILES,
+) -> Iterator[list[FileRecord]]:
+    batch: list[FileRecord] = []
+    batch_bytes = 0
+    for record in records:
+        size = record_size_bytes(record)
+        if batch and (batch_bytes + size > max_bytes or len(batch) >= max_files):
+            yield batch
+            batch = []
+            batch_bytes = 0
+        batch.append(record)
+        batch_bytes += size
+    if batch:
+        yield batch
+
+
+def diff_file_records(existing_shas: dict[str, str], records: Iterable[FileRecord]) -> IndexDelta:
+    delta = IndexDelta()
+    seen: set[str] = set()
+    for record in records:
+        seen.add(record.path)
+        stored_sha = existing_shas.get(record.path)
+        if stored_sha is None:
+            delta.added.append(record)
+        elif stored_sha != record.sha:
+            delta.modified.append(record)
+        else:
+            delta.unchanged.append(record.path)
+    delta.removed = sorted(path for path in existing_shas if path not in seen)
+    return delta
@@ -0,0 +1,229 @@
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass
+from typing import Any
+
+from sqlalchemy import Connection, bindparam, delete, exists, func, insert, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlmodel import Session, SQLModel, col
+
+from regulus_api.db.models import Chunk, ChunkContent, File, utc_now
+from regulus_api.indexing.indexer import FileRecord, IndexDelta
+
+CHUNK_COLUMNS = ("repo_id", "file_id", "content_sha", "start_line", "end_line", "token_count")
+# Advisory lock shared by content writers and taken exclusively by the pruner.
+CHUNK_CONTENT_LOCK = 0x5245_4755_4C55_53
+PRUNE_BATCH = 1_000
+
+
+@dataclass
+class BulkWriteStats:
+    files: int = 0
+    chunks: int = 0
+    contents: int = 0
+    seconds: float = 0.0
+
+    @property
+    def rows(self) -> int:
+        return self.files + self.chunks + self.contents
+
+    @property
+    def rows_per_sec(self) -> int:
+        if self.seconds <= 0:
+            return 0
+        return int(self.rows / self.seconds)
+
+
+def insert_files(connection: Connection, repo_id: int, records: list[FileRecord]) -> list[int]:
+    if not records:
+        return []
+    now = utc_now()
+    statement = insert(File).returning(col(File.id), sort_by_parameter_order=True)
+    result = connection.execute(
+        statement,
+        [
+            {
+                "repo_id": repo_id,
+                "path": record.path,
+                "language": record.language,
+                "size_bytes": record.size_bytes,
+                "loc": record.loc,
+                "sha": record.sha,
+                "updated_at": now,
+            }
+            for record in records
+        ],
+    )
+    return [int(file_id) for file_id in result.scalars() if file_id is not None]
+
+
+def update_files(connection: Connection, records: list[FileRecord], file_ids: list[int]) -> None:
+    if not records:
+        return
+    now = utc_now()
+    statement = (
+        update(File)
+        .where(col(File.id) == bindparam("file_id"))
+        .values(
+            language=bindparam("language"),
+            size_bytes=bindparam("size_bytes"),
+            loc=bindparam("loc"),
+            sha=bindparam("sha"),
+            updated_at=bindparam("updated_at"),
+        )
+    )
+    connection.execute(
+        statement,
+        [
+            {
+                "file_id": file_id,
+                "language": record.language,
+                "size_bytes": record.size_bytes,
+                "loc": record.loc,
+                "sha": record.sha,
+                "updated_at": now,
+            }
+            for record, file_id in zip(records, file_ids, strict=True)
+        ],
+    )
+
+
+def insert_chunks(connection: Connection, rows: list[dict[str, Any]]) -> None:
+    if not rows:
+        return
+    now = utc_now()
+    # COPY is the fastest bulk path on Postgres; other backends get batched multi-row inserts.
+    if connection.dialect.name == "postgresql" and connection.dialect.driver == "psycopg":
+        columns = ", ".join((*CHUNK_COLUMNS, "created_at"))
+        raw_connection: Any = connection.connection.driver_connection
+        with (
+            raw_connection.cursor() as cursor,
+            cursor.copy(f"COPY chunks ({columns}) FROM STDIN") as copy,
+        ):
+            for row in rows:
+                copy.write_row([*(row[column] for column in CHUNK_COLUMNS), now])
+        return
+    connection.execute(insert(Chunk), [{**row, "created_at": now} for row in rows])
+
+
+def insert_ignoring_conflicts(
+    connection: Connection, model: type[SQLModel], rows: list[dict[str, Any]]
+) -> None:
+    if not rows:
+        return
+    if connection.dialect.name == "postgresql":
+        statement: Any = postgresql.insert(model).on_conflict_do_nothing()
+    elif connection.dialect.name == "sqlite":
+        statement = sqlite.insert(model).on_conflict_do_nothing()
+    else:
+        raise RuntimeError(f"unsupported dialect {connection.dialect.name}")
+    connection.execute(statement, rows)
+
+
+def lock_chunk_contents(connection: Connection, exclusive: bool) -> None:
+    # Held until commit. Writers take it before checking which contents already exist,
+    # so a prune can never drop a row between that check and the chunk insert.
+    if connection.dialect.name != "postgresql":
+        return
+    lock = func.pg_advisory_xact_lock if exclusive else func.pg_advisory_xact_lock_shared
+    connection.execute(select(lock(CHUNK_CONTENT_LOCK)))
+
+
+def insert_chunk_contents(connection: Connection, records: list[FileRecord]) -> int:
+    now = utc_now()
+    contents: dict[str, dict[str, Any]] = {}
+    for record in records:
+        for chunk in record.chunks:
+            contents.setdefault(
+                chunk.sha,
+                {
+                    "sha": chunk.sha,
+                    "content": chunk.content,
+                    "token_count": chunk.token_count,
+                    "created_at": now,
+                },
+            )
+    if not contents:
+        return 0
+    lock_chunk_contents(connection, exclusive=False)
+    known = set(
+        connection.execute(
+            select(col(ChunkContent.sha)).where(col(ChunkContent.sha).in_(list(contents)))
+        ).scalars()
+    )
+    rows = [row for sha, row in contents.items() if sha not in known]
+    insert_ignoring_conflicts(connection, ChunkContent, rows)
+    return len(rows)
+
+
+def delete_file_chunks(connection: Connection, file_ids: list[int]) -> set[str]:
+    if not file_ids:
+        return set()
+    shas = set(
+        connection.execute(
+            select(col(Chunk.content_sha)).where(col(Chunk.file_id).in_(file_ids)).distinct()
+        ).scalars()
+    )
+    connection.execute(delete(Chunk).where(col(Chunk.file_id).in_(file_ids)))
+    return shas
+
+
+def prune_chunk_contents(session: Session, shas: set[str]) -> None:
+    # Only contents this run dereferenced are candidates; rows other jobs are about to
+    # reference again are protected by the lock. Embeddings cascade with their content.
+    if not shas:
+        return
+    connection = session.connection()
+    lock_chunk_contents(connection, exclusive=True)
+    candidates = sorted(shas)
+    for offset in range(0, len(candidates), PRUNE_BATCH):
+        connection.execute(
+            delete(ChunkContent).where(
+                col(ChunkContent.sha).in_(candidates[offset : offset + PRUNE_BATCH]),
+                ~exists().where(col(Chunk.content_sha) == col(ChunkContent.sha)),
+            )
+        )
+
+
+def chunk_rows(repo_id: int, file_id: int, record: FileRecord) -> list[dict[str, Any]]:
+    return [
+        {
+            "repo_id": repo_id,
+            "file_id": file_id,
+            "content_sha": chunk.sha,
+            "start_line": chunk.start_line,
+            "end_line": chunk.end_line,
+            "token_count": chunk.token_count,
+        }
+        for chunk in record.chunks
+    ]
+
+
+def write_index_batch(
+    session: Session,
+    repo_id: int,
+    delta: IndexDelta,
+    existing: dict[str, tuple[int, str]],
+    stats: BulkWriteStats,
+) -> set[str]:
+    started = time.perf_counter()
+    connection = session.connection()
+
+    modified_ids = [existing[record.path][0] for record in delta.modified]
+    dereferenced = delete_file_chunks(connection, modified_ids)
+    update_files(connection, delta.modified, modified_ids)
+    added_ids = insert_files(connection, repo_id, delta.added)
+    stats.contents += insert_chunk_contents(connection, [*delta.modified, *delta.added])
+
+    rows: list[dict[str, Any]] = []
+    for record, file_id in zip(delta.modified, modified_ids, strict=True):
+        rows.extend(chunk_rows(repo_id, file_id, record))
+    for record, file_id in zip(delta.added, added_ids, strict=True):
+        rows.extend(chunk_rows(repo_id, file_id, record))
+    insert_chunks(connection, rows)
+
+    stats.files += len(delta.modified) + len(delta.added)
+    stats.chunks += len(rows)
+    stats.seconds += time.perf_counter() - started
+    return dereferenced
@@ -1,20 +1,61 @@
 from __future__ import annotations
 
 from pathlib import Path
+from typing import Any
 
-from sqlmodel import Session, delete, select
+from sqlalchemy import exists
+from sqlmodel import Session, col, delete, select
 
-from regulus_api.db.models import Chunk, Embedding, File, Finding, JobStatus, Repo, Scan, utc_now
+from regulus_api.blast.cache import invalidate_blast_results
+from regulus_api.blast.history import update_cochange_index
+from regulus_api.core.config import get_settings
+from regulus_api.db.models import (
+    Chunk,
+    ChunkContent,
+    Embedding,
+    File,
+    Finding,
+    JobStatus,
+    Repo,
+    Scan,
+    utc_now,
+)
 from regulus_api.db.session import engine
 from regulus_api.graph.builder import build_dependency_graph
-from regulus_api.indexing.indexer import index_repository
+from regulus_api.graph.cache import invalidate_repo_graph
+from regulus_api.indexing.indexer import (
+    RepoEntry,
+    SkippedFile,
+    batch_file_records,
+    diff_file_records,
+    iter_index_records,
+    iter_repo_entries,
+)
+from regulus_api.indexing.writer import (
+    BulkWriteStats,
+    delete_file_chunks,
+    insert_ignoring_conflicts,
+    prune_chunk_contents,
+    write_index_batch,
+)
 from regulus_api.metrics.compute import compute_metrics
 from regulus_api.rag.provider import get_embedding_provider
 from regulus_api.security.runner import run_npm_audit, run_pip_audit, run_semgrep
 
 
-def index_repo(repo_id: int) -> dict[str, int]:
-    total_chunks = 0
+def index_repo(
+    repo_id: int, incremental: bool = False, paths: list[str] | None = None
+) -> dict[str, Any]:
+    settings = get_settings()
+    incremental = incremental or paths is not None
+    totals: dict[str, Any] = {
+        "files": 0,
+        "chunks": 0,
+        "added": 0,
+        "modified": 0,
+        "removed": 0,
+        "unchanged": 0,
+    }
     try:
         with Session(engine) as session:
             repo = session.get(Repo, repo_id)
@@ -27,45 +68,83 @@ def index_repo(repo_id: int) -> dict[str, int]:
             session.add(repo)
             session.commit()
 
-            session.exec(delete(Chunk).where(Chunk.repo_id == repo_id))  # type: ignore[arg-type]
-            session.exec(delete(File).where(File.repo_id == repo_id))  # type: ignore[arg-type]
-            session.commit()
+            repo_path = Path(repo.path)
+            # Full runs rescan every file but still reconcile rows by path, so file ids
+            # (and the graph nodes hanging off them) survive a re-index.
+            statement = select(File.id, File.path, File.sha).where(File.repo_id == repo_id)
+            if paths is not None:
+                touched = [str(repo_path / relative) for relative in paths]
+                statement = statement.where(col(File.path).in_(touched))
+            rows = session.exec(statement).all()
+            existing = {path: (file_id, sha) for file_id, path, sha in rows if file_id}
 
-            file_records = index_repository(Path(repo.path))
-            for idx, record in enumerate(file_records, start=1):
-                file_row = File(
-                    repo_id=repo_id,
-                    path=record.path,
-                    language=record.language,
-                    size_bytes=record.size_bytes,
-                    loc=record.loc,
-                    sha=record.sha,
-                    updated_at=utc_now(),
-                )
-                session.add(file_row)
-                session.flush()
-                for chunk in record.chunks:
-                    session.add(
-                        Chunk(
-                            repo_id=repo_id,
-                            file_id=file_row.id,
-                            content=chunk.content,
-                            start_line=chunk.start_line,
-                            end_line=chunk.end_line,
-                            token_count=chunk.token_count,
-                        )
-                    )
-                total_chunks += len(record.chunks)
-                if idx % 50 == 0:
-                    session.commit()
+            seen: set[str] = set()
+            dereferenced: set[str] = set()
+            stats = BulkWriteStats()
+            to_scan: list[RepoEntry] = []
+            entries = iter_repo_entries(repo_path, use_git=settings.index_use_git, only=paths)
+            for entry in entries:
+                stored = existing.get(str(entry.path))
+                if (
+                    incremental
+                    and stored is not None
+                    and entry.blob_sha is not None
+                    and stored[1] == entry.blob_sha
+                ):
+                    seen.add(str(entry.path))
+                    totals["unchanged"] += 1
+                else:
+                    to_scan.append(entry)
+
+            skipped: list[SkippedFile] = []
+            # Files still being scanned and records waiting to be written share one ceiling.
+            budget = max(1, settings.index_batch_bytes // 2)
+            records = iter_index_records(
+                to_scan, workers=settings.index_workers, skipped=skipped, max_bytes=budget
+            )
+            for batch in batch_file_records(records, budget):
+                batch_shas = {
+                    record.path: existing[record.path][1]
+                    for record in batch
+                    if record.path in existing
+                }
+                delta = diff_file_records(batch_shas, batch)
+                dereferenced |= write_index_batch(session, repo_id, delta, existing, stats)
+                session.commit()
+                seen.update(record.path for record in batch)
+                totals["added"] += len(delta.added)
+                totals["modified"] += len(delta.modified)
+                totals["unchanged"] += len(delta.unchanged)
+
+            removed_ids = [file_id for path, (file_id, _) in existing.items() if path not in seen]
+            if removed_ids:
+                dereferenced |= delete_file_chunks(session.connection(), removed_ids)
+                session.exec(delete(File).where(col(File.id).in_(removed_ids)))
+            prune_chunk_contents(session, dereferenced)
+            totals["files"] = len(seen)
+            totals["chunks"] = stats.chunks
+            totals["removed"] = len(removed_ids)
+            totals["rows_written"] = stats.rows
+            totals["insert_rows_per_sec"] = stats.rows_per_sec
+            totals["skipped"] = len(skipped)
+            totals["skipped_files"] = {
+                Path(item.path).relative_to(repo_path).as_posix(): item.reason for item in skipped
+            }
 
             repo.index_status = JobStatus.completed
             repo.last_indexed_at = utc_now()
             repo.updated_at = utc_now()
+            # Dropped files cascade to graph nodes, so cached graphs are stale too.
+            if removed_ids:
+                repo.graph_version += 1
             session.add(repo)
             session.commit()
+        # Advancing the co-change index here keeps git history replay off the request path.
+        totals["cochange"] = update_cochange_index(repo_id)
+        invalidate_repo_graph(repo_id)
+        invalidate_blast_results(repo_id)
 
-        return {"files": len(file_records), "chunks": total_chunks}
+        return totals
     except Exception as exc:  # pragma: no cover - best-effort status update
         with Session(engine) as session:
             repo = session.get(Repo, repo_id)
@@ -78,8 +157,8 @@ def index_repo(repo_id: int) -> dict[str, int]:
         raise
 
 
-def build_graph(repo_id: int) -> dict[str, int]:
-    return build_dependency_graph(repo_id)
+def build_graph(repo_id: int, incremental: bool = False) -> dict[str, Any]:
+    return build_dependency_graph(repo_id, incremental=incremental)
 
 
 def build_embeddings(repo_id: int) -> dict[str, int]:
@@ -96,31 +175,49 @@ def build_embeddings(repo_id: int) -> dict[str, int]:
             session.add(repo)
             session.commit()
 
-            session.exec(delete(Embedding).where(Embedding.repo_id == repo_id))  # type: ignore[arg-type]
-            session.commit()
+            repo_shas = select(Chunk.content_sha).where(Chunk.repo_id == repo_id).distinct()
+            pending = list(
+                session.exec(
+                    select(ChunkContent.sha)
+                    .where(col(ChunkContent.sha).in_(repo_shas))
+                    .where(
+                        ~exists().where(
+                            col(Embedding.content_sha) == col(ChunkContent.sha),
+                            col(Embedding.provider) == provider.name,
+                            col(Embedding.model) == provider.model,
+                        )
+                    )
+                    .order_by(col(ChunkContent.sha))
+                ).all()
+            )
 
-            chunks = list(session.exec(select(Chunk).where(Chunk.repo_id == repo_id)).all())
+            # Embeddings are keyed by chunk content, so text already embedded for any repo
+            # is reused and only new content is sent to the provider.
             total_embeddings = 0
             batch_size = 64
-            for offset in range(0, len(chunks), batch_size):
-                batch = chunks[offset : offset + batch_size]
-                texts = [chunk.content for chunk in batch]
-                vectors = provider.embed(texts)
-                for chunk, vector in zip(batch, vectors, strict=False):
-                    if chunk.id is None:
-                        continue
-                    session.add(
-                        Embedding(
-                            repo_id=repo_id,
-                            chunk_id=chunk.id,
-                            provider=provider.name,
-                            model=provider.model,
-                            dim=provider.dim,
-                            embedding=vector,
-                            created_at=utc_now(),
-                        )
+            for offset in range(0, len(pending), batch_size):
+                contents = session.exec(
+                    select(ChunkContent).where(
+                        col(ChunkContent.sha).in_(pending[offset : offset + batch_size])
                     )
-                    total_embeddings += 1
+                ).all()
+                vectors = provider.embed([content.content for content in contents])
+                insert_ignoring_conflicts(
+                    session.connection(),
+                    Embedding,
+                    [
+                        {
+                            "content_sha": content.sha,
+                            "provider": provider.name,
+                            "model": provider.model,
+                            "dim": provider.dim,
+                            "embedding": vector,
+                            "created_at": utc_now(),
+                        }
+                        for content, vector in zip(contents, vectors, strict=False)
+                    ],
+                )
+                total_embeddings += len(contents)
                 session.commit()
 
             repo.embedding_status = JobStatus.completed
@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from rq import Queue
+from sqlmodel import Session, select
+
+from regulus_api.db.models import Repo
+from regulus_api.db.session import engine
+from regulus_api.indexing.indexer import IGNORED_DIRS, infer_language
+
+MAX_DELAY_FACTOR = 10
+
+
+@dataclass
+class ChangeBuffer:
+    debounce_seconds: float
+    pending: dict[int, set[str]] = field(default_factory=dict)
+    first_event: dict[int, float] = field(default_factory=dict)
+    last_event: dict[int, float] = field(default_factory=dict)
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+    def add(self, repo_id: int, relative: str, now: float) -> None:
+        with self.lock:
+            self.pending.setdefault(repo_id, set()).add(relative)
+            self.first_event.setdefault(repo_id, now)
+            self.last_event[repo_id] = now
+
+    def drain(self, now: float) -> dict[int, list[str]]:
+        # A repo flushes once it has been quiet for the debounce window, or after a bounded
+        # delay so a continuously busy tree still gets refreshed.
+        ready: dict[int, list[str]] = {}
+        with self.lock:
+            for repo_id in list(self.pending):
+                quiet = now - self.last_event[repo_id] >= self.debounce_seconds
+                overdue = (
+                    now - self.first_event[repo_id] >= self.debounce_seconds * MAX_DELAY_FACTOR
+                )
+                if not (quiet or overdue):
+                    continue
+                ready[repo_id] = sorted(self.pending.pop(repo_id))
+                del self.first_event[repo_id]
+                del self.last_event[repo_id]
+        return ready
+
+    def discard(self, repo_id: int) -> None:
+        with self.lock:
+            self.pending.pop(repo_id, None)
+            self.first_event.pop(repo_id, None)
+            self.last_event.pop(repo_id, None)
+
+
+def watch_relative_path(repo_root: Path, path: str) -> str | None:
+    try:
+        relative = Path(path).resolve().relative_to(repo_root)
+    except ValueError:
+        return None
+    if IGNORED_DIRS.intersection(relative.parts[:-1]):
+        return None
+    if infer_language(relative) == "unknown":
+        return None
+    return relative.as_posix()
+
+
+def load_watch_targets() -> dict[int, Path]:
+    with Session(engine) as session:
+        repos = session.exec(select(Repo)).all()
+    return {repo.id: Path(repo.path).resolve() for repo in repos if repo.id is not None}
+
+
+def reconcile_watches(
+    watched: dict[int, Path], targets: dict[int, Path]
+) -> tuple[list[int], dict[int, Path]]:
+    # Deleted repos, moved paths and vanished directories are unwatched; a moved repo is
+    # watched again at its new root.
+    live = {repo_id: root for repo_id, root in targets.items() if root.is_dir()}
+    stale = sorted(repo_id for repo_id, root in watched.items() if live.get(repo_id) != root)
+    fresh = {repo_id: root for repo_id, root in live.items() if watched.get(repo_id) != root}
+    return stale, fresh
+
+
+def enqueue_repo_changes(queue: Queue, repo_id: int, paths: list[str]) -> str:
+    # Jobs are referenced by dotted path so the watcher never imports the embedding stack.
+    index_job = queue.enqueue("regulus_api.jobs.tasks.index_repo", repo_id, paths=paths)
+    queue.enqueue(
+        "regulus_api.jobs.tasks.build_graph", repo_id, incremental=True, depends_on=index_job
+    )
+    queue.enqueue("regulus_api.jobs.tasks.build_embeddings", repo_id, depends_on=index_job)
+    return str(index_job.id)
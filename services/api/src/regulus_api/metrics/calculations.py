@@ -2,32 +2,10 @@ from __future__ import annotations
 
 from pathlib import Path
 
-from regulus_api.db.models import File, GraphEdge, GraphNode
+from regulus_api.db.models import File
 from regulus_api.metrics.git_history import FileChurn
 
 
-def compute_centrality(nodes: list[GraphNode], edges: list[GraphEdge]) -> dict[int, float]:
-    degrees: dict[int, int] = {}
-    for node in nodes:
-        if node.id is None:
-            continue
-        degrees[node.id] = 0
-
-    for edge in edges:
-        if edge.from_node_id is not None:
-            degrees[edge.from_node_id] = degrees.get(edge.from_node_id, 0) + 1
-        if edge.to_node_id is not None:
-            degrees[edge.to_node_id] = degrees.get(edge.to_node_id, 0) + 1
-
-    max_degree = max(degrees.values(), default=1)
-    centrality_by_file: dict[int, float] = {}
-    for node in nodes:
-        if node.id is None or node.file_id is None:
-            continue
-        centrality_by_file[node.file_id] = degrees.get(node.id, 0) / max_degree
-    return centrality_by_file
-
-
 def build_ownership(
     files: list[File],
     churn_map: dict[str, FileChurn],
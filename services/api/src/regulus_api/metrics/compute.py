@@ -4,17 +4,10 @@ from pathlib import Path
 
 from sqlmodel import Session, select
 
-from regulus_api.db.models import (
-    File,
-    GraphEdge,
-    GraphNode,
-    JobStatus,
-    MetricSnapshot,
-    Repo,
-    utc_now,
-)
+from regulus_api.db.models import File, JobStatus, MetricSnapshot, Repo, utc_now
 from regulus_api.db.session import engine
-from regulus_api.metrics.calculations import build_hotspots, build_ownership, compute_centrality
+from regulus_api.graph.cache import get_repo_graph
+from regulus_api.metrics.calculations import build_hotspots, build_ownership
 from regulus_api.metrics.git_history import collect_file_churn
 
 
@@ -33,12 +26,11 @@ def compute_metrics(repo_id: int) -> dict:
             session.commit()
 
             files = list(session.exec(select(File).where(File.repo_id == repo_id)).all())
-            nodes = list(session.exec(select(GraphNode).where(GraphNode.repo_id == repo_id)).all())
-            edges = list(session.exec(select(GraphEdge).where(GraphEdge.repo_id == repo_id)).all())
+            graph = get_repo_graph(session, repo_id)
 
         repo_root = Path(repo_path).resolve()
         churn_map = collect_file_churn(repo_root)
-        centrality_by_file = compute_centrality(nodes, edges)
+        centrality_by_file = graph.centrality_by_file() if graph is not None else {}
         ownership = build_ownership(files, churn_map, repo_root)
         hotspots = build_hotspots(files, churn_map, centrality_by_file, repo_root)
 
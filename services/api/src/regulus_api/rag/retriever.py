@@ -5,7 +5,7 @@ from typing import Any, cast
 
 from sqlmodel import Session, select
 
-from regulus_api.db.models import Chunk, Embedding, File
+from regulus_api.db.models import Chunk, ChunkContent, Embedding, File
 from regulus_api.rag.provider import get_embedding_provider
 
 
@@ -29,21 +29,13 @@ def semantic_search(
 ) -> list[SearchHit]:
     provider = get_embedding_provider()
     query_vector = provider.embed([query])[0]
-
     distance = cast(Any, Embedding.embedding).cosine_distance(query_vector)
-    statement = (
-        select(Chunk, File, distance.label("distance"))
-        .join(File, File.id == Chunk.file_id)  # type: ignore[arg-type]
-        .join(Embedding, Embedding.chunk_id == Chunk.id)  # type: ignore[arg-type]
-        .where(Embedding.repo_id == repo_id)
-    )
-    if file_path:
-        statement = statement.where(File.path == file_path)
+    statement = search_statement(repo_id, provider.name, provider.model, distance, file_path)
     statement = statement.order_by(distance).limit(limit)
 
     results = session.exec(statement).all()
     hits: list[SearchHit] = []
-    for chunk, file, dist in results:
+    for chunk, file, content, dist in results:
         if chunk.id is None or file.id is None:
             continue
         score = max(0.0, 1.0 - float(dist))
@@ -52,10 +44,32 @@ def semantic_search(
                 chunk_id=chunk.id,
                 file_id=file.id,
                 file_path=file.path,
-                content=chunk.content,
+                content=content,
                 start_line=chunk.start_line,
                 end_line=chunk.end_line,
                 score=score,
             )
         )
     return hits
+
+
+def search_statement(
+    repo_id: int,
+    provider: str,
+    model: str,
+    distance: Any,
+    file_path: str | None = None,
+) -> Any:
+    # Chunks carry no text; content and vectors are both shared by content sha.
+    statement = (
+        select(Chunk, File, ChunkContent.content, distance.label("distance"))
+        .join(File, File.id == Chunk.file_id)  # type: ignore[arg-type]
+        .join(ChunkContent, ChunkContent.sha == Chunk.content_sha)  # type: ignore[arg-type]
+        .join(Embedding, Embedding.content_sha == Chunk.content_sha)  # type: ignore[arg-type]
+        .where(Chunk.repo_id == repo_id)
+        .where(Embedding.provider == provider)
+        .where(Embedding.model == model)
+    )
+    if file_path:
+        statement = statement.where(File.path == file_path)
+    return statement
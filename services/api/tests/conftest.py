@@ -1,4 +1,42 @@
 import os
+import sys
+from collections.abc import Callable
+from pathlib import Path
+
+import pytest
+from pytest import MonkeyPatch
+from sqlalchemy import Engine, create_engine
+from sqlmodel import Session, SQLModel
 
 os.environ.setdefault("DATABASE_URL", "sqlite:///./test.db")
 os.environ.setdefault("REDIS_URL", "redis://localhost:6379/0")
+
+from regulus_api.db import session as db_session
+from regulus_api.db.models import Repo
+from regulus_api.graph import cache
+
+
+@pytest.fixture
+def db_engine(tmp_path: Path, monkeypatch: MonkeyPatch) -> Engine:
+    engine = create_engine(f"sqlite:///{tmp_path / 'regulus.db'}")
+    SQLModel.metadata.create_all(engine)
+    # Every module that imported the shared engine by name is pointed at this database.
+    shared = db_session.engine
+    for name, module in list(sys.modules.items()):
+        if name.startswith("regulus_api.") and getattr(module, "engine", None) is shared:
+            monkeypatch.setattr(module, "engine", engine)
+    monkeypatch.setattr(cache, "GRAPH_CACHE", {})
+    return engine
+
+
+@pytest.fixture
+def add_repo(db_engine: Engine) -> Callable[[Path], int]:
+    def add(path: Path) -> int:
+        with Session(db_engine) as session:
+            repo = Repo(name=path.name, path=str(path))
+            session.add(repo)
+            session.commit()
+            assert repo.id is not None
+            return repo.id
+
+    return add
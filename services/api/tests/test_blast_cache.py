@@ -0,0 +1,152 @@
+import builtins
+import subprocess
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any, cast
+
+import pytest
+from fastapi import HTTPException
+from pytest import MonkeyPatch
+from redis import Redis
+from redis.exceptions import ConnectionError as RedisConnectionError
+from sqlalchemy import Engine
+from sqlmodel import Session
+
+from regulus_api.api.v1 import blast as blast_api
+from regulus_api.blast import engine as blast_engine
+from regulus_api.blast.cache import blast_cache_key, blast_cache_stats, invalidate_blast_results
+from regulus_api.db.models import Repo
+
+
+class FakeRedis:
+    def __init__(self) -> None:
+        self.values: dict[str, Any] = {}
+
+    def pipeline(self) -> "FakeRedis":
+        return self
+
+    def execute(self) -> None:
+        return None
+
+    def get(self, key: str) -> Any:
+        return self.values.get(key)
+
+    def set(self, key: str, value: str, ex: int | None = None) -> None:
+        self.values[key] = value
+
+    def expire(self, key: str, seconds: int) -> None:
+        return None
+
+    def delete(self, *keys: str) -> None:
+        for key in keys:
+            self.values.pop(key, None)
+
+    def hincrby(self, key: str, field: str, amount: int) -> None:
+        counters = self.values.setdefault(key, {})
+        counters[field] = counters.get(field, 0) + amount
+
+    def hgetall(self, key: str) -> dict[str, int]:
+        return dict(self.values.get(key, {}))
+
+    def sadd(self, key: str, member: str) -> None:
+        self.values.setdefault(key, builtins.set()).add(member)
+
+    def smembers(self, key: str) -> builtins.set[str]:
+        return builtins.set(self.values.get(key, builtins.set()))
+
+    def scard(self, key: str) -> int:
+        return len(self.values.get(key, builtins.set()))
+
+
+def test_blast_cache_key_ignores_order_and_duplicates() -> None:
+    key = blast_cache_key(1, 3, "abc", ["b.py", "a.py", "a.py"])
+    assert key == blast_cache_key(1, 3, "abc", ["a.py", "b.py"])
+    assert key != blast_cache_key(1, 4, "abc", ["a.py", "b.py"])
+    assert key != blast_cache_key(1, 3, "def", ["a.py", "b.py"])
+    assert key != blast_cache_key(1, 3, "abc", ["a.py"])
+
+
+def test_predict_blast_radius_reuses_cached_results(
+    tmp_path: Path, monkeypatch: MonkeyPatch, db_engine: Engine, add_repo: Callable[[Path], int]
+) -> None:
+    repo_path = tmp_path / "repo"
+    repo_path.mkdir()
+    subprocess.run(["git", "init", "-q", str(repo_path)], check=True)
+    (repo_path / "a.py").write_text("x = 1\n")
+    subprocess.run(["git", "-C", str(repo_path), "add", "a.py"], check=True)
+    subprocess.run(
+        [
+            "git",
+            "-C",
+            str(repo_path),
+            "-c",
+            "user.name=t",
+            "-c",
+            "user.email=t@t",
+            "commit",
+            "-qm",
+            "init",
+        ],
+        check=True,
+    )
+
+    redis = cast(Redis, FakeRedis())
+    monkeypatch.setattr(blast_engine, "get_redis_connection", lambda: redis)
+    computed: list[list[str]] = []
+    compute = blast_engine.blast_radius_from_graph
+
+    def counting_compute(changed: list[str], *args: Any) -> dict:
+        computed.append(changed)
+        return compute(changed, *args)
+
+    monkeypatch.setattr(blast_engine, "blast_radius_from_graph", counting_compute)
+    loaded: list[int] = []
+    load_graph = blast_engine.get_repo_graph
+
+    def counting_load(session: Session, repo_id: int) -> Any:
+        loaded.append(repo_id)
+        return load_graph(session, repo_id)
+
+    monkeypatch.setattr(blast_engine, "get_repo_graph", counting_load)
+
+    repo_id = add_repo(repo_path)
+
+    first = blast_engine.predict_blast_radius(repo_id, ["a.py"])
+    second = blast_engine.predict_blast_radius(repo_id, ["./a.py", "a.py"])
+    assert first == second
+    assert len(computed) == 1
+    # A cache hit never loads the graph.
+    assert len(loaded) == 1
+    assert blast_cache_stats(redis, repo_id) == {
+        "hits": 1,
+        "misses": 1,
+        "hit_rate": 0.5,
+        "entries": 1,
+    }
+
+    # A rebuilt graph changes the key even before the explicit invalidation lands.
+    with Session(db_engine) as session:
+        stored = session.get(Repo, repo_id)
+        assert stored is not None
+        stored.graph_version += 1
+        session.add(stored)
+        session.commit()
+    blast_engine.predict_blast_radius(repo_id, ["a.py"])
+    assert len(computed) == 2
+
+    assert invalidate_blast_results(repo_id, redis) == 2
+    assert blast_cache_stats(redis, repo_id)["entries"] == 0
+    blast_engine.predict_blast_radius(repo_id, ["a.py"])
+    assert len(computed) == 3
+
+
+class DownRedis:
+    def hgetall(self, key: str) -> dict[str, int]:
+        raise RedisConnectionError("connection refused")
+
+
+def test_blast_cache_stats_endpoint_reports_unavailable_redis(monkeypatch: MonkeyPatch) -> None:
+    monkeypatch.setattr(blast_api, "get_redis_connection", lambda: DownRedis())
+    with pytest.raises(HTTPException) as excinfo:
+        blast_api.blast_cache(1)
+    assert excinfo.value.status_code == 503
@@ -0,0 +1,128 @@
+import subprocess
+from collections.abc import Callable
+from pathlib import Path
+
+from pytest import MonkeyPatch
+from sqlalchemy import Engine
+from sqlmodel import Session
+
+from regulus_api.blast import history
+from regulus_api.jobs.tasks import index_repo
+
+
+def commit(repo: Path, message: str, files: dict[str, str]) -> None:
+    for name, text in files.items():
+        path = repo / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text)
+    subprocess.run(["git", "-C", str(repo), "add", *files], check=True)
+    subprocess.run(
+        [
+            "git",
+            "-C",
+            str(repo),
+            "-c",
+            "user.name=t",
+            "-c",
+            "user.email=t@t",
+            "commit",
+            "-qm",
+            message,
+        ],
+        check=True,
+    )
+
+
+def test_cochange_index_matches_log_and_updates_incrementally(
+    tmp_path: Path, db_engine: Engine, add_repo: Callable[[Path], int]
+) -> None:
+    repo_path = tmp_path / "repo"
+    repo_path.mkdir()
+    subprocess.run(["git", "init", "-q", str(repo_path)], check=True)
+    commit(repo_path, "one", {"a.py": "1", "b.py": "1"})
+    commit(repo_path, "two", {"a.py": "2", "c.py": "1"})
+    commit(repo_path, "three", {"b.py": "2", "c.py": "2"})
+
+    repo_id = add_repo(repo_path)
+
+    first = history.update_cochange_index(repo_id)
+    assert first["rebuilt"] is True
+    with Session(db_engine) as session:
+        indexed = history.load_cochanges(session, repo_id, {"a.py"})
+    assert indexed == history.collect_cochanges(repo_path, {"a.py"}) == {"b.py": 1, "c.py": 1}
+
+    assert history.update_cochange_index(repo_id)["pairs"] == 0
+    commit(repo_path, "four", {"a.py": "3", "b.py": "3"})
+    second = history.update_cochange_index(repo_id)
+    assert (second["rebuilt"], second["pairs"]) == (False, 2)
+    with Session(db_engine) as session:
+        assert history.load_cochanges(session, repo_id, {"a.py"}) == {"b.py": 2, "c.py": 1}
+        assert history.load_cochanges(session, repo_id, {"a.py", "b.py"}) == {"c.py": 2}
+
+
+def git(repo: Path, *args: str) -> None:
+    subprocess.run(["git", "-C", str(repo), *args], check=True, capture_output=True)
+
+
+def assert_index_matches_log(engine: Engine, repo_id: int, repo_path: Path) -> None:
+    for targets in ({"a.py"}, {"a.py", "b.py"}, {"d.py"}):
+        with Session(engine) as session:
+            indexed = history.load_cochanges(session, repo_id, targets)
+        assert indexed == history.collect_cochanges(repo_path, targets)
+
+
+def test_cochange_index_follows_diverged_branches_without_rebuilding(
+    tmp_path: Path, db_engine: Engine, add_repo: Callable[[Path], int]
+) -> None:
+    repo_path = tmp_path / "repo"
+    repo_path.mkdir()
+    subprocess.run(["git", "init", "-q", str(repo_path)], check=True)
+    commit(repo_path, "one", {"a.py": "1", "b.py": "1"})
+    commit(repo_path, "two", {"a.py": "2", "c.py": "1"})
+    commit(repo_path, "three", {"a.py": "3", "b.py": "2", "c.py": "2"})
+    repo_id = add_repo(repo_path)
+    history.update_cochange_index(repo_id)
+
+    git(repo_path, "checkout", "-q", "-b", "feature", "HEAD~2")
+    commit(repo_path, "feature", {"a.py": "4", "d.py": "1"})
+    switched = history.update_cochange_index(repo_id)
+    assert switched["rebuilt"] is False
+    assert_index_matches_log(db_engine, repo_id, repo_path)
+    with Session(db_engine) as session:
+        assert history.load_cochanges(session, repo_id, {"a.py"}) == {"b.py": 1, "d.py": 1}
+
+    git(repo_path, "checkout", "-q", "-")
+    assert history.update_cochange_index(repo_id)["rebuilt"] is False
+    assert_index_matches_log(db_engine, repo_id, repo_path)
+
+
+def test_cochange_scores_skip_bulk_commits(
+    tmp_path: Path, monkeypatch: MonkeyPatch, db_engine: Engine, add_repo: Callable[[Path], int]
+) -> None:
+    monkeypatch.setattr(history, "MAX_COCHANGE_COMMIT_FILES", 3)
+    monkeypatch.setattr(history, "COCHANGE_COMMIT_BATCH", 1)
+    repo_path = tmp_path / "repo"
+    repo_path.mkdir()
+    subprocess.run(["git", "init", "-q", str(repo_path)], check=True)
+    commit(repo_path, "pair", {"a.py": "1", "b.py": "1", "c.py": "1"})
+    commit(repo_path, "bulk", {"a.py": "2", "b.py": "2", "c.py": "2", "d.py": "1"})
+    repo_id = add_repo(repo_path)
+    history.update_cochange_index(repo_id)
+
+    # Both changed files share the first commit with c.py, and the bulk commit is skipped.
+    assert history.collect_cochanges(repo_path, {"a.py", "b.py"}) == {"c.py": 2}
+    assert_index_matches_log(db_engine, repo_id, repo_path)
+
+
+def test_index_repo_advances_the_cochange_index(
+    tmp_path: Path, db_engine: Engine, add_repo: Callable[[Path], int]
+) -> None:
+    repo_path = tmp_path / "repo"
+    repo_path.mkdir()
+    subprocess.run(["git", "init", "-q", str(repo_path)], check=True)
+    commit(repo_path, "one", {"a.py": "A = 1\n", "b.py": "B = 1\n"})
+    repo_id = add_repo(repo_path)
+
+    assert index_repo(repo_id)["cochange"]["rebuilt"] is True
+    with Session(db_engine) as session:
+        assert history.load_cochanges(session, repo_id, {"a.py"}) == {"b.py": 1}
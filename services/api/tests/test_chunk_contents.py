@@ -0,0 +1,100 @@
+from collections.abc import Callable
+from pathlib import Path
+
+from pytest import MonkeyPatch
+from sqlalchemy import Engine, literal
+from sqlmodel import Session, select
+
+from regulus_api.db.models import Chunk, ChunkContent, Embedding, File
+from regulus_api.jobs import tasks
+from regulus_api.rag.retriever import search_statement
+
+
+class FakeProvider:
+    name = "fake"
+    dim = 1536
+
+    def __init__(self, model: str) -> None:
+        self.model = model
+        self.embedded: list[str] = []
+
+    def embed(self, texts: list[str]) -> list[list[float]]:
+        self.embedded.extend(texts)
+        return [[0.0] * self.dim for _ in texts]
+
+
+def write_repo(root: Path, files: dict[str, str]) -> Path:
+    root.mkdir()
+    for name, text in files.items():
+        (root / name).write_text(text)
+    return root
+
+
+def test_chunk_contents_dedupe_across_files_and_repos(
+    tmp_path: Path, db_engine: Engine, add_repo: Callable[[Path], int]
+) -> None:
+    shared = "SHARED = 1\n"
+    first = add_repo(write_repo(tmp_path / "first", {"x.py": shared, "y.py": shared}))
+    second = add_repo(write_repo(tmp_path / "second", {"z.py": shared}))
+
+    assert tasks.index_repo(first)["rows_written"] == 5
+    # The second repo only writes its file and chunk rows; the content already exists.
+    assert tasks.index_repo(second)["rows_written"] == 2
+    with Session(db_engine) as session:
+        assert len(session.exec(select(ChunkContent)).all()) == 1
+        assert len(session.exec(select(Chunk)).all()) == 3
+
+
+def test_prune_only_drops_contents_this_run_dereferenced(
+    tmp_path: Path, db_engine: Engine, add_repo: Callable[[Path], int]
+) -> None:
+    shared = "SHARED = 1\n"
+    first_root = write_repo(tmp_path / "first", {"x.py": shared, "own.py": "OWN = 1\n"})
+    second_root = write_repo(tmp_path / "second", {"z.py": shared})
+    first = add_repo(first_root)
+    second = add_repo(second_root)
+    tasks.index_repo(first)
+    tasks.index_repo(second)
+    with Session(db_engine) as session:
+        # Stands in for content another job inserted but has not referenced yet.
+        session.add(ChunkContent(sha="pending", content="PENDING = 1", token_count=3))
+        session.commit()
+
+    (first_root / "x.py").unlink()
+    (first_root / "own.py").unlink()
+    tasks.index_repo(first, incremental=True)
+    with Session(db_engine) as session:
+        contents = {row.content.strip() for row in session.exec(select(ChunkContent)).all()}
+    assert contents == {"SHARED = 1", "PENDING = 1"}
+
+    (second_root / "z.py").unlink()
+    tasks.index_repo(second, incremental=True)
+    with Session(db_engine) as session:
+        assert session.exec(select(ChunkContent.sha)).all() == ["pending"]
+
+
+def test_embeddings_skip_existing_content_and_join_through_contents(
+    tmp_path: Path, monkeypatch: MonkeyPatch, db_engine: Engine, add_repo: Callable[[Path], int]
+) -> None:
+    provider = FakeProvider("v1")
+    monkeypatch.setattr(tasks, "get_embedding_provider", lambda: provider)
+    first = add_repo(write_repo(tmp_path / "first", {"a.py": "A = 1\n", "b.py": "B = 1\n"}))
+    second = add_repo(write_repo(tmp_path / "second", {"c.py": "A = 1\n", "d.py": "D = 1\n"}))
+    tasks.index_repo(first)
+    tasks.index_repo(second)
+
+    assert tasks.build_embeddings(first) == {"embeddings": 2}
+    assert tasks.build_embeddings(second) == {"embeddings": 1}
+    assert sorted(text.strip() for text in provider.embedded) == ["A = 1", "B = 1", "D = 1"]
+    assert tasks.build_embeddings(second) == {"embeddings": 0}
+
+    # A different model is a different (content_sha, provider, model) key.
+    monkeypatch.setattr(tasks, "get_embedding_provider", lambda: FakeProvider("v2"))
+    assert tasks.build_embeddings(second) == {"embeddings": 2}
+
+    with Session(db_engine) as session:
+        assert len(session.exec(select(Embedding)).all()) == 5
+        rows = session.exec(search_statement(second, "fake", "v1", literal(0.0))).all()
+    hits = {Path(file.path).name: content.strip() for chunk, file, content, _ in rows}
+    assert hits == {"c.py": "A = 1", "d.py": "D = 1"}
+    assert all(isinstance(chunk, Chunk) and isinstance(file, File) for chunk, file, *_ in rows)
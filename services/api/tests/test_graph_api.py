@@ -0,0 +1,75 @@
+from collections.abc import Callable
+from pathlib import Path
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import Engine
+from sqlmodel import Session
+
+from regulus_api.api.v1.graph import list_graph_edges, list_graph_nodes
+from regulus_api.db.models import File, Repo
+from regulus_api.graph.builder import build_dependency_graph
+from regulus_api.indexing.git_files import git_blob_sha
+
+
+def test_node_and_edge_pages_share_one_graph_version(
+    tmp_path: Path, db_engine: Engine, add_repo: Callable[[Path], int]
+) -> None:
+    repo_id = add_repo(tmp_path)
+    sources = {
+        "a.ts": "import { b } from './b'\nimport { c } from './c'\n",
+        "b.ts": "import { c } from './c'\n",
+        "c.ts": "import { d } from './d'\n",
+        "d.ts": "export const d = 1\n",
+    }
+    with Session(db_engine) as session:
+        for name, text in sources.items():
+            (tmp_path / name).write_text(text)
+            session.add(
+                File(
+                    repo_id=repo_id,
+                    path=str(tmp_path / name),
+                    language="typescript",
+                    size_bytes=len(text),
+                    loc=text.count("\n"),
+                    sha=git_blob_sha(text.encode()),
+                )
+            )
+        session.commit()
+    build_dependency_graph(repo_id)
+
+    with Session(db_engine) as session:
+        node_ids: list[int] = []
+        cursor = None
+        while True:
+            page = list_graph_nodes(repo_id, cursor=cursor, limit=3, session=session)
+            node_ids.extend(node.id for node in page.nodes)
+            if page.next_cursor is None:
+                break
+            cursor = page.next_cursor
+        edges = []
+        edge_page = list_graph_edges(repo_id, cursor=None, limit=2, session=session)
+        edges.extend(edge_page.edges)
+        stale_cursor = edge_page.next_cursor
+        while edge_page.next_cursor is not None:
+            edge_page = list_graph_edges(
+                repo_id, cursor=edge_page.next_cursor, limit=2, session=session
+            )
+            edges.extend(edge_page.edges)
+
+    assert len(node_ids) == len(set(node_ids)) == page.total == 4
+    assert len(edges) == len({edge.id for edge in edges}) == edge_page.total == 4
+    assert {edge.from_node_id for edge in edges} <= set(node_ids)
+    assert page.version == edge_page.version
+
+    with Session(db_engine) as session:
+        repo = session.get(Repo, repo_id)
+        assert repo is not None
+        repo.graph_version += 1
+        session.add(repo)
+        session.commit()
+        with pytest.raises(HTTPException) as stale:
+            list_graph_edges(repo_id, cursor=stale_cursor, limit=2, session=session)
+        with pytest.raises(HTTPException) as invalid:
+            list_graph_nodes(repo_id, cursor="bogus", limit=2, session=session)
+    assert (stale.value.status_code, invalid.value.status_code) == (409, 400)
@@ -0,0 +1,141 @@
+from collections.abc import Callable
+from pathlib import Path
+
+from sqlalchemy import Engine
+from sqlmodel import Session, select
+
+from regulus_api.db.models import File, GraphComponent, GraphEdge, GraphNode, ImportCacheEntry
+from regulus_api.graph import builder
+from regulus_api.indexing.git_files import git_blob_sha
+
+
+def add_file(session: Session, repo_id: int, path: Path, text: str) -> None:
+    path.write_text(text)
+    session.add(
+        File(
+            repo_id=repo_id,
+            path=str(path),
+            language="typescript",
+            size_bytes=len(text),
+            loc=text.count("\n"),
+            sha=git_blob_sha(text.encode()),
+        )
+    )
+
+
+def graph_snapshot(session: Session) -> tuple[dict[str, int], set[tuple[str, str]]]:
+    nodes = {node.name: node.id for node in session.exec(select(GraphNode)).all()}
+    names = {node_id: name for name, node_id in nodes.items()}
+    edges = {
+        (names[edge.from_node_id], names[edge.to_node_id])
+        for edge in session.exec(select(GraphEdge)).all()
+    }
+    return {name: node_id for name, node_id in nodes.items() if node_id is not None}, edges
+
+
+def test_incremental_graph_build_keeps_node_ids(
+    tmp_path: Path, db_engine: Engine, add_repo: Callable[[Path], int]
+) -> None:
+    repo_root = tmp_path / "repo"
+    repo_root.mkdir()
+    repo_id = add_repo(repo_root)
+
+    with Session(db_engine) as session:
+        add_file(session, repo_id, repo_root / "a.ts", "import { b } from './b'\n")
+        add_file(session, repo_id, repo_root / "b.ts", "export const b = 1\n")
+        session.commit()
+
+    first = builder.build_dependency_graph(repo_id)
+    assert (first["nodes"], first["edges"]) == (2, 1)
+    with Session(db_engine) as session:
+        before, edges = graph_snapshot(session)
+    assert edges == {("a.ts", "b.ts")}
+
+    with Session(db_engine) as session:
+        file_a = session.exec(select(File).where(File.path == str(repo_root / "a.ts"))).one()
+        (repo_root / "a.ts").write_text("import { c } from './c'\n")
+        file_a.sha = git_blob_sha((repo_root / "a.ts").read_bytes())
+        session.add(file_a)
+        add_file(session, repo_id, repo_root / "c.ts", "export const c = 1\n")
+        session.commit()
+
+    second = builder.build_dependency_graph(repo_id, incremental=True)
+    assert second["files_parsed"] == 2
+    assert (second["nodes_added"], second["edges_added"], second["edges_removed"]) == (1, 1, 1)
+    with Session(db_engine) as session:
+        after, edges = graph_snapshot(session)
+    assert edges == {("a.ts", "c.ts")}
+    assert after["a.ts"] == before["a.ts"]
+    assert after["b.ts"] == before["b.ts"]
+
+    rebuilt = builder.build_dependency_graph(repo_id)
+    assert (rebuilt["files_parsed"], rebuilt["import_cache_hits"]) == (0, 3)
+    assert rebuilt["edges"] == 1
+
+
+def test_graph_build_aggregates_duplicate_imports(
+    tmp_path: Path, db_engine: Engine, add_repo: Callable[[Path], int]
+) -> None:
+    repo_id = add_repo(tmp_path)
+
+    with Session(db_engine) as session:
+        add_file(
+            session,
+            repo_id,
+            tmp_path / "a.ts",
+            "import { b } from './b'\nimport type { B } from './b.ts'\nimport('./b')\n",
+        )
+        add_file(session, repo_id, tmp_path / "b.ts", "export const b = 1\n")
+        session.commit()
+
+    result = builder.build_dependency_graph(repo_id)
+
+    assert result["edges"] == 1
+    with Session(db_engine) as session:
+        edge = session.exec(select(GraphEdge)).one()
+    assert (edge.kind, edge.weight) == ("import", 2)
+
+
+def test_graph_build_records_import_cycles(
+    tmp_path: Path, db_engine: Engine, add_repo: Callable[[Path], int]
+) -> None:
+    repo_id = add_repo(tmp_path)
+
+    with Session(db_engine) as session:
+        add_file(session, repo_id, tmp_path / "a.ts", "import { b } from './b'\n")
+        add_file(session, repo_id, tmp_path / "b.ts", "import { c } from './c'\n")
+        add_file(session, repo_id, tmp_path / "c.ts", "import { a } from './a'\n")
+        add_file(session, repo_id, tmp_path / "d.ts", "import { a } from './a'\n")
+        session.commit()
+
+    result = builder.build_dependency_graph(repo_id)
+
+    assert (result["components"], result["cycles"], result["largest_cycle"]) == (2, 1, 3)
+    with Session(db_engine) as session:
+        cycle = session.exec(select(GraphComponent).where(GraphComponent.size > 1)).one()
+        members = session.exec(
+            select(GraphNode.name).where(GraphNode.component == cycle.component)
+        ).all()
+    assert (cycle.size, sorted(members)) == (3, ["a.ts", "b.ts", "c.ts"])
+
+
+def test_import_cache_keys_specs_by_the_bytes_parsed(
+    tmp_path: Path, db_engine: Engine, add_repo: Callable[[Path], int]
+) -> None:
+    repo_id = add_repo(tmp_path)
+    with Session(db_engine) as session:
+        add_file(session, repo_id, tmp_path / "a.ts", "import { b } from './b'\n")
+        add_file(session, repo_id, tmp_path / "b.ts", "export const b = 1\n")
+        session.commit()
+    indexed_sha = git_blob_sha(b"import { b } from './b'\n")
+    # Edited after indexing: File.sha still names the old content.
+    (tmp_path / "a.ts").write_text("import { c } from './c'\n")
+
+    builder.build_dependency_graph(repo_id)
+
+    with Session(db_engine) as session:
+        entries = {
+            entry.content_sha: entry.specs for entry in session.exec(select(ImportCacheEntry))
+        }
+    assert indexed_sha not in entries
+    assert entries[git_blob_sha(b"import { c } from './c'\n")] == ["./c"]
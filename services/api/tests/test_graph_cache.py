@@ -0,0 +1,104 @@
+import random
+from collections.abc import Callable
+from pathlib import Path
+
+from sqlalchemy import Engine
+from sqlmodel import Session, select
+
+from regulus_api.db.models import File, GraphComponent
+from regulus_api.graph import builder, cache
+from regulus_api.graph.cache import RepoGraph
+from regulus_api.indexing.git_files import git_blob_sha
+
+
+def test_repo_graph_csr_adjacency() -> None:
+    graph = RepoGraph.from_rows(
+        repo_id=1,
+        version=1,
+        nodes=[
+            (30, 3, "c", "c", "module", 1),
+            (10, 1, "a", "a", "module", 1),
+            (20, 2, "b", "b", "module", 1),
+        ],
+        edges=[(1, 10, 20, "import", 2), (2, 20, 30, "import", 1), (3, 10, 30, "import", 1)],
+        file_paths={1: "a.ts", 2: "b.ts", 3: "c.ts"},
+    )
+
+    a, b, c = (graph.index_by_node[node_id] for node_id in (10, 20, 30))
+    assert sorted(graph.dependencies(a)) == [b, c]
+    assert sorted(graph.dependents(c)) == [a, b]
+    assert (graph.out_degree(c), graph.in_degree(c)) == (0, 2)
+    assert graph.transitive_dependents([c]) == {a, b, c}
+    assert graph.centrality_by_file() == {1: 1.0, 2: 1.0, 3: 1.0}
+
+
+def test_repo_graph_cache_follows_graph_version(
+    tmp_path: Path, db_engine: Engine, add_repo: Callable[[Path], int]
+) -> None:
+    repo_id = add_repo(tmp_path)
+
+    with Session(db_engine) as session:
+        for name, text in (("a.ts", "import { b } from './b'\n"), ("b.ts", "export const b = 1\n")):
+            (tmp_path / name).write_text(text)
+            session.add(
+                File(
+                    repo_id=repo_id,
+                    path=str(tmp_path / name),
+                    language="typescript",
+                    size_bytes=len(text),
+                    loc=1,
+                    sha=git_blob_sha(text.encode()),
+                )
+            )
+        session.commit()
+
+    builder.build_dependency_graph(repo_id)
+    with Session(db_engine) as session:
+        first = cache.get_repo_graph(session, repo_id)
+        assert first is not None
+        assert cache.get_repo_graph(session, repo_id) is first
+    assert (first.version, first.node_count, first.edge_count) == (1, 2, 1)
+
+    builder.build_dependency_graph(repo_id)
+    with Session(db_engine) as session:
+        second = cache.get_repo_graph(session, repo_id)
+    assert second is not None and second is not first
+    assert second.version == 2
+    with Session(db_engine) as session:
+        components = session.exec(select(GraphComponent)).all()
+        assert cache.load_repo_graph(session, repo_id, 2, str(tmp_path)).component_dependents
+    assert len(components) == 2
+
+
+def test_reachability_index_matches_traversal() -> None:
+    rng = random.Random(7)
+    nodes = [(node_id, node_id, str(node_id), str(node_id), "module", 1) for node_id in range(60)]
+    edges = [(edge_id, rng.randrange(60), rng.randrange(60), "import", 1) for edge_id in range(150)]
+    graph = RepoGraph.from_rows(repo_id=1, version=1, nodes=nodes, edges=edges, file_paths={})
+    components, dependents = graph.compute_reachability(max_bytes=1_000_000)
+    assert dependents is not None
+    for source, target in {(row[1], row[2]) for row in edges}:
+        assert components[source] >= components[target]
+
+    indexed = RepoGraph.from_rows(repo_id=1, version=1, nodes=nodes, edges=edges, file_paths={})
+    indexed.attach_reachability(components, dependents)
+    for start in range(0, 60, 7):
+        assert indexed.transitive_dependents([start, 59 - start]) == graph.transitive_dependents(
+            [start, 59 - start]
+        )
+
+
+def test_repo_graph_neighbourhood_and_induced_edges() -> None:
+    graph = RepoGraph.from_rows(
+        repo_id=1,
+        version=1,
+        nodes=[(node_id, node_id, str(node_id), str(node_id), "module", 1) for node_id in range(5)],
+        edges=[(1, 0, 1, "import", 1), (2, 1, 2, "import", 1), (3, 2, 3, "import", 1)],
+        file_paths={},
+    )
+
+    assert graph.neighbourhood(1, hops=1, direction="both", limit=10) == ([0, 1, 2], False)
+    assert graph.neighbourhood(1, hops=2, direction="out", limit=10) == ([1, 2, 3], False)
+    assert graph.neighbourhood(1, hops=3, direction="both", limit=2)[1] is True
+    assert graph.edges_within([0, 1, 3]) == [(0, 0)]
+    assert graph.edge_slice(1, 10) == [(1, 1), (2, 2)]
@@ -0,0 +1,30 @@
+import json
+
+from regulus_api.graph.cache import RepoGraph
+from regulus_api.graph.export import iter_graph_ndjson
+
+
+def test_graph_export_streams_nodes_before_edges() -> None:
+    graph = RepoGraph.from_rows(
+        repo_id=7,
+        version=3,
+        nodes=[(node_id, node_id, f"m{node_id}.py", "/r", "module", 1) for node_id in range(5)],
+        edges=[(10 + source, source, source + 1, "import", 2) for source in range(4)],
+        file_paths={},
+    )
+
+    chunks = list(iter_graph_ndjson(graph, batch_lines=3))
+    records = [json.loads(line) for chunk in chunks for line in chunk.splitlines()]
+
+    assert len(chunks) == 4
+    assert records[0] == {"type": "graph", "repo_id": 7, "version": 3, "nodes": 5, "edges": 4}
+    assert [record["type"] for record in records[1:]] == ["node"] * 5 + ["edge"] * 4
+    assert records[1]["out_degree"] == 1 and records[5]["in_degree"] == 1
+    assert records[6] == {
+        "type": "edge",
+        "id": 10,
+        "from_node_id": 0,
+        "to_node_id": 1,
+        "kind": "import",
+        "weight": 2,
+    }
@@ -0,0 +1,44 @@
+from regulus_api.graph.cache import RepoGraph
+from regulus_api.graph.layout import LAYOUT_MAX_ROW_WIDTH, layered_layout
+
+
+def layout_for(node_count: int, pairs: list[tuple[int, int]]) -> tuple[list[float], list[float]]:
+    graph = RepoGraph.from_rows(
+        repo_id=1,
+        version=1,
+        nodes=[
+            (node_id, node_id, str(node_id), str(node_id), "module", 1)
+            for node_id in range(node_count)
+        ],
+        edges=[
+            (edge_id, source, target, "import", 1) for edge_id, (source, target) in enumerate(pairs)
+        ],
+        file_paths={},
+    )
+    components, _ = graph.compute_reachability(max_bytes=1_000_000)
+    xs, ys = layered_layout(
+        components,
+        max(components, default=-1) + 1,
+        graph.forward_offsets,
+        graph.forward_targets,
+        graph.reverse_offsets,
+        graph.reverse_sources,
+    )
+    return list(xs), list(ys)
+
+
+def test_layered_layout_places_importers_above_imports() -> None:
+    # 0 -> 1 -> 2, 3 -> 2, and a 4 <-> 5 cycle importing 2.
+    xs, ys = layout_for(6, [(0, 1), (1, 2), (3, 2), (4, 5), (5, 4), (4, 2)])
+
+    assert ys[0] < ys[1] < ys[2]
+    assert ys[3] < ys[2] and ys[4] == ys[5] < ys[2]
+    assert len(set(zip(xs, ys, strict=True))) == 6
+
+
+def test_layered_layout_wraps_wide_layers() -> None:
+    count = LAYOUT_MAX_ROW_WIDTH * 2 + 1
+    xs, ys = layout_for(count, [])
+
+    assert len(set(ys)) == 3
+    assert len(set(zip(xs, ys, strict=True))) == count
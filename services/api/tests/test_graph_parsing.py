@@ -1,4 +1,8 @@
+from pathlib import Path
+
+from regulus_api.graph.builder import iter_file_imports
 from regulus_api.graph.parsers import extract_imports
+from regulus_api.indexing.git_files import git_blob_sha
 
 
 def test_extract_imports_python() -> None:
@@ -21,3 +25,40 @@ const bar = require('../bar')
     imports = extract_imports("javascript", code)
     assert "./foo" in imports
     assert "../bar" in imports
+
+
+def test_extract_imports_python_recovers_from_syntax_errors() -> None:
+    code = """
+import os, pkg.sub as sub
+from ..shared import config
+
+def broken(:
+    from .local import helper
+"""
+    imports = extract_imports("python", code)
+    assert imports == {"os", "pkg.sub", "..shared", ".local"}
+
+
+def test_extract_imports_javascript_handles_deep_nesting() -> None:
+    depth = 5000
+    code = "const data = " + "[" * depth + "require('./deep')" + "]" * depth + "\n"
+    code += "const lazy = import('./lazy')\nrequire(name)\n"
+    imports = extract_imports("javascript", code)
+    assert imports == {"./deep", "./lazy"}
+
+
+def test_iter_file_imports_parallel_matches_serial(tmp_path: Path) -> None:
+    tasks = []
+    for index in range(12):
+        path = tmp_path / f"mod{index}.py"
+        path.write_text(f"import pkg{index}\nfrom .sibling{index} import value\n")
+        tasks.append((index, str(path), "python"))
+    tasks.append((99, str(tmp_path / "missing.py"), "python"))
+
+    serial = list(iter_file_imports(tasks))
+    parallel = list(iter_file_imports(tasks, workers=2))
+
+    assert parallel == serial
+    assert [file_id for file_id, _, _ in serial] == list(range(12))
+    assert serial[3][1] == git_blob_sha((tmp_path / "mod3.py").read_bytes())
+    assert serial[3][2] == {"pkg3", ".sibling3"}
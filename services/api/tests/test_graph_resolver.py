@@ -0,0 +1,72 @@
+from regulus_api.db.models import File
+from regulus_api.graph.resolver import ImportResolver
+
+
+def make_files(root: str, paths: list[str]) -> list[File]:
+    return [
+        File(id=index, repo_id=1, path=f"{root}/{path}", language="", size_bytes=0, loc=0, sha="")
+        for index, path in enumerate(paths, start=1)
+    ]
+
+
+def test_resolver_handles_js_and_python_specs() -> None:
+    root = "/work/repo"
+    files = make_files(
+        root,
+        [
+            "web/lib/index.ts",
+            "web/app/page.tsx",
+            "services/api/src/pkg/__init__.py",
+            "services/api/src/pkg/util.py",
+            "services/api/src/pkg/jobs/tasks.py",
+        ],
+    )
+    resolver = ImportResolver.for_files(files, root)
+    page = f"{root}/web/app/page.tsx"
+    tasks = f"{root}/services/api/src/pkg/jobs/tasks.py"
+
+    assert resolver.resolve("../lib", page) is files[0]
+    assert resolver.resolve("../../../outside", page) is None
+    assert resolver.resolve("..util", tasks) is files[3]
+    assert resolver.resolve("..", tasks) is files[2]
+    assert resolver.resolve("pkg.util", tasks) is files[3]
+    assert resolver.resolve("os", tasks) is None
+
+
+def test_resolver_memoizes_per_directory() -> None:
+    root = "/work/repo"
+    files = make_files(root, ["src/a.ts", "src/b.ts", "src/shared.ts"])
+    resolver = ImportResolver.for_files(files, root)
+
+    assert resolver.resolve("./shared", f"{root}/src/a.ts") is files[2]
+    assert resolver.resolve("./shared", f"{root}/src/b.ts") is files[2]
+    assert (resolver.hits, resolver.misses) == (1, 1)
+    assert resolver.hit_rate == 0.5
+
+
+def test_resolver_ignores_implicit_relative_absolute_imports() -> None:
+    root = "/work/repo"
+    files = make_files(
+        root,
+        [
+            "pkg/__init__.py",
+            "pkg/a.py",
+            "pkg/logging.py",
+            "pkg/types.py",
+            "pkg/sub/__init__.py",
+            "pkg/sub/b.py",
+            "scripts/tool.py",
+            "services/api/src/app/__init__.py",
+            "services/api/src/app/main.py",
+        ],
+    )
+    resolver = ImportResolver.for_files(files, root)
+
+    # Stdlib names must not bind to same-named modules beside or above the importer.
+    assert resolver.resolve("logging", f"{root}/pkg/a.py") is None
+    assert resolver.resolve("types", f"{root}/pkg/sub/b.py") is None
+    assert resolver.resolve(".logging", f"{root}/pkg/a.py") is files[2]
+    assert resolver.resolve("pkg.types", f"{root}/pkg/sub/b.py") is files[3]
+    # src/ holds a top-level package, so it is a source root for the whole repo.
+    assert resolver.source_roots == ["", "services/api/src"]
+    assert resolver.resolve("app.main", f"{root}/scripts/tool.py") is files[8]
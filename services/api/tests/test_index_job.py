@@ -0,0 +1,102 @@
+import subprocess
+from collections.abc import Callable
+from pathlib import Path
+
+from sqlalchemy import Engine
+from sqlmodel import Session, col, select
+
+from regulus_api.db.models import Chunk, ChunkContent, File, GraphNode
+from regulus_api.graph.builder import build_dependency_graph
+from regulus_api.jobs.tasks import index_repo
+
+
+def test_full_reindex_keeps_file_and_node_ids(
+    tmp_path: Path, db_engine: Engine, add_repo: Callable[[Path], int]
+) -> None:
+    (tmp_path / "a.ts").write_text("import { b } from './b'\n")
+    (tmp_path / "b.ts").write_text("export const b = 1\n")
+    repo_id = add_repo(tmp_path)
+
+    index_repo(repo_id)
+    build_dependency_graph(repo_id)
+    with Session(db_engine) as session:
+        files = {file.path: file.id for file in session.exec(select(File)).all()}
+        nodes = {node.name: node.id for node in session.exec(select(GraphNode)).all()}
+
+    (tmp_path / "b.ts").write_text("export const b = 2\n")
+    result = index_repo(repo_id)
+
+    assert (result["modified"], result["unchanged"], result["removed"]) == (1, 1, 0)
+    with Session(db_engine) as session:
+        assert {file.path: file.id for file in session.exec(select(File)).all()} == files
+        assert {node.name: node.id for node in session.exec(select(GraphNode)).all()} == nodes
+
+
+def chunk_sources(session: Session) -> dict[str, set[str]]:
+    rows = session.exec(
+        select(File.path, ChunkContent.content)
+        .join(Chunk, col(Chunk.file_id) == col(File.id))
+        .join(ChunkContent, col(ChunkContent.sha) == col(Chunk.content_sha))
+    ).all()
+    sources: dict[str, set[str]] = {}
+    for path, content in rows:
+        sources.setdefault(Path(path).name, set()).add(content.strip())
+    return sources
+
+
+def test_index_repo_writes_added_modified_and_removed_rows(
+    tmp_path: Path, db_engine: Engine, add_repo: Callable[[Path], int]
+) -> None:
+    names = [f"m{index:02}.py" for index in range(12)]
+    for name in names:
+        (tmp_path / name).write_text(f"NAME = {name!r}\n")
+    repo_id = add_repo(tmp_path)
+
+    first = index_repo(repo_id)
+
+    assert (first["files"], first["added"], first["chunks"]) == (12, 12, 12)
+    assert first["rows_written"] == 36
+    assert first["insert_rows_per_sec"] > 0
+    with Session(db_engine) as session:
+        # Each chunk must hang off the file id returned for its own record.
+        assert chunk_sources(session) == {name: {f"NAME = {name!r}"} for name in names}
+        kept = session.exec(select(File.id).where(File.path == str(tmp_path / "m00.py"))).one()
+
+    (tmp_path / "m01.py").write_text("NAME = 'changed'\n")
+    (tmp_path / "m02.py").unlink()
+    (tmp_path / "new.py").write_text("NAME = 'new'\n")
+    second = index_repo(repo_id, incremental=True)
+
+    assert (second["added"], second["modified"], second["removed"]) == (1, 1, 1)
+    assert second["unchanged"] == 10
+    assert second["rows_written"] == 6
+    with Session(db_engine) as session:
+        sources = chunk_sources(session)
+        assert (
+            session.exec(select(File.id).where(File.path == str(tmp_path / "m00.py"))).one() == kept
+        )
+        assert len(session.exec(select(Chunk)).all()) == 12
+    assert "m02.py" not in sources
+    assert sources["m01.py"] == {"NAME = 'changed'"}
+    assert sources["new.py"] == {"NAME = 'new'"}
+
+
+def test_touched_untracked_file_is_indexed_in_git_mode(
+    tmp_path: Path, db_engine: Engine, add_repo: Callable[[Path], int]
+) -> None:
+    subprocess.run(["git", "init", "-q", str(tmp_path)], check=True)
+    (tmp_path / "a.py").write_text("A = 1\n")
+    subprocess.run(["git", "-C", str(tmp_path), "add", "a.py"], check=True)
+    repo_id = add_repo(tmp_path)
+    index_repo(repo_id)
+
+    # The watcher reports the new file before anyone has run `git add`.
+    (tmp_path / "new.py").write_text("NEW = 1\n")
+    result = index_repo(repo_id, paths=["new.py"])
+
+    assert result["added"] == 1
+    with Session(db_engine) as session:
+        assert chunk_sources(session) == {"a.py": {"A = 1"}, "new.py": {"NEW = 1"}}
+
+    # A later full run keeps it rather than treating it as removed.
+    assert index_repo(repo_id)["removed"] == 0
@@ -0,0 +1,268 @@
+import subprocess
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+from pytest import MonkeyPatch
+
+from regulus_api.indexing import indexer
+from regulus_api.indexing.git_files import git_blob_sha, is_ignored
+from regulus_api.indexing.indexer import (
+    FileRecord,
+    RepoEntry,
+    SkippedFile,
+    batch_file_records,
+    diff_file_records,
+    index_file,
+    index_repository,
+    iter_index_records,
+    iter_repo_entries,
+)
+
+
+def test_index_repository_chunks_known_languages(tmp_path: Path) -> None:
+    (tmp_path / "app.py").write_text("import os\n\nprint(os.getcwd())\n")
+    (tmp_path / "notes.bin").write_text("ignored")
+    (tmp_path / "node_modules").mkdir()
+    (tmp_path / "node_modules" / "dep.js").write_text("module.exports = 1\n")
+
+    records = index_repository(tmp_path)
+
+    assert [Path(record.path).name for record in records] == ["app.py"]
+    assert records[0].loc == 3
+    assert records[0].chunks[0].start_line == 1
+
+
+def test_diff_file_records_classifies_changes(tmp_path: Path) -> None:
+    (tmp_path / "kept.py").write_text("x = 1\n")
+    (tmp_path / "changed.py").write_text("y = 2\n")
+    (tmp_path / "new.py").write_text("z = 3\n")
+    records = {Path(record.path).name: record for record in index_repository(tmp_path)}
+
+    existing = {
+        records["kept.py"].path: records["kept.py"].sha,
+        records["changed.py"].path: "stale",
+        str(tmp_path / "gone.py"): "old",
+    }
+    delta = diff_file_records(existing, list(records.values()))
+
+    assert [Path(record.path).name for record in delta.added] == ["new.py"]
+    assert [Path(record.path).name for record in delta.modified] == ["changed.py"]
+    assert delta.unchanged == [records["kept.py"].path]
+    assert delta.removed == [str(tmp_path / "gone.py")]
+
+
+def test_index_repository_parallel_matches_serial(tmp_path: Path) -> None:
+    for idx in range(12):
+        package = tmp_path / f"pkg{idx % 3}"
+        package.mkdir(exist_ok=True)
+        (package / f"mod{idx}.py").write_text(f"VALUE = {idx}\n" * (idx + 1))
+
+    serial = index_repository(tmp_path)
+    parallel = index_repository(tmp_path, workers=2)
+
+    assert [record.path for record in parallel] == [record.path for record in serial]
+    assert [record.sha for record in parallel] == [record.sha for record in serial]
+
+
+def test_batch_file_records_respects_byte_ceiling(tmp_path: Path) -> None:
+    for idx in range(5):
+        (tmp_path / f"mod{idx}.py").write_text("x" * 100 + "\n")
+
+    batches = list(
+        batch_file_records(iter_index_records(iter_repo_entries(tmp_path)), max_bytes=250)
+    )
+
+    assert [len(batch) for batch in batches] == [2, 2, 1]
+    assert [Path(record.path).name for batch in batches for record in batch] == [
+        f"mod{idx}.py" for idx in range(5)
+    ]
+
+
+def test_batch_file_records_counts_encoded_bytes(tmp_path: Path) -> None:
+    for idx in range(3):
+        (tmp_path / f"mod{idx}.py").write_text("é" * 100 + "\n", encoding="utf-8")
+
+    batches = list(
+        batch_file_records(iter_index_records(iter_repo_entries(tmp_path)), max_bytes=250)
+    )
+
+    # 101 characters but 201 bytes each, so every file gets its own batch.
+    assert [len(batch) for batch in batches] == [1, 1, 1]
+
+
+class LazyFuture:
+    def __init__(self, executor: "RecordingExecutor", fn: Callable[..., Any], batch: Any) -> None:
+        self.executor = executor
+        self.fn = fn
+        self.batch = batch
+
+    def result(self) -> Any:
+        self.executor.outstanding.remove(self)
+        return self.fn(self.batch)
+
+
+class RecordingExecutor:
+    def __init__(self) -> None:
+        self.outstanding: list[LazyFuture] = []
+        self.peak_bytes = 0
+
+    def __call__(self, max_workers: int) -> "RecordingExecutor":
+        return self
+
+    def __enter__(self) -> "RecordingExecutor":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        return None
+
+    def submit(self, fn: Callable[..., Any], batch: list[RepoEntry]) -> LazyFuture:
+        future = LazyFuture(self, fn, batch)
+        self.outstanding.append(future)
+        in_flight = sum(
+            entry.path.stat().st_size for item in self.outstanding for entry in item.batch
+        )
+        self.peak_bytes = max(self.peak_bytes, in_flight)
+        return future
+
+
+def test_parallel_scan_bounds_bytes_in_flight(tmp_path: Path, monkeypatch: MonkeyPatch) -> None:
+    for idx in range(40):
+        (tmp_path / f"mod{idx:02}.py").write_text(f"value_{idx} = '{'x' * 90}'\n")
+    executor = RecordingExecutor()
+    monkeypatch.setattr(indexer, "ProcessPoolExecutor", executor)
+    entries = iter_repo_entries(tmp_path, use_git=False)
+
+    records = list(iter_index_records(entries, workers=2, max_bytes=500))
+
+    assert len(records) == 40
+    assert 0 < executor.peak_bytes <= 500
+
+
+def git(repo: Path, *args: str) -> str:
+    result = subprocess.run(
+        ["git", "-C", str(repo), *args], check=True, capture_output=True, text=True
+    )
+    return result.stdout.strip()
+
+
+def test_git_entries_apply_gitignore_and_reuse_blob_ids(tmp_path: Path) -> None:
+    git(tmp_path, "init", "-q")
+    (tmp_path / "src").mkdir()
+    (tmp_path / "src" / "app.py").write_text("print('hi')\n")
+    (tmp_path / "src" / "edited.py").write_text("x = 1\n")
+    (tmp_path / "out").mkdir()
+    (tmp_path / "out" / "bundle.js").write_text("var a=1\n")
+    (tmp_path / ".regulusignore").write_text("# generated\nout/\n")
+    git(tmp_path, "add", "src", "out", ".regulusignore")
+    (tmp_path / "src" / "edited.py").write_text("x = 2\n")
+    (tmp_path / "src" / "scratch.py").write_text("untracked = True\n")
+    (tmp_path / ".gitignore").write_text("*.log\n")
+    (tmp_path / "src" / "debug.log").write_text("noise\n")
+
+    entries = {
+        entry.path.relative_to(tmp_path).as_posix(): entry for entry in iter_repo_entries(tmp_path)
+    }
+
+    assert set(entries) == {
+        ".gitignore",
+        ".regulusignore",
+        "src/app.py",
+        "src/edited.py",
+        "src/scratch.py",
+    }
+    assert entries["src/app.py"].blob_sha == git(tmp_path, "hash-object", "src/app.py")
+    assert entries["src/edited.py"].blob_sha is None
+    assert entries["src/scratch.py"].blob_sha is None
+
+    records = {Path(record.path).name: record for record in index_repository(tmp_path)}
+    assert records["edited.py"].sha == git(tmp_path, "hash-object", "src/edited.py")
+
+
+def test_is_ignored_patterns() -> None:
+    patterns = ["*.min.js", "target/", "/apps/web/out/", "docs/*.md"]
+    assert is_ignored("static/vendor.min.js", patterns)
+    assert is_ignored("crates/core/target/debug/main.py", patterns)
+    assert is_ignored("apps/web/out/page.js", patterns)
+    assert is_ignored("docs/intro.md", patterns)
+    assert not is_ignored("apps/api/out/page.js", patterns)
+    assert not is_ignored("src/target.py", patterns)
+    assert not is_ignored("docs/guide/intro.md", patterns)
+
+
+def test_is_ignored_matches_directories_like_gitignore() -> None:
+    assert is_ignored("out/bundle.js", ["out"])
+    assert is_ignored("apps/web/out/bundle.js", ["out"])
+    assert is_ignored("out/bundle.js", ["/out"])
+    assert not is_ignored("apps/web/out/bundle.js", ["/out"])
+    assert is_ignored("src/gen/a.py", ["src/gen"])
+    assert not is_ignored("lib/src/gen/a.py", ["src/gen"])
+    assert is_ignored("lib/src/gen/a.py", ["**/src/gen"])
+    assert is_ignored("target/x.rs", ["target"])
+
+
+def test_is_ignored_supports_negation() -> None:
+    patterns = ["*.json", "!package.json"]
+    assert is_ignored("data/fixtures.json", patterns)
+    assert not is_ignored("apps/web/package.json", patterns)
+    # A file inside an ignored directory cannot be re-included.
+    assert is_ignored("build/keep.py", ["build/", "!keep.py"])
+
+
+def test_repo_entries_limited_to_touched_paths(tmp_path: Path) -> None:
+    git(tmp_path, "init", "-q")
+    (tmp_path / "a.py").write_text("a = 1\n")
+    (tmp_path / "b.py").write_text("b = 1\n")
+    (tmp_path / "gone.py").write_text("c = 1\n")
+    git(tmp_path, "add", ".")
+    (tmp_path / "gone.py").unlink()
+
+    touched = ["a.py", "gone.py", "untracked.py"]
+    git_entries = iter_repo_entries(tmp_path, only=touched)
+    walk_entries = iter_repo_entries(tmp_path, use_git=False, only=touched)
+
+    assert [entry.path.name for entry in git_entries] == ["a.py"]
+    assert [entry.path.name for entry in walk_entries] == touched
+
+
+def test_index_file_mmap_path_matches_buffered_read(
+    tmp_path: Path, monkeypatch: MonkeyPatch
+) -> None:
+    data = "".join(f"row_{line} = {line}\r\n" for line in range(450)).encode()
+    path = tmp_path / "schema.py"
+    path.write_bytes(data)
+
+    buffered = index_file(RepoEntry(path=path))
+    monkeypatch.setattr(indexer, "MMAP_THRESHOLD_BYTES", 0)
+    mapped = index_file(RepoEntry(path=path))
+
+    assert isinstance(buffered, FileRecord) and isinstance(mapped, FileRecord)
+    assert mapped == buffered
+    assert buffered.sha == git_blob_sha(data)
+    assert buffered.loc == 450
+    assert [(chunk.start_line, chunk.end_line) for chunk in buffered.chunks] == [
+        (1, 200),
+        (201, 400),
+        (401, 450),
+    ]
+    assert buffered.chunks[2].content.splitlines()[-1] == "row_449 = 449"
+
+
+def test_iter_index_records_reports_skipped_content(tmp_path: Path) -> None:
+    (tmp_path / "app.js").write_text("export const answer = 42\n")
+    (tmp_path / "bundle.js").write_text("var a=1;" * 2000)
+    (tmp_path / "vendor.min.js").write_text("var b=2;\n")
+    (tmp_path / "client.ts").write_text("// @generated by protoc\nexport {}\n")
+    (tmp_path / "blob.py").write_bytes(b"data = 1\n\0\x01\x02")
+    entries = iter_repo_entries(tmp_path, use_git=False)
+
+    skipped: list[SkippedFile] = []
+    records = list(iter_index_records(entries, skipped=skipped))
+
+    assert [Path(record.path).name for record in records] == ["app.js"]
+    assert {Path(item.path).name: item.reason for item in skipped} == {
+        "blob.py": "binary",
+        "bundle.js": "minified",
+        "client.ts": "generated",
+        "vendor.min.js": "minified",
+    }
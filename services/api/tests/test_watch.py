@@ -0,0 +1,58 @@
+from pathlib import Path
+
+from regulus_api.jobs.watch import ChangeBuffer, reconcile_watches, watch_relative_path
+
+
+def test_change_buffer_debounces_per_repo() -> None:
+    buffer = ChangeBuffer(debounce_seconds=2.0)
+    buffer.add(1, "src/a.py", now=0.0)
+    buffer.add(1, "src/b.py", now=1.5)
+    buffer.add(2, "lib/c.ts", now=1.0)
+
+    assert buffer.drain(now=2.5) == {}
+    assert buffer.drain(now=3.1) == {2: ["lib/c.ts"]}
+    assert buffer.drain(now=3.6) == {1: ["src/a.py", "src/b.py"]}
+    assert buffer.drain(now=10.0) == {}
+
+
+def test_change_buffer_flushes_busy_repo_after_max_delay() -> None:
+    buffer = ChangeBuffer(debounce_seconds=1.0)
+    for tick in range(12):
+        buffer.add(1, f"src/mod{tick}.py", now=float(tick))
+        ready = buffer.drain(now=float(tick) + 0.5)
+        if ready:
+            break
+
+    assert tick == 10
+    assert len(ready[1]) == 11
+
+
+def test_watch_relative_path_filters_noise(tmp_path: Path) -> None:
+    root = tmp_path.resolve()
+    assert watch_relative_path(root, str(root / "src" / "app.py")) == "src/app.py"
+    assert watch_relative_path(root, str(root / "node_modules" / "x" / "index.js")) is None
+    assert watch_relative_path(root, str(root / ".git" / "index.py")) is None
+    assert watch_relative_path(root, str(root / "image.png")) is None
+    assert watch_relative_path(root, "/elsewhere/app.py") is None
+
+
+def test_reconcile_watches_drops_deleted_and_moved_repos(tmp_path: Path) -> None:
+    for name in ("kept", "moved", "new", "added"):
+        (tmp_path / name).mkdir()
+    watched = {
+        1: tmp_path / "kept",
+        2: tmp_path / "gone",
+        3: tmp_path / "moved",
+        4: tmp_path / "removed",
+    }
+    targets = {
+        1: tmp_path / "kept",
+        2: tmp_path / "gone",
+        3: tmp_path / "new",
+        5: tmp_path / "added",
+    }
+
+    stale, fresh = reconcile_watches(watched, targets)
+
+    assert stale == [2, 3, 4]
+    assert fresh == {3: tmp_path / "new", 5: tmp_path / "added"}
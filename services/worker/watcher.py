@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import logging
+import sys
+import time
+from pathlib import Path
+
+from watchdog.events import FileSystemEvent, FileSystemEventHandler
+from watchdog.observers import Observer
+from watchdog.observers.api import BaseObserver, ObservedWatch
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "api" / "src"))
+
+from regulus_api.core.config import get_settings
+from regulus_api.jobs.queue import get_queue
+from regulus_api.jobs.watch import (
+    ChangeBuffer,
+    enqueue_repo_changes,
+    load_watch_targets,
+    reconcile_watches,
+    watch_relative_path,
+)
+
+POLL_SECONDS = 0.5
+REFRESH_SECONDS = 60.0
+
+logger = logging.getLogger("regulus.watcher")
+
+
+class RepoEventHandler(FileSystemEventHandler):
+    def __init__(self, buffer: ChangeBuffer, repo_id: int, repo_root: Path) -> None:
+        self.buffer = buffer
+        self.repo_id = repo_id
+        self.repo_root = repo_root
+
+    def on_any_event(self, event: FileSystemEvent) -> None:
+        if event.is_directory or event.event_type in {"opened", "closed_no_write"}:
+            return
+        for raw_path in (event.src_path, getattr(event, "dest_path", "")):
+            if not raw_path:
+                continue
+            path = raw_path.decode() if isinstance(raw_path, bytes) else raw_path
+            relative = watch_relative_path(self.repo_root, path)
+            if relative is not None:
+                self.buffer.add(self.repo_id, relative, time.monotonic())
+
+
+def refresh_watches(
+    observer: BaseObserver,
+    buffer: ChangeBuffer,
+    watches: dict[int, tuple[Path, ObservedWatch]],
+) -> None:
+    stale, fresh = reconcile_watches(
+        {repo_id: root for repo_id, (root, _) in watches.items()}, load_watch_targets()
+    )
+    for repo_id in stale:
+        root, watch = watches.pop(repo_id)
+        observer.unschedule(watch)
+        buffer.discard(repo_id)
+        logger.info("repo %s: stopped watching %s", repo_id, root)
+    for repo_id, root in fresh.items():
+        handler = RepoEventHandler(buffer, repo_id, root)
+        try:
+            watches[repo_id] = (root, observer.schedule(handler, str(root), recursive=True))
+        except OSError as exc:
+            logger.warning("repo %s: cannot watch %s: %s", repo_id, root, exc)
+            continue
+        logger.info("repo %s: watching %s", repo_id, root)
+
+
+def main() -> None:
+    settings = get_settings()
+    logging.basicConfig(
+        level=settings.log_level.upper(), format="%(asctime)s %(levelname)s %(name)s %(message)s"
+    )
+    buffer = ChangeBuffer(debounce_seconds=settings.watch_debounce_seconds)
+    queue = get_queue()
+    observer = Observer()
+    watches: dict[int, tuple[Path, ObservedWatch]] = {}
+    last_refresh = 0.0
+
+    observer.start()
+    try:
+        while True:
+            now = time.monotonic()
+            if now - last_refresh >= REFRESH_SECONDS:
+                refresh_watches(observer, buffer, watches)
+                last_refresh = now
+            for repo_id, paths in buffer.drain(now).items():
+                job_id = enqueue_repo_changes(queue, repo_id, paths)
+                logger.info("repo %s: queued %s for %d changed files", repo_id, job_id, len(paths))
+            time.sleep(POLL_SECONDS)
+    finally:
+        observer.stop()
+        observer.join()
+
+
+if __name__ == "__main__":
+    main()